@@ -0,0 +1,267 @@
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+# 얼굴 검출 -> 추적 (detect-then-track)
+#   매 프레임 640x480 전체에 cascade 를 돌리는 대신
+#   - cascade 는 축소한 프레임(scale)에서 detect_every 프레임마다, 또는 추적 신뢰도가 떨어졌을 때만
+#     얼굴이 없을 때도 매 프레임이 아니라 reacquire_every 프레임마다 (기본 detect_every 의 절반)
+#   - 그 사이에는 얼굴마다 직전 박스 주변 창에서 템플릿 매칭 (TM_CCOEFF_NORMED, 최댓값 = 신뢰도)
+#   - 추적도 축소 프레임에서 하고, 박스는 원래 해상도로 되돌려서 반환
+#
+#   python facetrack.py                      # 녹화 영상으로 매 프레임 검출 vs 추적 모드 FPS/recall 비교
+#
+# DetectWorker: 검출을 별도 스레드로 (화면 루프는 카메라 속도 그대로, 최신 결과만 가져다 그림)
+
+CASCADE = 'haarcascade_frontalface_default.xml'
+EYE_CASCADE = 'haarcascade_eye.xml'
+
+
+# cascade 파일 경로: cv2.data.haarcascades 우선 (설치 위치와 무관), 없으면 시스템 경로
+def cascade_path(name=CASCADE):
+    dirs = []
+    if hasattr(cv2, 'data'):
+        dirs.append(cv2.data.haarcascades)
+    dirs += ['/usr/share/opencv4/haarcascades', '/usr/share/opencv/haarcascades',
+             '/usr/local/share/opencv4/haarcascades']
+    for d in dirs:
+        path = os.path.join(d, name)
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(f"{name} not found in {dirs}")
+
+
+def load_cascade(name=CASCADE):
+    if not hasattr(cv2, 'CascadeClassifier'):
+        raise RuntimeError(f"this OpenCV build ({cv2.__version__}) has no CascadeClassifier")
+    cascade = cv2.CascadeClassifier(cascade_path(name))
+    if cascade.empty():
+        raise RuntimeError(f"cannot load cascade: {name}")
+    return cascade
+
+
+# 기존 방식: 전체 해상도 매 프레임
+def detect_full(cascade, gray, scale_factor=1.3, min_neighbors=5):
+    return [tuple(int(v) for v in f) for f in cascade.detectMultiScale(gray, scaleFactor=scale_factor,
+                                                                       minNeighbors=min_neighbors)]
+
+
+class FaceTracker:
+    def __init__(self, cascade, detect_every=10, scale=0.5, min_conf=0.6, margin=0.5,
+                 scale_factor=1.3, min_neighbors=5, min_size=30, reacquire_every=None):
+        self.cascade = cascade
+        self.detect_every = detect_every
+        # 추적 중인 얼굴이 없을 때의 검출 간격 (새 얼굴을 빨리 찾되 매 프레임은 아님)
+        self.reacquire_every = reacquire_every or max(1, detect_every // 2)
+        self.scale = scale              # cascade/추적용 축소 비율
+        self.min_conf = min_conf        # 이보다 낮으면 다음 프레임에서 다시 검출
+        self.margin = margin            # 탐색 창 = 박스 + 박스 크기 * margin (사방)
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.min_size = min_size        # 원래 해상도 기준 최소 얼굴 크기
+        self.tracks = []                # [템플릿, (x, y, w, h) 축소 좌표, 신뢰도]
+        self.frames = 0
+        self.detections = 0
+        self._since = 0
+
+    def detect(self, small):
+        m = max(1, int(self.min_size * self.scale))
+        faces = self.cascade.detectMultiScale(small, scaleFactor=self.scale_factor,
+                                              minNeighbors=self.min_neighbors, minSize=(m, m))
+        self.tracks = [[small[y:y + h, x:x + w].copy(), (int(x), int(y), int(w), int(h)), 1.0]
+                       for (x, y, w, h) in faces]
+        self.detections += 1
+        self._since = 0
+
+    # 직전 박스 주변 창에서 템플릿 위치 찾기
+    def track(self, small):
+        H, W = small.shape[:2]
+        for t in self.tracks:
+            tmpl, (x, y, w, h), _ = t
+            mx, my = int(w * self.margin), int(h * self.margin)
+            x0, y0 = max(0, x - mx), max(0, y - my)
+            x1, y1 = min(W, x + w + mx), min(H, y + h + my)
+            if x1 - x0 < w or y1 - y0 < h:
+                t[2] = 0.0              # 화면 밖으로 나감
+                continue
+            res = cv2.matchTemplate(small[y0:y1, x0:x1], tmpl, cv2.TM_CCOEFF_NORMED)
+            _, conf, _, loc = cv2.minMaxLoc(res)
+            t[1] = (x0 + loc[0], y0 + loc[1], w, h)
+            t[2] = conf
+
+    # 흑백 전체 해상도 프레임 -> 얼굴 박스 목록 (원래 해상도)
+    def update(self, gray):
+        small = cv2.resize(gray, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        self.frames += 1
+        lost = any(t[2] < self.min_conf for t in self.tracks)
+        if not self.tracks:
+            # 얼굴 없음: reacquire_every 프레임마다만 검출
+            if self._since >= self.reacquire_every - 1:
+                self.detect(small)
+            else:
+                self._since += 1
+        elif lost or self._since >= self.detect_every - 1:
+            self.detect(small)
+        else:
+            self.track(small)
+            self._since += 1
+            # 신뢰도가 떨어진 얼굴은 이번 프레임에서 빼고, 다음 프레임에서 검출
+            if any(t[2] < self.min_conf for t in self.tracks):
+                self._since = self.detect_every
+        s = 1.0 / self.scale
+        return [(int(x * s), int(y * s), int(w * s), int(h * s))
+                for _, (x, y, w, h), conf in self.tracks if conf >= self.min_conf]
+
+    def report(self):
+        return (f"face tracker  frames {self.frames}  cascade runs {self.detections} "
+                f"({100 * self.detections / max(1, self.frames):.0f}%)  scale {self.scale}")
+
+
+# 검출 스레드: 항상 가장 최근에 넣은 프레임 하나만 처리 (밀린 프레임은 덮어씀)
+#   worker.submit(gray)  -> 화면 루프에서 매 프레임 (기다리지 않음)
+#   worker.latest()      -> (박스 목록, 그 프레임의 시각) / 아직 결과가 없으면 ([], None)
+# OpenCV 검출 함수는 GIL 을 놓으므로 스레드로 충분
+class DetectWorker:
+    def __init__(self, detect, name='face'):
+        self.detect = detect            # detect(gray) -> 박스 목록
+        self.name = name
+        self.running = False
+        self.runs = 0
+        self.skipped = 0                # 처리 전에 덮어쓴 프레임
+        self.busy = 0.0                 # 검출에 쓴 시간 합
+        self._cond = threading.Condition()
+        self._slot = None
+        self._result = ([], None)
+        self._t0 = None
+        self._thread = None
+
+    def start(self):
+        self.running = True
+        self._t0 = time.monotonic()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def submit(self, gray, stamp=None):
+        with self._cond:
+            if self._slot is not None:
+                self.skipped += 1
+            self._slot = (gray, time.monotonic() if stamp is None else stamp)
+            self._cond.notify()
+
+    def latest(self):
+        return self._result
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._slot is None and self.running:
+                    self._cond.wait()
+                if not self.running:
+                    return
+                gray, stamp = self._slot
+                self._slot = None
+            t0 = time.perf_counter()
+            boxes = self.detect(gray)
+            self.busy += time.perf_counter() - t0
+            self._result = (boxes, stamp)
+            self.runs += 1
+
+    def stop(self):
+        with self._cond:
+            self.running = False
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+
+    def fps(self):
+        return self.runs / (time.monotonic() - self._t0) if self._t0 else 0.0
+
+    def report(self):
+        return (f"{self.name} detector  {self.fps():.1f} fps  runs {self.runs}  skipped {self.skipped}  "
+                f"mean {1000 * self.busy / max(1, self.runs):.1f} ms")
+
+
+# 얼굴 박스 윗부분에서 눈 검출 (두 번째 검출기 예)
+def detect_eyes(eye_cascade, gray, faces):
+    eyes = []
+    for (x, y, w, h) in faces:
+        roi = gray[y:y + h // 2 + h // 8, x:x + w]
+        for (ex, ey, ew, eh) in eye_cascade.detectMultiScale(roi, scaleFactor=1.1, minNeighbors=5):
+            eyes.append((x + int(ex), y + int(ey), int(ew), int(eh)))
+    return eyes
+
+
+def iou(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    iw = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    ih = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = iw * ih
+    return inter / float(aw * ah + bw * bh - inter) if inter else 0.0
+
+
+# 기준 박스(매 프레임 전체 검출) 중 IoU >= thresh 로 맞춘 비율
+def recall(ref, got, thresh=0.3):
+    total = sum(len(r) for r in ref)
+    if not total:
+        return None
+    hit = sum(1 for r, g in zip(ref, got) for box in r if any(iou(box, b) >= thresh for b in g))
+    return hit / total
+
+
+# 640x480 카메라와 비슷한 크기로 (비율 유지)
+def fit(frame, width=640, height=480):
+    h, w = frame.shape[:2]
+    s = min(width / w, height / h)
+    return cv2.resize(frame, (int(w * s), int(h * s)), interpolation=cv2.INTER_AREA) if s < 1 else frame
+
+
+def read_frames(path, max_frames=None):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while max_frames is None or len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(cv2.cvtColor(fit(frame), cv2.COLOR_BGR2GRAY))
+    cap.release()
+    return frames
+
+
+def run(frames, step):
+    out = []
+    t0 = time.perf_counter()
+    for gray in frames:
+        out.append(step(gray))
+    return out, len(frames) / (time.perf_counter() - t0)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    ap = argparse.ArgumentParser(description='얼굴 검출: 매 프레임 전체 vs 검출-추적 (FPS / recall)')
+    ap.add_argument('source', nargs='?', default=os.path.join(here, 'KakaoTalk_20251113_220802340.mp4'))
+    ap.add_argument('--frames', type=int, default=None)
+    ap.add_argument('--every', type=int, default=10, help='cascade 를 돌리는 프레임 간격')
+    ap.add_argument('--scale', type=float, default=0.5, help='cascade/추적용 축소 비율')
+    args = ap.parse_args()
+
+    frames = read_frames(args.source, args.frames)
+    if not frames:
+        raise SystemExit(f"no frames read from {args.source}")
+    cascade = load_cascade()
+    print(f"{args.source}: {len(frames)} frames {frames[0].shape[1]}x{frames[0].shape[0]}")
+
+    ref, fps_full = run(frames, lambda g: detect_full(cascade, g))
+    tracker = FaceTracker(cascade, detect_every=args.every, scale=args.scale)
+    got, fps_track = run(frames, tracker.update)
+    r = recall(ref, got)
+    print(f"  full   {fps_full:6.1f} fps  faces {sum(len(x) for x in ref)}")
+    print(f"  track  {fps_track:6.1f} fps  faces {sum(len(x) for x in got)}  ({fps_track / fps_full:.1f}x)  "
+          f"recall {'n/a (no faces in reference)' if r is None else f'{r:.2f}'}")
+    print(f"  {tracker.report()}")
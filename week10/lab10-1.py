@@ -1,15 +1,54 @@
 import cv2
+import time
+import argparse
+from facetrack import load_cascade, detect_full, FaceTracker, DetectWorker, detect_eyes, EYE_CASCADE
 
-# 얼굴 검출용 Haar Cascade 파일 로드
-face_cascade = cv2.CascadeClassifier('/home/tjsghs69/.local/lib/python3.7/site-packages/cv2/data/haarcascade_frontalface_default.xml')
+ap = argparse.ArgumentParser()
+ap.add_argument('--mode', default='full', choices=['full', 'track'],
+                help="'full': 매 프레임 전체 해상도 검출 / 'track': 축소 프레임 검출 + 사이 프레임은 추적 (facetrack.py)")
+ap.add_argument('--source', default='0', help='카메라 번호 또는 영상 파일 경로')
+ap.add_argument('--every', type=int, default=10, help='track 모드에서 cascade 를 돌리는 프레임 간격')
+ap.add_argument('--scale', type=float, default=0.5, help='track 모드의 검출/추적용 축소 비율')
+ap.add_argument('--async', dest='use_async', action='store_true',
+                help='검출을 별도 스레드로: 화면은 카메라 속도로, 박스는 최신 검출 결과 (나이 표시)')
+ap.add_argument('--eyes', action='store_true', help='얼굴 안에서 눈 검출 (--async 일 때 별도 스레드)')
+args = ap.parse_args()
+
+# 얼굴 검출용 Haar Cascade 파일 로드 (cv2.data.haarcascades 에서 찾음)
+face_cascade = load_cascade()
+tracker = FaceTracker(face_cascade, detect_every=args.every, scale=args.scale) if args.mode == 'track' else None
+eye_cascade = load_cascade(EYE_CASCADE) if args.eyes else None
+
+# 흑백 프레임 -> 얼굴 박스 (선택한 모드)
+def detect_faces(gray):
+    if tracker is None:
+        return detect_full(face_cascade, gray)
+    return tracker.update(gray)
+
+# 검출 스레드 (눈 검출기는 얼굴 검출기의 최신 결과 안에서)
+workers = []
+if args.use_async:
+    face_worker = DetectWorker(detect_faces, 'face').start()
+    workers.append(face_worker)
+    if eye_cascade is not None:
+        workers.append(DetectWorker(lambda g: detect_eyes(eye_cascade, g, face_worker.latest()[0]), 'eyes').start())
+
+# 박스와 (비동기면) 결과 나이 표시
+def draw_boxes(frame, boxes, color, stamp=None):
+    age = '' if stamp is None else f"{(time.monotonic() - stamp) * 1000:.0f}ms"
+    for (x, y, w, h) in boxes:
+        cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
+        if age:
+            cv2.putText(frame, age, (x, max(12, y - 4)), cv2.FONT_HERSHEY_SIMPLEX, 0.45, color, 1)
 
 # 카메라 초기화 (0: 기본 카메라)
-cap = cv2.VideoCapture(0)
+cap = cv2.VideoCapture(int(args.source) if args.source.isdigit() else args.source)
 
 # 카메라 프레임 크기 설정 (선택)
 cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
 cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
 
+n_shown, t_start, t_report = 0, time.monotonic(), time.monotonic()
 while True:
     ret, frame = cap.read()
     if not ret:
@@ -19,12 +58,30 @@ while True:
     # 영상을 흑백으로 변환
     gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
 
-    # 얼굴 검출 (scaleFactor=1.3, minNeighbors=5)
-    faces = face_cascade.detectMultiScale(gray, scaleFactor=1.3, minNeighbors=5)
+    if workers:
+        # 검출 스레드에 최신 프레임만 넘기고 기다리지 않음 -> 지금까지 나온 최신 박스를 그림
+        for w in workers:
+            w.submit(gray)
+        for w, color in zip(workers, [(0, 255, 0), (255, 128, 0)]):
+            boxes, stamp = w.latest()
+            draw_boxes(frame, boxes, color, stamp)
+    else:
+        # 얼굴 검출 (scaleFactor=1.3, minNeighbors=5)
+        faces = detect_faces(gray)
+        if eye_cascade is not None:
+            draw_boxes(frame, detect_eyes(eye_cascade, gray, faces), (255, 128, 0))
+
+        # 얼굴 주변에 사각형 박스 표시
+        draw_boxes(frame, faces, (0, 255, 0))
 
-    # 얼굴 주변에 사각형 박스 표시
-    for (x, y, w, h) in faces:
-        cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+    # 화면 FPS 와 검출 FPS 는 따로
+    n_shown += 1
+    elapsed = time.monotonic() - t_start
+    status = f"display {n_shown / elapsed:.1f} fps" + ''.join(f"  {w.name} {w.fps():.1f} fps" for w in workers)
+    cv2.putText(frame, status, (5, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
+    if time.monotonic() - t_report > 5.0:
+        print(status)
+        t_report = time.monotonic()
 
     # 영상 출력
     cv2.imshow("Face Detection", frame)
@@ -34,5 +91,11 @@ while True:
         break
 
 # 자원 해제
+for w in workers:
+    w.stop()
+    print(w.report())
+print(f"display {n_shown / max(1e-6, time.monotonic() - t_start):.1f} fps")
+if tracker is not None:
+    print(tracker.report())
 cap.release()
 cv2.destroyAllWindows()
@@ -1,50 +1,34 @@
-import cv2
-import numpy as np
-import glob
-import os
+import argparse
+import lane_batch
+
+ap = argparse.ArgumentParser()
+ap.add_argument('--mask-engine', default='hsv', choices=['hsv', 'lut', 'lut-exact'],
+                help="'lut' 는 HSV 변환 + inRange 2번 + OR 을 테이블 한 번으로 대체")
+ap.add_argument('--input', default='imgs', help='입력 이미지 디렉터리')
+ap.add_argument('--output', default='results', help='결과 디렉터리')
+ap.add_argument('--jobs', type=int, default=1,
+                help='1 이면 한 장씩, 2 이상이면 병렬 일괄 처리 (읽기/쓰기 스레드 + 마스크 프로세스 풀)')
+ap.add_argument('--io-threads', type=int, default=4, help='병렬 모드의 읽기/쓰기 스레드 수')
+ap.add_argument('--force', action='store_true', help='결과 캐시를 무시하고 전부 다시 처리')
+ap.add_argument('--format', default='jpg', choices=['jpg', 'maskpack'],
+                help="'jpg': detected_*.jpg / 'maskpack': 이진 마스크만 비트 패킹해서 masks.maskpack 한 파일에")
+ap.add_argument('--mask-codec', default='zlib', choices=['zlib', 'bits'],
+                help="maskpack 저장 방식 ('bits' 는 압축 없이 메모리 매핑으로 바로 읽힘, maskpack.py)")
+args = ap.parse_args()
 
 # 이미지 경로 지정
-input_dir = "imgs"
-output_dir = "results"
-os.makedirs(output_dir, exist_ok=True)
-
-# 노란색, 흰색 HSV 범위 정의
-yellow_lower = np.array([15, 80, 80])
-yellow_upper = np.array([40, 255, 255])
-white_lower  = np.array([0, 0, 200])
-white_upper  = np.array([180, 30, 255])
-
-# imgs 폴더 내 모든 jpg 파일 불러오기
-for file in sorted(glob.glob(os.path.join(input_dir, "*.jpg"))):
-    img = cv2.imread(file)
-    if img is None:
-        continue
-
-    # 크기 조정 (옵션)
-    img = cv2.resize(img, (640, 480))
-
-    # HSV 변환
-    hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
-
-    # 색상 마스크 생성
-    mask_yellow = cv2.inRange(hsv, yellow_lower, yellow_upper)
-    mask_white  = cv2.inRange(hsv, white_lower, white_upper)
-
-    # 두 마스크 결합
-    mask = cv2.bitwise_or(mask_yellow, mask_white)
-
-    # 노이즈 제거 (morphology 연산)
-    kernel = np.ones((5,5), np.uint8)
-    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
-    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
-
-    # 마스크 적용 (선 부분만 보이게)
-    result = cv2.bitwise_and(img, img, mask=mask)
-
-    # 결과 저장
-    base_name = os.path.basename(file)
-    out_path = os.path.join(output_dir, f"detected_{base_name}")
-    cv2.imwrite(out_path, result)
-
-    print(f"✅ Saved: {out_path}")
-
+input_dir = args.input
+output_dir = args.output
+
+# 노란색, 흰색 HSV 범위, 커널, 크기는 lane_batch.py 한 곳에서 정의 (결과 캐시의 키)
+# 마스크 계산, 저장, 캐시는 --jobs 와 상관없이 모두 lane_batch 의 같은 경로로
+#   jpg      : 결과 디렉터리의 manifest 로 입력/파라미터가 그대로인 이미지는 건너뜀 (resultcache.py)
+#   maskpack : 파일 하나라서 매번 전부 다시 만듦 (maskpack.py)
+files = lane_batch.list_images(input_dir)
+if args.format == 'maskpack':
+    stats = lane_batch.run_pack(files, output_dir, args.jobs, args.io_threads,
+                                mask_engine=args.mask_engine, codec=args.mask_codec)
+else:
+    stats = lane_batch.run_cached(files, input_dir, output_dir, args.jobs, args.io_threads,
+                                  mask_engine=args.mask_engine, force=args.force)
+print(lane_batch.report(stats))
@@ -0,0 +1,260 @@
+import os
+import sys
+import glob
+import time
+import hashlib
+from collections import deque
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'week11'))
+from masklut import MaskLUT
+from resultcache import ResultCache
+from maskpack import MaskPackWriter
+
+# lab10-2 차선 마스크를 대량(수천 장)으로: 제너레이터 단계를 이어 붙인 스트리밍 파이프라인
+#   읽기+디코드 (I/O 스레드 풀) -> 마스크 (프로세스 풀, 코어 수만큼) -> 인코드+쓰기 (I/O 스레드 풀)
+#   단계마다 동시에 처리 중인 이미지는 inflight 개까지 -> 메모리는 장 수와 상관없이 일정
+#   결과는 입력 순서대로 나옴
+#
+#   python lane_batch.py --input imgs --output results --jobs 4
+# 결과 디렉터리의 manifest 로 바뀐 입력만 다시 처리 (resultcache.py, --force 면 전부)
+# --format maskpack: 결과 이미지 대신 이진 마스크만 한 파일(masks.maskpack)에 비트 패킹 (maskpack.py)
+
+# 노란색, 흰색 HSV 범위 (lab10-2 도 이 값을 씀, 워커 프로세스는 import 할 때 같은 값을 얻음)
+yellow_lower = np.array([15, 80, 80])
+yellow_upper = np.array([40, 255, 255])
+white_lower  = np.array([0, 0, 200])
+white_upper  = np.array([180, 30, 255])
+kernel = np.ones((5,5), np.uint8)
+size = (640, 480)
+
+_lut = None
+
+
+# 처리 파라미터 (결과 캐시 키)
+def get_params():
+    return {'yellow': [yellow_lower.tolist(), yellow_upper.tolist()],
+            'white': [white_lower.tolist(), white_upper.tolist()],
+            'kernel': list(kernel.shape), 'size': list(size)}
+
+
+def make_lut(mask_engine):
+    # 노란색 + 흰색을 한 테이블에 (클래스당 1비트)
+    return MaskLUT({'yellow': [(yellow_lower, yellow_upper)], 'white': [(white_lower, white_upper)]},
+                   exact=(mask_engine == 'lut-exact'), cache_dir=os.path.expanduser('~/.cache/sdcar'))
+
+
+# 640x480 이미지 -> 노란색/흰색 마스크 -> 모폴로지
+def lane_mask(img, mask_engine='hsv', lut=None):
+    if mask_engine == 'hsv':
+        hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
+        mask_yellow = cv2.inRange(hsv, yellow_lower, yellow_upper)
+        mask_white  = cv2.inRange(hsv, white_lower, white_upper)
+        mask = cv2.bitwise_or(mask_yellow, mask_white)
+    else:
+        mask = lut.apply(img)
+    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
+    return cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
+
+
+# 이미지 한 장: 크기 조정 -> 마스크 -> 선 부분만 남긴 결과
+def lane_result(img, mask_engine='hsv', lut=None):
+    img = cv2.resize(img, size)
+    return cv2.bitwise_and(img, img, mask=lane_mask(img, mask_engine, lut))
+
+
+# ---- 단계 함수 (프로세스 풀에 넘기므로 모듈 최상위) ----
+
+def _init_worker(mask_engine):
+    global _lut
+    cv2.setNumThreads(1)        # 프로세스마다 코어 하나 (OpenCV 내부 스레드와 겹치지 않게)
+    if mask_engine != 'hsv':
+        _lut = make_lut(mask_engine)
+
+
+def _load(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    img = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    # 프로세스로 보낼 데이터를 줄이려고 디코드 직후 크기 조정
+    if img is not None:
+        img = cv2.resize(img, size)
+    # 읽은 김에 캐시용 내용 해시
+    return path, img, len(data), hashlib.sha1(data).hexdigest()
+
+
+# 프로세스에서는 마스크만 (돌려받는 데이터는 1채널)
+def _mask(item, mask_engine):
+    img = item[1]
+    return None if img is None else lane_mask(img, mask_engine, _lut)
+
+
+def _save(pair, output_dir):
+    (path, img, nbytes, digest), mask = pair
+    out_path = os.path.join(output_dir, f"detected_{os.path.basename(path)}")
+    if mask is None:
+        return path, nbytes, 0, digest, out_path
+    result = cv2.bitwise_and(img, img, mask=mask)
+    ok, buf = cv2.imencode(os.path.splitext(path)[1] or '.jpg', result)
+    if not ok:
+        # 인코드 실패: 실패로 세고 캐시에 기록하지 않음 (다음 실행에서 다시 처리)
+        return path, nbytes, 0, digest, out_path
+    with open(out_path, 'wb') as f:
+        f.write(buf.tobytes())
+    return path, nbytes, len(buf), digest, out_path
+
+
+# maskpack 에 덧붙이기 (입력 순서대로, 메인 스레드에서)
+def _pack(pair, pack):
+    (path, img, nbytes, digest), mask = pair
+    if mask is None:
+        return path, nbytes, 0, digest, pack.path
+    before = pack.size()
+    pack.add(os.path.basename(path), mask)
+    return path, nbytes, pack.size() - before, digest, pack.path
+
+
+# items 를 pool 에서 fn 으로 처리, 처리 중인 것은 최대 limit 개, 입력 순서대로 결과를 내보냄
+# keep 이면 (입력, 결과) 로
+def bounded_map(pool, fn, items, limit, keep=False):
+    pending = deque()
+    for item in items:
+        pending.append((item, pool.submit(fn, item)))
+        while len(pending) >= limit:
+            item, fut = pending.popleft()
+            yield (item, fut.result()) if keep else fut.result()
+    while pending:
+        item, fut = pending.popleft()
+        yield (item, fut.result()) if keep else fut.result()
+
+
+def run(files, output_dir, jobs=None, io_threads=4, inflight=None, mask_engine='hsv', progress=0, cache=None,
+        pack=None):
+    jobs = jobs or os.cpu_count()
+    inflight = inflight or 2 * jobs
+    os.makedirs(output_dir, exist_ok=True)
+    stats = {'images': 0, 'failed': 0, 'bytes_in': 0, 'bytes_out': 0}
+    t0 = time.perf_counter()
+
+    with ThreadPoolExecutor(io_threads) as io, \
+            ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=(mask_engine,)) as pool:
+        decoded = bounded_map(io, _load, files, inflight)
+        masked = bounded_map(pool, partial(_mask, mask_engine=mask_engine), decoded, inflight, keep=True)
+        if pack is None:
+            written = bounded_map(io, partial(_save, output_dir=output_dir), masked, inflight)
+        else:
+            written = (_pack(pair, pack) for pair in masked)
+        _tally(stats, written, len(files), progress, cache)
+
+    stats['seconds'] = time.perf_counter() - t0
+    return stats
+
+
+# 한 프로세스에서 한 장씩 (기존 lab10-2 방식, --jobs 1)
+# 읽기/저장은 병렬 모드와 같은 함수 -> 결과 파일이 같음
+def run_serial(files, output_dir, mask_engine='hsv', cache=None, pack=None, progress=0):
+    os.makedirs(output_dir, exist_ok=True)
+    lut = make_lut(mask_engine) if mask_engine != 'hsv' else None
+    stats = {'images': 0, 'failed': 0, 'bytes_in': 0, 'bytes_out': 0}
+    t0 = time.perf_counter()
+    masked = ((item, None if item[1] is None else lane_mask(item[1], mask_engine, lut))
+              for item in map(_load, files))
+    if pack is None:
+        written = (_save(pair, output_dir) for pair in masked)
+    else:
+        written = (_pack(pair, pack) for pair in masked)
+    _tally(stats, written, len(files), progress, cache)
+    stats['seconds'] = time.perf_counter() - t0
+    return stats
+
+
+# 저장 결과 집계, 성공한 것만 캐시에 기록
+def _tally(stats, written, total, progress=0, cache=None):
+    for path, nbytes, nout, digest, out_path in written:
+        stats['images'] += 1
+        stats['bytes_in'] += nbytes
+        stats['bytes_out'] += nout
+        if not nout:
+            stats['failed'] += 1
+        elif cache is not None:
+            cache.record(path, out_path, digest)
+        if progress and stats['images'] % progress == 0:
+            print(f"  {stats['images']}/{total}")
+
+
+# 캐시를 거쳐서 실행: 바뀐 입력만 처리하고 입력이 없어진 결과는 지움
+def run_cached(files, input_dir, output_dir, jobs=None, io_threads=4, inflight=None, mask_engine='hsv',
+               progress=0, force=False):
+    cache = ResultCache(output_dir, dict(get_params(), mask_engine=mask_engine), input_dir)
+    todo = list(files) if force else cache.plan(files)
+    cache.prune(files)
+    print(cache.report(len(files), todo))
+    if not todo:
+        stats = {'images': 0, 'failed': 0, 'bytes_in': 0, 'bytes_out': 0, 'seconds': 0.0}
+    elif jobs == 1:
+        stats = run_serial(todo, output_dir, mask_engine, cache, progress=progress)
+    else:
+        stats = run(todo, output_dir, jobs, io_threads, inflight, mask_engine, progress, cache)
+    cache.save()
+    return stats
+
+
+# 마스크 묶음 파일로: 파일 하나라서 캐시 없이 매번 새로 만듦 (결과 이미지보다 훨씬 빨리 씀)
+def run_pack(files, output_dir, jobs=None, io_threads=4, inflight=None, mask_engine='hsv', progress=0,
+             codec='zlib'):
+    os.makedirs(output_dir, exist_ok=True)
+    pack = MaskPackWriter(os.path.join(output_dir, 'masks.maskpack'), codec)
+    if jobs == 1:
+        stats = run_serial(files, output_dir, mask_engine, pack=pack, progress=progress)
+    else:
+        stats = run(files, output_dir, jobs, io_threads, inflight, mask_engine, progress, pack=pack)
+    pack.close()
+    print(f"maskpack: {pack.path} ({len(pack.entries)} masks, {pack.size() / 1e6:.2f} MB, {codec})")
+    return stats
+
+
+def report(stats):
+    s = max(stats['seconds'], 1e-9)
+    return (f"{stats['images']} images ({stats['failed']} failed) in {s:.2f} s: "
+            f"{stats['images'] / s:.1f} images/s, read {stats['bytes_in'] / s / 1e6:.1f} MB/s, "
+            f"write {stats['bytes_out'] / s / 1e6:.1f} MB/s")
+
+
+def list_images(input_dir):
+    return sorted(glob.glob(os.path.join(input_dir, "*.jpg")) + glob.glob(os.path.join(input_dir, "*.png")))
+
+
+if __name__ == '__main__':
+    import argparse
+
+    ap = argparse.ArgumentParser(description='lab10-2 차선 마스크 병렬 일괄 처리')
+    ap.add_argument('--input', default='imgs', help='입력 이미지 디렉터리 (*.jpg, *.png)')
+    ap.add_argument('--output', default='results', help='결과 디렉터리')
+    ap.add_argument('--jobs', type=int, default=os.cpu_count(), help='마스크 계산 프로세스 수 (1 이면 기존 방식 직렬)')
+    ap.add_argument('--io-threads', type=int, default=4, help='읽기/디코드, 인코드/쓰기 스레드 수')
+    ap.add_argument('--inflight', type=int, default=None, help='단계별 동시 처리 이미지 수 (기본 jobs x 2)')
+    ap.add_argument('--mask-engine', default='hsv', choices=['hsv', 'lut', 'lut-exact'])
+    ap.add_argument('--progress', type=int, default=0, help='N 장마다 진행 상황 출력')
+    ap.add_argument('--force', action='store_true', help='캐시를 무시하고 전부 다시 처리')
+    ap.add_argument('--format', default='jpg', choices=['jpg', 'maskpack'],
+                    help="'jpg': detected_*.jpg / 'maskpack': 이진 마스크만 masks.maskpack 한 파일에")
+    ap.add_argument('--mask-codec', default='zlib', choices=['zlib', 'bits'],
+                    help="maskpack 저장 방식 ('bits' 는 압축 없이 메모리 매핑으로 바로 읽힘)")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    files = list_images(args.input)
+    if not files:
+        raise SystemExit(f"no images in {args.input}")
+    if args.format == 'maskpack':
+        stats = run_pack(files, args.output, args.jobs, args.io_threads, args.inflight, args.mask_engine,
+                         args.progress, args.mask_codec)
+    else:
+        stats = run_cached(files, args.input, args.output, args.jobs, args.io_threads, args.inflight, args.mask_engine,
+                           args.progress, args.force)
+    print(report(stats))
+    print(f"total {time.perf_counter() - t0:.2f} s (including scan)")
@@ -0,0 +1,166 @@
+import os
+import json
+import zlib
+import struct
+
+import numpy as np
+
+# 이진 마스크 묶음 파일 (.maskpack)
+#   [MAGIC][마스크 0][마스크 1]...[인덱스 JSON][footer: 인덱스 위치/길이 + MAGIC]
+#   마스크 한 장 = 행 단위 비트 패킹 (np.packbits axis=1, 한 행 = ceil(w/8) 바이트)
+#     codec 'bits' : 그대로 -> 메모리 매핑한 파일에서 복사/디코드 없이 (h, ceil(w/8)) 배열로 봄
+#     codec 'zlib' : 패킹한 비트를 deflate (연속된 0/1 구간이 잘 줄어듦, 읽을 때 압축 해제)
+#   인덱스: 이름, 위치, 길이, codec, 크기 -> 파일 이름 또는 순번(프레임 번호)으로 바로 찾음
+#   쓰는 쪽은 순서대로 덧붙이고 close 때 인덱스를 씀 (중간에 전체를 메모리에 두지 않음)
+#
+#   w = MaskPackWriter('masks.maskpack'); w.add('0001.jpg', mask); w.close()
+#   pack = MaskPack('masks.maskpack'); pack['0001.jpg'], pack[0], pack.packed(0)
+
+MAGIC = b'MSKPACK1'
+FOOTER = struct.Struct('<QQ8s')
+CODECS = ('bits', 'zlib')
+
+
+class MaskPackWriter:
+    def __init__(self, path, codec='bits', level=1):
+        if codec not in CODECS:
+            raise ValueError(f"unknown codec: {codec}")
+        self.path = path
+        self.codec = codec
+        self.level = level
+        self.entries = []
+        self._names = set()
+        self._tmp = path + '.tmp'
+        self._f = open(self._tmp, 'wb')
+        self._f.write(MAGIC)
+        self.bytes_in = 0           # 원래 마스크 크기 (1 바이트/픽셀)
+
+    # mask: 0 이 아니면 1 인 2차원 배열 (cv2 마스크 0/255 그대로)
+    def add(self, name, mask):
+        if name in self._names:
+            raise ValueError(f"duplicate mask name: {name}")
+        h, w = mask.shape[:2]
+        data = np.packbits(mask.reshape(h, w) != 0, axis=1)
+        data = data.tobytes() if self.codec == 'bits' else zlib.compress(data, self.level)
+        self.entries.append([name, self._f.tell(), len(data), self.codec, h, w])
+        self._names.add(name)
+        self._f.write(data)
+        self.bytes_in += h * w
+
+    def close(self):
+        if self._f is None:
+            return
+        offset = self._f.tell()
+        index = json.dumps({'entries': self.entries}).encode()
+        self._f.write(index)
+        self._f.write(FOOTER.pack(offset, len(index), MAGIC))
+        self._f.close()
+        self._f = None
+        # 다 쓴 뒤에 이름을 바꿈 (중간에 끊겨도 이전 파일은 그대로)
+        os.replace(self._tmp, self.path)
+
+    def size(self):
+        return os.path.getsize(self.path) if self._f is None else self._f.tell()
+
+
+class MaskPack:
+    def __init__(self, path):
+        self.path = path
+        self._mm = np.memmap(path, np.uint8, 'r')
+        if bytes(self._mm[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"not a maskpack file: {path}")
+        offset, length, magic = FOOTER.unpack(bytes(self._mm[-FOOTER.size:]))
+        if magic != MAGIC:
+            raise ValueError(f"truncated maskpack file: {path}")
+        self.entries = json.loads(bytes(self._mm[offset:offset + length]))['entries']
+        self.names = [e[0] for e in self.entries]
+        self._by_name = {name: i for i, name in enumerate(self.names)}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def index(self, key):
+        return self._by_name[key] if isinstance(key, str) else range(len(self.entries))[key]
+
+    # 패킹된 비트 (h, ceil(w/8)) - 'bits' 면 파일을 그대로 보는 배열 (복사 없음)
+    def packed(self, key):
+        name, off, length, codec, h, w = self.entries[self.index(key)]
+        raw = self._mm[off:off + length]
+        if codec == 'zlib':
+            raw = np.frombuffer(zlib.decompress(raw), np.uint8)
+        return raw.reshape(h, (w + 7) // 8)
+
+    # bool 마스크 (h, w)
+    def bits(self, key):
+        w = self.entries[self.index(key)][5]
+        return np.unpackbits(self.packed(key), axis=1, count=w).view(bool)
+
+    # cv2 마스크 형식 (uint8 0/255)
+    def __getitem__(self, key):
+        return self.bits(key).view(np.uint8) * np.uint8(255)
+
+    # 여러 장을 한 배열로 (학습/분석용, bool (n, h, w))
+    def stack(self, keys=None):
+        keys = range(len(self)) if keys is None else keys
+        return np.stack([self.bits(k) for k in keys])
+
+    def close(self):
+        self._mm = None
+
+
+if __name__ == '__main__':
+    import argparse
+    import glob
+    import time
+
+    import cv2
+    import lane_batch
+
+    ap = argparse.ArgumentParser(description='maskpack vs detected_*.jpg: 크기, 쓰기/읽기 시간')
+    ap.add_argument('--input', default='imgs')
+    ap.add_argument('--repeat', type=int, default=50, help='입력 이미지를 몇 번 반복해서 쓸지 (장 수 늘리기)')
+    ap.add_argument('--out', default='/tmp/maskpack_bench')
+    args = ap.parse_args()
+
+    files = lane_batch.list_images(args.input)
+    imgs = [cv2.resize(cv2.imread(f), lane_batch.size) for f in files]
+    masks = [lane_batch.lane_mask(img) for img in imgs]
+    n = len(masks) * args.repeat
+    os.makedirs(args.out, exist_ok=True)
+
+    # 기존 방식: bitwise_and 결과를 JPEG 로
+    t0 = time.perf_counter()
+    jpg_bytes = 0
+    for i in range(n):
+        img, mask = imgs[i % len(imgs)], masks[i % len(masks)]
+        path = os.path.join(args.out, f"detected_{i:05d}.jpg")
+        cv2.imwrite(path, cv2.bitwise_and(img, img, mask=mask))
+        jpg_bytes += os.path.getsize(path)
+    t_jpg = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for i in range(n):
+        cv2.imread(os.path.join(args.out, f"detected_{i:05d}.jpg"))
+    t_jpg_read = time.perf_counter() - t0
+    for path in glob.glob(os.path.join(args.out, 'detected_*.jpg')):
+        os.remove(path)
+
+    print(f"{n} masks {masks[0].shape[1]}x{masks[0].shape[0]}")
+    print(f"  jpg      {jpg_bytes / 1e6:7.2f} MB  write {n / t_jpg:7.0f}/s  read {n / t_jpg_read:7.0f}/s")
+    for codec in CODECS:
+        path = os.path.join(args.out, f"masks_{codec}.maskpack")
+        t0 = time.perf_counter()
+        w = MaskPackWriter(path, codec)
+        for i in range(n):
+            w.add(f"{i:05d}.jpg", masks[i % len(masks)])
+        w.close()
+        t_write = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        pack = MaskPack(path)
+        for i in range(n):
+            pack.bits(i)
+        t_read = time.perf_counter() - t0
+        assert all(np.array_equal(pack[i], masks[i % len(masks)]) for i in range(len(masks)))
+        assert np.array_equal(pack[f"{len(masks) - 1:05d}.jpg"], masks[-1])
+        size = os.path.getsize(path)
+        print(f"  {codec:<8} {size / 1e6:7.2f} MB  write {n / t_write:7.0f}/s  read {n / t_read:7.0f}/s  "
+              f"({jpg_bytes / size:.0f}x smaller than jpg, {w.bytes_in / size:.0f}x smaller than raw masks)")
@@ -0,0 +1,124 @@
+import os
+import json
+import hashlib
+
+import cv2
+
+# 일괄 처리 결과 캐시: 결과 디렉터리에 manifest(JSON) 를 두고 입력이 바뀐 이미지만 다시 처리
+#   키 = 처리 파라미터 해시 (임계값, 커널, 크기 등 + OpenCV 버전) -> 바뀌면 전부 다시 처리
+#   입력마다 크기 + mtime(ns) + 내용 SHA-1 기록
+#     크기/mtime 이 같으면 파일을 읽지 않고 건너뜀 (다시 실행해도 디렉터리 스캔 비용만)
+#     mtime 만 바뀌었으면 내용 해시로 확인 (복사/touch 된 파일은 다시 처리하지 않음)
+#   입력이 없어진 결과 파일은 지움
+#   항목 키는 입력 디렉터리 기준 상대 경로, 결과는 결과 디렉터리 기준 상대 경로 (실행 위치와 무관)
+#   지우기는 manifest 의 입력 디렉터리가 이번 입력 디렉터리와 같을 때만 (다른 폴더/오타로 결과를 지우지 않음)
+#
+#   cache = ResultCache(output_dir, params, input_dir)
+#   todo = cache.plan(files)            # 처리할 파일만
+#   ... 처리 ... cache.record(path, out_path)
+#   cache.prune(files); cache.save()
+
+MANIFEST = '.manifest.json'
+
+
+def params_key(params):
+    desc = json.dumps(params, sort_keys=True, default=str) + cv2.__version__
+    return hashlib.sha1(desc.encode()).hexdigest()[:16]
+
+
+def file_digest(path, chunk=1 << 20):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(chunk)
+            if not block:
+                break
+            h.update(block)
+    return h.hexdigest()
+
+
+class ResultCache:
+    def __init__(self, output_dir, params, input_dir):
+        self.output_dir = output_dir
+        self.input_dir = input_dir
+        self.path = os.path.join(output_dir, MANIFEST)
+        self.key = params_key(params)
+        self.entries = {}           # 입력 상대 경로 -> {size, mtime_ns, sha1, output(결과 상대 경로)}
+        self.params_changed = False
+        self.same_input = False     # manifest 가 같은 입력 디렉터리의 것인지 (prune 조건)
+        self.hashed = 0             # 빠른 확인(크기/mtime)이 안 돼서 내용을 읽은 파일 수
+        self.removed = 0
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.entries = data.get('entries', {})
+        self.same_input = data.get('input_dir') == os.path.realpath(input_dir)
+        if data.get('params') != self.key:
+            self.params_changed = True
+
+    def _name(self, path):
+        return os.path.relpath(path, self.input_dir)
+
+    def _output(self, e):
+        return os.path.join(self.output_dir, e['output'])
+
+    def _fresh(self, path, st):
+        e = self.entries.get(self._name(path))
+        if self.params_changed or e is None or e['size'] != st.st_size:
+            return False
+        if not os.path.exists(self._output(e)):
+            return False
+        if e['mtime_ns'] == st.st_mtime_ns:
+            return True
+        # mtime 만 바뀜: 내용이 같으면 기록만 갱신
+        self.hashed += 1
+        if file_digest(path) != e['sha1']:
+            return False
+        e['mtime_ns'] = st.st_mtime_ns
+        return True
+
+    # 다시 처리해야 할 파일 목록 (입력 순서 유지)
+    def plan(self, files):
+        todo = []
+        for path in files:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if not self._fresh(path, st):
+                todo.append(path)
+        return todo
+
+    def record(self, path, output, digest=None):
+        st = os.stat(path)
+        self.entries[self._name(path)] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns,
+                                          'sha1': digest or file_digest(path),
+                                          'output': os.path.relpath(output, self.output_dir)}
+
+    # 입력이 없어진 항목과 그 결과 파일 삭제 (manifest 가 같은 입력 디렉터리의 것일 때만)
+    def prune(self, files):
+        if not self.same_input:
+            return
+        keep = {self._name(p) for p in files}
+        for name in [n for n in self.entries if n not in keep]:
+            out = self._output(self.entries.pop(name))
+            if os.path.exists(out):
+                os.remove(out)
+                self.removed += 1
+
+    def save(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'params': self.key, 'input_dir': os.path.realpath(self.input_dir),
+                       'entries': self.entries}, f)
+        os.replace(tmp, self.path)
+        self.params_changed = False
+        self.same_input = True
+
+    def report(self, total, todo):
+        why = ' (parameters changed)' if self.params_changed else ''
+        return (f"cache: {total - len(todo)} of {total} up to date, {len(todo)} to process{why}, "
+                f"{self.hashed} re-hashed, {self.removed} stale outputs removed")
@@ -1,16 +1,52 @@
 import threading
 import time
-import RPi.GPIO as GPIO
+import math
+from gpio import get_gpio
+from hwpwm import open_pwm, close_pwm
+
+GPIO = get_gpio()
+
+
+# (throttle, steer) -> (왼쪽, 오른쪽) 바퀴 비율 (-1..1)
+# 한쪽이 1을 넘으면 좌우 비율을 유지한 채 줄임
+def mix_arcade(throttle, steer):
+    left, right = throttle + steer, throttle - steer
+    m = max(1.0, abs(left), abs(right))
+    return left / m, right / m
+
+
+# lab8 조이스틱 (각도: 90 앞, 0 오른쪽, 180 왼쪽, 270 뒤 / 크기: 0..1) -> 바퀴 비율
+# pivot=False: 좌우 바퀴가 반대로 돌아야 하는 각도(0, 180 도 주변)는 제자리 회전 대신
+#   기존 lab8 처럼 바깥 바퀴만 magnitude 로, 안쪽 바퀴는 정지
+def mix_joystick(angle, magnitude, deadzone=0.1, pivot=False):
+    if magnitude <= deadzone:
+        return 0.0, 0.0
+    magnitude = min(magnitude, 1.0)
+    rad = math.radians(angle)
+    left, right = mix_arcade(magnitude * math.sin(rad), magnitude * math.cos(rad))
+    if not pivot and left * right < 0:
+        return (magnitude, 0.0) if left > 0 else (0.0, magnitude)
+    return left, right
+
 
 class Drive:
     def __init__(self):
         self.pins = {"SW1":5,"SW2":6,"SW3":13,"SW4":19,"PWMA":18,"AIN1":22,"AIN2":27,"PWMB":23,"BIN1":25,"BIN2":24}    
+        self.dir_pins = [self.pins["AIN1"], self.pins["AIN2"], self.pins["BIN1"], self.pins["BIN2"]]
         self.config_GPIO()
-        self.L_Motor = GPIO.PWM(self.pins["PWMA"],500)
+        # PWMA(GPIO18) 는 하드웨어 PWM 이 가능하면 sysfs 로, PWMB(GPIO23) 는 소프트웨어 PWM (hwpwm.py)
+        self.L_Motor = open_pwm(GPIO, self.pins["PWMA"], 500)
         self.L_Motor.start(0)
-        self.R_Motor = GPIO.PWM(self.pins["PWMB"],500)
+        self.R_Motor = open_pwm(GPIO, self.pins["PWMB"], 500)
         self.R_Motor.start(0)
 
+        # 마지막으로 적용한 상태: 바뀐 것만 쓰기 (GPIO 호출은 가장 뜨거운 경로)
+        self._lock = threading.Lock()
+        self._dirs = None           # (AIN1, AIN2, BIN1, BIN2)
+        self._duty = [0, 0]         # (왼쪽, 오른쪽) start(0) 상태
+        self.writes = 0             # 실제로 한 GPIO/PWM 호출 수
+        self.skipped = 0            # 값이 같아서 건너뛴 호출 수
+
     def config_GPIO(self):
         GPIO.setwarnings(False)
         GPIO.setmode(GPIO.BCM)
@@ -18,55 +54,82 @@ class Drive:
         GPIO.setup(self.pins["SW2"],GPIO.IN,pull_up_down=GPIO.PUD_DOWN)
         GPIO.setup(self.pins["SW3"],GPIO.IN,pull_up_down=GPIO.PUD_DOWN)
         GPIO.setup(self.pins["SW4"],GPIO.IN,pull_up_down=GPIO.PUD_DOWN)
-        GPIO.setup(self.pins["PWMA"],GPIO.OUT)
+        # PWMA/PWMB 는 open_pwm 이 설정 (하드웨어 PWM 핀을 GPIO 출력으로 바꾸지 않도록)
         GPIO.setup(self.pins["AIN1"],GPIO.OUT)
         GPIO.setup(self.pins["AIN2"],GPIO.OUT)
-        GPIO.setup(self.pins["PWMB"],GPIO.OUT)
         GPIO.setup(self.pins["BIN1"],GPIO.OUT)
         GPIO.setup(self.pins["BIN2"],GPIO.OUT)
 
     def clean_GPIO(self):
+        close_pwm(self.L_Motor)
+        close_pwm(self.R_Motor)
         GPIO.cleanup()
+        # 정리 뒤 다시 쓰면 캐시와 상관없이 방향/듀티를 모두 새로 씀
+        self._dirs = None
+        self._duty = [None, None]
     
+    # 방향 핀 4개는 한 번의 GPIO.output(list, values) 로, 듀티는 바뀐 바퀴만
+    def _apply(self, dirs, l_speed, r_speed):
+        with self._lock:
+            if dirs != self._dirs:
+                GPIO.output(self.dir_pins, dirs)
+                self._dirs = dirs
+                self.writes += 1
+            else:
+                self.skipped += 1
+            if l_speed != self._duty[0]:
+                self.L_Motor.ChangeDutyCycle(l_speed)
+                self._duty[0] = l_speed
+                self.writes += 1
+            else:
+                self.skipped += 1
+            if r_speed != self._duty[1]:
+                self.R_Motor.ChangeDutyCycle(r_speed)
+                self._duty[1] = r_speed
+                self.writes += 1
+            else:
+                self.skipped += 1
+
+    def stats(self):
+        return {'writes': self.writes, 'skipped': self.skipped}
+
+    # 바퀴별 부호 있는 듀티 (-100..100, 음수는 후진): 한 번에 한 상태만 적용
+    # coast=True: 듀티 0 인 바퀴는 방향 핀 둘 다 LOW (lab7w3/lab8 의 기존 정지 방식, 관성으로 멈춤)
+    def set_wheels(self, left, right, coast=False):
+        left = int(round(min(max(left, -100), 100)))
+        right = int(round(min(max(right, -100), 100)))
+        l_dir = (0, 0) if coast and left == 0 else (1, 0) if left < 0 else (0, 1)
+        r_dir = (0, 0) if coast and right == 0 else (1, 0) if right < 0 else (0, 1)
+        self._apply(l_dir + r_dir, abs(left), abs(right))
+
+    # 방향 핀 모두 LOW + 듀티 0
+    def coast(self):
+        self.set_wheels(0, 0, coast=True)
+
+    # 전진량/조향량 (-1..1) 으로 주행, speed 는 최대 듀티
+    def drive_arcade(self, throttle, steer, speed=100):
+        left, right = mix_arcade(throttle, steer)
+        self.set_wheels(left * speed, right * speed)
+
+    # 조이스틱 (각도, 크기) 로 주행
+    def drive_joystick(self, angle, magnitude, speed=100, pivot=False, coast=False):
+        left, right = mix_joystick(angle, magnitude, pivot=pivot)
+        self.set_wheels(left * speed, right * speed, coast)
+
     def motor_go(self, speed):
-        GPIO.output(self.pins["AIN1"],0)
-        GPIO.output(self.pins["AIN2"],1)
-        self.L_Motor.ChangeDutyCycle(speed)
-        GPIO.output(self.pins["BIN1"],0)
-        GPIO.output(self.pins["BIN2"],1)
-        self.R_Motor.ChangeDutyCycle(speed)
+        self.set_wheels(speed, speed)
 
     def motor_back(self, speed):
-        GPIO.output(self.pins["AIN1"],1)
-        GPIO.output(self.pins["AIN2"],0)
-        self.L_Motor.ChangeDutyCycle(speed)
-        GPIO.output(self.pins["BIN1"],1)
-        GPIO.output(self.pins["BIN2"],0)
-        self.R_Motor.ChangeDutyCycle(speed)
+        self.set_wheels(-speed, -speed)
         
     def motor_left(self, speed):
-        GPIO.output(self.pins["AIN1"],1)
-        GPIO.output(self.pins["AIN2"],0)
-        self.L_Motor.ChangeDutyCycle(speed)
-        GPIO.output(self.pins["BIN1"],0)
-        GPIO.output(self.pins["BIN2"],1)
-        self.R_Motor.ChangeDutyCycle(speed)
+        self.set_wheels(-speed, speed)
         
     def motor_right(self, speed):
-        GPIO.output(self.pins["AIN1"],0)
-        GPIO.output(self.pins["AIN2"],1)
-        self.L_Motor.ChangeDutyCycle(speed)
-        GPIO.output(self.pins["BIN1"],1)
-        GPIO.output(self.pins["BIN2"],0)
-        self.R_Motor.ChangeDutyCycle(speed)
+        self.set_wheels(speed, -speed)
 
     def motor_stop(self):
-        GPIO.output(self.pins["AIN1"],0)
-        GPIO.output(self.pins["AIN2"],1)
-        self.L_Motor.ChangeDutyCycle(0)
-        GPIO.output(self.pins["BIN1"],0)
-        GPIO.output(self.pins["BIN2"],1)
-        self.R_Motor.ChangeDutyCycle(0)
+        self.set_wheels(0, 0)
 
 if __name__ == '__main__':
 
@@ -0,0 +1,252 @@
+import os
+import glob
+import threading
+import time
+import math
+from collections import namedtuple
+
+import cv2 as cv
+import numpy as np
+
+# 캡처 프레임: 이미지 + 캡처 시각(time.monotonic) + 순번
+Frame = namedtuple('Frame', ['image', 'stamp', 'seq'])
+
+
+# 실제 카메라 (V4L2)
+class CameraSource:
+    def __init__(self, index=0, width=320, height=240):
+        self.cap = cv.VideoCapture(index)
+        self.cap.set(cv.CAP_PROP_FRAME_WIDTH, width)
+        self.cap.set(cv.CAP_PROP_FRAME_HEIGHT, height)
+        # 드라이버 버퍼를 최소로 -> 오래된 프레임이 쌓이지 않게
+        self.cap.set(cv.CAP_PROP_BUFFERSIZE, 1)
+
+    def is_opened(self):
+        return self.cap.isOpened()
+
+    def read(self):
+        return self.cap.read()
+
+    def release(self):
+        self.cap.release()
+
+
+# 녹화 영상 (예: week10의 mp4)
+# realtime=True 이면 파일 FPS에 맞춰 읽어서 카메라처럼 동작
+class VideoFileSource:
+    def __init__(self, path, width=None, height=None, realtime=True, loop=False):
+        self.path = path
+        self.cap = cv.VideoCapture(path)
+        self.size = (width, height) if width and height else None
+        self.realtime = realtime
+        self.loop = loop
+        fps = self.cap.get(cv.CAP_PROP_FPS)
+        self.fps = fps if fps and fps > 0 else 30.0
+        self.period = 1.0 / self.fps
+        self._next_t = None
+
+    def is_opened(self):
+        return self.cap.isOpened()
+
+    def read(self):
+        if self.realtime:
+            now = time.monotonic()
+            if self._next_t is None:
+                self._next_t = now
+            if self._next_t > now:
+                time.sleep(self._next_t - now)
+            self._next_t += self.period
+
+        ret, frame = self.cap.read()
+        if not ret and self.loop:
+            self.cap.set(cv.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read()
+        if ret and self.size is not None:
+            frame = cv.resize(frame, self.size)
+        return ret, frame
+
+    def release(self):
+        self.cap.release()
+
+
+# 이미지 디렉터리 (파일 이름 순서), fps 는 realtime 재생 속도와 프레임 시각 계산용
+class ImageDirSource:
+    def __init__(self, path, width=None, height=None, fps=30.0, realtime=True, loop=False):
+        self.files = sorted(f for ext in ('*.jpg', '*.jpeg', '*.png', '*.bmp')
+                            for f in glob.glob(os.path.join(path, ext)))
+        self.size = (width, height) if width and height else None
+        self.fps = fps
+        self.realtime = realtime
+        self.loop = loop
+        self.index = 0
+        self._next_t = None
+
+    def is_opened(self):
+        return bool(self.files)
+
+    def read(self):
+        if self.index >= len(self.files):
+            if not self.loop or not self.files:
+                return False, None
+            self.index = 0
+        if self.realtime:
+            now = time.monotonic()
+            if self._next_t is None:
+                self._next_t = now
+            if self._next_t > now:
+                time.sleep(self._next_t - now)
+            self._next_t += 1.0 / self.fps
+
+        frame = cv.imread(self.files[self.index])
+        self.index += 1
+        if frame is not None and self.size is not None:
+            frame = cv.resize(frame, self.size)
+        return frame is not None, frame
+
+    def release(self):
+        pass
+
+
+# 합성 영상: 회색 바닥 위의 노란 선이 좌우로 흔들림 (하드웨어 없이 테스트용)
+class SyntheticSource:
+    def __init__(self, width=320, height=240, fps=30.0, period=4.0, line_width=20,
+                 realtime=True, max_frames=None):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.period = period
+        self.line_width = line_width
+        self.realtime = realtime
+        self.max_frames = max_frames
+        self.count = 0
+        self._next_t = None
+        self._bg = np.full((height, width, 3), 90, np.uint8)
+
+    def is_opened(self):
+        return True
+
+    def line_x(self, t, y):
+        # 시각 t, 행 y 에서의 선 중심 (위로 갈수록 위상이 앞섬 -> 곡선처럼 보임)
+        phase = 2 * math.pi * t / self.period + (1.0 - y / self.height) * 0.8
+        return self.width / 2 + self.width * 0.3 * math.sin(phase)
+
+    def read(self):
+        if self.max_frames is not None and self.count >= self.max_frames:
+            return False, None
+        if self.realtime:
+            now = time.monotonic()
+            if self._next_t is None:
+                self._next_t = now
+            if self._next_t > now:
+                time.sleep(self._next_t - now)
+            self._next_t += 1.0 / self.fps
+
+        t = self.count / self.fps
+        self.count += 1
+        frame = self._bg.copy()
+        ys = np.arange(0, self.height + 1, self.height // 8)
+        pts = np.array([[self.line_x(t, y), y] for y in ys], np.int32)
+        cv.polylines(frame, [pts], False, (0, 255, 255), self.line_width)
+        return True, frame
+
+    def release(self):
+        pass
+
+
+# 소스 지정 문자열 해석: 'cam', 'cam:1', 'synthetic', 이미지 디렉터리, 또는 영상 파일 경로
+def open_source(spec, width=320, height=240, realtime=True, loop=False):
+    if spec is None or spec == 'cam':
+        return CameraSource(0, width, height)
+    if spec.startswith('cam:'):
+        return CameraSource(int(spec[4:]), width, height)
+    if spec == 'synthetic':
+        return SyntheticSource(width, height, realtime=realtime)
+    if os.path.isdir(spec):
+        return ImageDirSource(spec, width, height, realtime=realtime, loop=loop)
+    return VideoFileSource(spec, width, height, realtime=realtime, loop=loop)
+
+
+# 별도 스레드에서 계속 읽고 가장 최신 프레임 하나만 보관
+# 소비자가 가져가기 전에 덮어쓴 프레임은 dropped 로 집계
+class LatestFrameGrabber:
+    def __init__(self, source):
+        self.source = source
+        self.captured = 0
+        self.dropped = 0
+        self.eof = False
+        self.running = False
+        self._cond = threading.Condition()
+        self._frame = None
+        self._last_read_seq = 0
+        self._thread = None
+
+    def start(self):
+        self.running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        seq = 0
+        while self.running:
+            ret, image = self.source.read()
+            stamp = time.monotonic()
+            if not ret:
+                with self._cond:
+                    self.eof = True
+                    self.running = False
+                    self._cond.notify_all()
+                break
+            seq += 1
+            with self._cond:
+                if self._frame is not None and self._frame.seq > self._last_read_seq:
+                    self.dropped += 1
+                self._frame = Frame(image, stamp, seq)
+                self.captured += 1
+                self._cond.notify_all()
+
+    def _has_new(self):
+        return self._frame is not None and self._frame.seq > self._last_read_seq
+
+    # 아직 읽지 않은 최신 프레임을 반환 (timeout 이내에 없으면 None)
+    def read(self, timeout=1.0):
+        with self._cond:
+            self._cond.wait_for(lambda: self._has_new() or not self.running, timeout)
+            if not self._has_new():
+                return None
+            self._last_read_seq = self._frame.seq
+            return self._frame
+
+    def stop(self):
+        self.running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+        self.source.release()
+
+    def stats(self):
+        return {'captured': self.captured, 'dropped': self.dropped}
+
+
+if __name__ == '__main__':
+    import argparse
+
+    ap = argparse.ArgumentParser(description='latest-frame grabber 테스트')
+    ap.add_argument('--source', default='synthetic')
+    ap.add_argument('--seconds', type=float, default=3.0)
+    ap.add_argument('--work-ms', type=float, default=40.0, help='소비자 처리 시간 흉내 (ms)')
+    args = ap.parse_args()
+
+    grabber = LatestFrameGrabber(open_source(args.source)).start()
+    lat = []
+    t_end = time.monotonic() + args.seconds
+    while time.monotonic() < t_end:
+        f = grabber.read()
+        if f is None:
+            break
+        time.sleep(args.work_ms / 1000.0)
+        lat.append(time.monotonic() - f.stamp)
+    grabber.stop()
+    if lat:
+        lat_ms = np.array(lat) * 1000
+        print(f"frames used: {len(lat)}  {grabber.stats()}")
+        print(f"capture->decision latency ms: mean {lat_ms.mean():.1f}  max {lat_ms.max():.1f}")
@@ -0,0 +1,164 @@
+import threading
+import time
+
+import numpy as np
+
+
+# alpha-beta 필터: 비전 측정 사이의 라인 위치를 속도로 외삽
+class AlphaBetaFilter:
+    def __init__(self, alpha=0.6, beta=0.2):
+        self.alpha = alpha
+        self.beta = beta
+        self.x = None       # 위치 추정
+        self.v = 0.0        # 속도 추정 (단위/초)
+        self.t = None       # 마지막 측정 시각
+
+    def reset(self):
+        self.x, self.v, self.t = None, 0.0, None
+
+    def update(self, z, t):
+        if self.x is None:
+            self.x, self.v, self.t = z, 0.0, t
+            return self.x
+        dt = max(t - self.t, 1e-3)
+        pred = self.x + self.v * dt
+        r = z - pred
+        self.x = pred + self.alpha * r
+        self.v += self.beta * r / dt
+        self.t = t
+        return self.x
+
+    def predict(self, t):
+        if self.x is None:
+            return None
+        return self.x + self.v * (t - self.t)
+
+
+# PID + 출력 제한 + 출력 변화율 제한
+class PID:
+    def __init__(self, kp, ki=0.0, kd=0.0, out_limit=1.0, rate_limit=None, i_limit=0.5):
+        self.kp, self.ki, self.kd = kp, ki, kd
+        self.out_limit = out_limit
+        self.rate_limit = rate_limit    # 초당 최대 출력 변화량 (None 이면 제한 없음)
+        self.i_limit = i_limit
+        self.reset()
+
+    def reset(self):
+        self.integral = 0.0
+        self.prev_err = None
+        self.out = 0.0
+
+    def update(self, err, dt):
+        self.integral = min(max(self.integral + err * dt, -self.i_limit), self.i_limit)
+        deriv = 0.0 if self.prev_err is None or dt <= 0 else (err - self.prev_err) / dt
+        self.prev_err = err
+        u = self.kp * err + self.ki * self.integral + self.kd * deriv
+        u = min(max(u, -self.out_limit), self.out_limit)
+        if self.rate_limit is not None:
+            step = self.rate_limit * dt
+            u = min(max(u, self.out - step), self.out + step)
+        self.out = u
+        return u
+
+
+# 카메라 프레임률과 무관하게 고정 주기로 도는 제어 루프
+# 비전은 set_measurement 로 최신 측정만 넘기고, 루프는 매 주기 필터로 현재 위치를 예측해 조향
+# 측정이 None(라인 소실) 이거나 너무 오래되면 조향을 멈추고 비전 쪽 소실 처리에 맡김
+class ControlLoop:
+    def __init__(self, actuate, pid, rate_hz=100.0, filt=None, max_age=0.25, log_size=4096, heartbeat=None):
+        self.actuate = actuate          # actuate(steer): 조향값(-1..1)을 모터에 적용
+        self.heartbeat = heartbeat      # 매 주기 호출 (supervisor.py 감시용)
+        self.pid = pid
+        self.period = 1.0 / rate_hz
+        self.filter = filt or AlphaBetaFilter()
+        self.max_age = max_age
+        self.running = False
+        self._lock = threading.Lock()
+        self._meas = None               # (err, stamp, ff) 또는 None
+        self._thread = None
+
+        # 지터/추정 나이 기록 (링 버퍼)
+        self._log = np.zeros((log_size, 4))   # 시각, 지터, 추정 나이, 출력
+        self._n = 0
+        self.ticks = 0
+        self.idle_ticks = 0
+
+    def set_measurement(self, err, stamp, ff=0.0):
+        with self._lock:
+            self._meas = None if err is None else (err, stamp, ff)
+
+    def start(self):
+        self.running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+
+    def _run(self):
+        next_t = time.monotonic()
+        last_stamp = None
+        prev_t = None
+        while self.running:
+            next_t += self.period
+            delay = next_t - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            now = time.monotonic()
+            jitter = now - next_t
+            if jitter > self.period:
+                next_t = now                    # 한 주기 넘게 밀렸으면 따라잡지 않고 다시 맞춤
+            dt = self.period if prev_t is None else now - prev_t
+            prev_t = now
+            self.ticks += 1
+            if self.heartbeat is not None:
+                self.heartbeat()
+
+            with self._lock:
+                meas = self._meas
+            if meas is None or now - meas[1] > self.max_age:
+                # 측정 없음: 필터/PID 를 초기화하고 비전의 소실 처리에 맡김
+                if last_stamp is not None:
+                    self.filter.reset()
+                    self.pid.reset()
+                    last_stamp = None
+                self.idle_ticks += 1
+                self._record(now, jitter, float('nan'), float('nan'))
+                continue
+
+            err, stamp, ff = meas
+            if stamp != last_stamp:
+                self.filter.update(err, stamp)
+                last_stamp = stamp
+            est = self.filter.predict(now)
+            u = self.pid.update(est, dt) + ff
+            self.actuate(min(max(u, -1.0), 1.0))
+            self._record(now, jitter, now - stamp, u)
+
+    def _record(self, t, jitter, age, u):
+        self._log[self._n % len(self._log)] = (t, jitter, age, u)
+        self._n += 1
+
+    def _recent(self):
+        return self._log[:min(self._n, len(self._log))]
+
+    def report(self):
+        log = self._recent()
+        if not len(log):
+            return 'control loop: no ticks'
+        jit = log[:, 1] * 1000
+        age = log[:, 2][~np.isnan(log[:, 2])] * 1000
+        line = (f"control loop {1 / self.period:.0f} Hz  ticks {self.ticks} (idle {self.idle_ticks})  "
+                f"jitter ms p50 {np.percentile(jit, 50):.2f} p99 {np.percentile(jit, 99):.2f} max {jit.max():.2f}")
+        if len(age):
+            line += f"  estimate age ms p50 {np.percentile(age, 50):.1f} max {age.max():.1f}"
+        return line
+
+    # 기록을 CSV 로 저장 (시각, 지터, 추정 나이, 출력)
+    def dump(self, path):
+        log = self._recent()
+        log = log[np.argsort(log[:, 0])]
+        np.savetxt(path, log, delimiter=',', header='t,jitter,age,steer', comments='')
@@ -0,0 +1,172 @@
+import os
+import sys
+import select
+import threading
+from collections import deque
+
+import cv2 as cv
+
+try:
+    import termios
+    import tty
+except ImportError:
+    termios = None
+
+# 표시 모드
+#   none      : 창 없음 (SSH 헤드리스), 키 입력은 터미널에서
+#   every:N   : N 프레임마다 한 번만 그려서 표시
+#   thread    : 별도의 낮은 우선순위 스레드가 표시 (루프는 기다리지 않음)
+
+
+# 터미널 논블로킹 키 입력 (cv.waitKey 대신)
+class TerminalKeyReader:
+    def __init__(self):
+        self.fd = None
+        self._old = None
+        if termios is not None and sys.stdin.isatty():
+            self.fd = sys.stdin.fileno()
+            self._old = termios.tcgetattr(self.fd)
+            tty.setcbreak(self.fd)
+
+    # 눌린 키의 코드, 없으면 -1 (기다리지 않음)
+    def read(self):
+        if self.fd is None:
+            return -1
+        ready, _, _ = select.select([self.fd], [], [], 0)
+        if not ready:
+            return -1
+        ch = os.read(self.fd, 1)
+        return ch[0] if ch else -1
+
+    def close(self):
+        if self._old is not None:
+            termios.tcsetattr(self.fd, termios.TCSADRAIN, self._old)
+            self._old = None
+
+
+class Display:
+    def __init__(self, mode='every:1', every_default=5):
+        self.every_default = every_default
+        self.keys = TerminalKeyReader()
+        self.mode = None
+        self.every = 1
+        self.shown = 0
+        self.skipped = 0
+        self._count = 0
+        self._gui_main = False
+        self._thread = None
+        self._thread_run = False
+        self._slot = None
+        self._slot_cond = threading.Condition()
+        self._thread_keys = deque()    # 표시 스레드가 받은 키 (append/popleft 는 스레드 안전)
+        self.set_mode(mode)
+
+    def set_mode(self, mode):
+        if mode.startswith('every'):
+            n = mode.split(':', 1)[1] if ':' in mode else '1'
+            every = max(1, int(n))
+            mode = 'every'
+        elif mode in ('none', 'thread'):
+            every = 1
+        else:
+            raise ValueError(f"unknown display mode: {mode}")
+
+        # 이전 모드 정리
+        if self.mode == 'thread' and mode != 'thread':
+            self._stop_thread()
+        if self._gui_main and mode != 'every':
+            cv.destroyAllWindows()
+            self._gui_main = False
+
+        self.mode, self.every = mode, every
+        if mode == 'thread' and self._thread is None:
+            self._start_thread()
+        print(f"display mode: {self.describe()}")
+
+    def describe(self):
+        return f"every:{self.every}" if self.mode == 'every' else self.mode
+
+    # 키로 모드 순환: every:1 -> every:N -> none -> thread -> every:1
+    def cycle(self):
+        order = ['every:1', f'every:{self.every_default}', 'none', 'thread']
+        cur = self.describe()
+        nxt = order[(order.index(cur) + 1) % len(order)] if cur in order else order[0]
+        self.set_mode(nxt)
+
+    # 이번 프레임을 표시할지: False 면 복사/그리기/리사이즈를 건너뜀
+    def want(self):
+        self._count += 1
+        if self.mode == 'none':
+            ok = False
+        elif self.mode == 'every':
+            ok = self._count % self.every == 0
+        else:
+            with self._slot_cond:
+                ok = self._slot is None     # 표시 스레드가 아직 바쁘면 그리지 않음
+        if not ok:
+            self.skipped += 1
+        return ok
+
+    def show(self, name, img):
+        if self.mode == 'every':
+            cv.imshow(name, img)
+            self._gui_main = True
+            self.shown += 1
+        elif self.mode == 'thread':
+            with self._slot_cond:
+                self._slot = (name, img)
+                self._slot_cond.notify()
+
+    # 키 입력: 터미널 우선, 창이 있으면 GUI 이벤트도 처리
+    def poll_key(self):
+        key = self.keys.read()
+        if key > 0:
+            return key
+        if self.mode == 'every' and self._gui_main:
+            return cv.waitKey(1)
+        if self.mode == 'thread':
+            try:
+                return self._thread_keys.popleft()
+            except IndexError:
+                pass
+        return -1
+
+    def _start_thread(self):
+        self._thread_run = True
+        self._thread = threading.Thread(target=self._run_thread, daemon=True)
+        self._thread.start()
+
+    def _stop_thread(self):
+        self._thread_run = False
+        with self._slot_cond:
+            self._slot_cond.notify()
+        self._thread.join(timeout=1.0)
+        self._thread = None
+
+    def _run_thread(self):
+        # 표시 스레드는 nice 값을 올려서 비전/제어보다 뒤로
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 10)
+        except (AttributeError, OSError):
+            pass
+        while self._thread_run:
+            with self._slot_cond:
+                self._slot_cond.wait_for(lambda: self._slot is not None or not self._thread_run, 0.05)
+                item = self._slot
+            if item is not None:
+                cv.imshow(item[0], item[1])
+                self.shown += 1
+                with self._slot_cond:
+                    self._slot = None
+            key = cv.waitKey(1)
+            if key > 0:
+                self._thread_keys.append(key)
+        cv.destroyAllWindows()
+
+    def close(self):
+        if self._thread is not None:
+            self._stop_thread()
+        if self._gui_main:
+            cv.destroyAllWindows()
+            self._gui_main = False
+        self.keys.close()
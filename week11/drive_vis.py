@@ -1,16 +1,25 @@
 import cv2 as cv
 import numpy as np
-import threading, time
+import time
+import argparse
 import SDcar 
+from display import Display
+from instrument import Tracer
+from supervisor import Supervisor
 
-def func_thread():
-    i = 0
-    while True:
-        print("alive!!")    
-        time.sleep(1)
-        i = i+1
-        if is_running is False:
-            break
+# 터미널(헤드리스)에서는 숫자키 8/2/4/6/5 를 키패드 코드로 바꿔서 처리
+TERM_KEYPAD = {ord('8'): 184, ord('2'): 178, ord('4'): 180, ord('6'): 182, ord('5'): 181}
+
+# 감시 스레드: 카메라 루프가 deadline 을 넘기면 화면 끄기 -> 정지 (supervisor.py)
+# 화면 끄기는 GUI 라서 메인 루프가 다음 바퀴에 처리
+display_off_requested = False
+
+def request_display_off():
+    global display_off_requested
+    display_off_requested = True
+
+def supervisor_stop():
+    car.motor_stop()
 
 def key_cmd(which_key):
     print('which_key', which_key)
@@ -34,9 +43,12 @@ def key_cmd(which_key):
         car.motor_stop()
         print('exit')        
         is_exit = True
+    elif which_key & 0xFF == ord('d'):
+        display.cycle()
     return is_exit  
 
 def main():
+    global display_off_requested
 
     camera = cv.VideoCapture(0)
     camera.set(cv.CAP_PROP_FRAME_WIDTH,v_x) 
@@ -45,37 +57,54 @@ def main():
     try:
         while( camera.isOpened() ):
             ret, frame = camera.read()
+            row = tracer.begin()
             frame = cv.flip(frame,-1)
-            cv.imshow('camera',frame)
+            if display.want():
+                display.show('camera', tracer.overlay(frame))
+                tracer.mark(row, 'display')
 
             # image processing start here
 
             # image processing end here
 
             is_exit = False
-            which_key = cv.waitKey(20)
+            which_key = display.poll_key()
             if which_key > 0:
-                is_exit = key_cmd(which_key)    
+                is_exit = key_cmd(TERM_KEYPAD.get(which_key, which_key))    
+            tracer.mark(row, 'control')
+            supervisor.beat('vision')
+            if display_off_requested:
+                display_off_requested = False
+                display.set_mode('none')
             if is_exit is True:
-                cv.destroyAllWindows()
                 break
     except Exception as e:
         print(e)
-        global is_running
-        is_running = False
+    finally:
+        display.close()
+        print(tracer.report())
 
 if __name__ == '__main__':
 
     v_x = 320
     v_y = 240
 
-    t_task1 = threading.Thread(target = func_thread)
-    t_task1.start()
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--display', default='every:1',
+                    help="'none'(헤드리스, 터미널 키 입력), 'every:N', 'thread' / 실행 중 'd' 키로 전환")
+    ap.add_argument('--trace', help='프레임별 단계 시각 기록 경로 (.csv, 그 외는 float64 원시 배열)')
+    args = ap.parse_args()
+    display = Display(args.display)
+    # 카메라 읽기 직후 -> 화면 표시 -> 키 명령 적용 (instrument.py)
+    tracer = Tracer(['capture', 'display', 'control'], path=args.trace)
 
     car = SDcar.Drive()
-    
-    is_running = True
+    supervisor = Supervisor({'vision': 0.2}, [('display off', request_display_off)], supervisor_stop,
+                            stop_after=0.5, report_s=5.0).start()
+
     main() 
-    is_running = False
+    supervisor.close()
+    print(supervisor.report())
+    tracer.close()
     car.clean_GPIO()
 
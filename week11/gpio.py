@@ -0,0 +1,451 @@
+import os
+import threading
+import time
+
+import numpy as np
+
+# GPIO 백엔드
+#   rpi : 실제 RPi.GPIO (SDCAR_GPIO_TRACE=1 이면 호출마다 시간/비용 기록)
+#   sim : 라즈베리파이 없이 도는 시뮬레이션 GPIO, 모든 핀 쓰기/PWM 변경/입력 읽기를 기록
+#         입력 엣지(스위치 누름)를 스크립트로 재생하고 add_event_detect 콜백도 호출
+# get_gpio() 는 RPi.GPIO 모듈과 같은 모양의 객체를 돌려줌 -> 기존 코드는 import 한 줄만 바꾸면 됨
+#
+# 환경 변수
+#   SDCAR_GPIO=rpi|sim|auto (기본 auto: RPi.GPIO 를 못 불러오면 sim)
+#   SDCAR_GPIO_TRACE=1      : rpi 백엔드도 기록
+#   SDCAR_GPIO_SCRIPT=파일  : sim 입력 스크립트 ("시각(초) 핀 값" 한 줄에 하나, # 주석)
+
+OPS = ('setup', 'out', 'in', 'pwm_start', 'duty', 'freq', 'pwm_stop', 'edge', 'cleanup')
+OP_CODE = {op: i for i, op in enumerate(OPS)}
+
+# 기록 한 칸: 시각(monotonic), 호출 시간(초), 동작, 핀, 값
+LOG_DTYPE = np.dtype([('t', 'f8'), ('dur', 'f4'), ('op', 'u1'), ('pin', 'i2'), ('value', 'f4')])
+
+
+# 배열 기반 호출 기록 (가득 차면 두 배로 늘림)
+class GPIOLog:
+    def __init__(self, size=4096):
+        self.buf = np.zeros(size, LOG_DTYPE)
+        self.n = 0
+        self.t0 = time.monotonic()
+        self._lock = threading.Lock()
+
+    def add(self, op, pin, value, t, dur=0.0):
+        with self._lock:
+            if self.n == len(self.buf):
+                self.buf = np.concatenate((self.buf, np.zeros(len(self.buf), LOG_DTYPE)))
+            self.buf[self.n] = (t, dur, OP_CODE[op], pin, value)
+            self.n += 1
+
+    def records(self, op=None, pin=None):
+        rec = self.buf[:self.n]
+        if op is not None:
+            rec = rec[rec['op'] == OP_CODE[op]]
+        if pin is not None:
+            rec = rec[rec['pin'] == pin]
+        return rec
+
+    def clear(self):
+        with self._lock:
+            self.n = 0
+            self.t0 = time.monotonic()
+
+    # 동작별 횟수, 초당 횟수, 평균 호출 시간(us)
+    def summary(self):
+        rec = self.records()
+        span = max((rec['t'][-1] if len(rec) else time.monotonic()) - self.t0, 1e-6)
+        out = {}
+        for op in OPS:
+            r = rec[rec['op'] == OP_CODE[op]]
+            if len(r):
+                out[op] = {'count': len(r), 'rate': len(r) / span, 'cost_us': float(r['dur'].mean()) * 1e6}
+        return out
+
+    def report(self):
+        parts = [f"{op} {s['count']} ({s['rate']:.0f}/s, {s['cost_us']:.1f} us)" for op, s in self.summary().items()]
+        return 'gpio  ' + ('  '.join(parts) if parts else 'no calls')
+
+    # CSV 로 저장 (t 는 기록 시작 기준 초)
+    def dump(self, path):
+        rec = self.records()
+        ops = np.array(OPS)[rec['op']]
+        with open(path, 'w') as f:
+            f.write('t,dur,op,pin,value\n')
+            for t, dur, op, pin, value in zip(rec['t'] - self.t0, rec['dur'], ops, rec['pin'], rec['value']):
+                f.write(f"{t:.6f},{dur:.9f},{op},{pin},{value:g}\n")
+
+
+# 핀 번호 또는 목록 -> 목록
+def _pins(channel):
+    return list(channel) if isinstance(channel, (list, tuple)) else [channel]
+
+
+class SimPWM:
+    def __init__(self, gpio, pin, freq):
+        self.gpio, self.pin = gpio, pin
+        self.freq = freq
+        self.duty = 0.0
+        self.running = False
+        gpio._record('freq', pin, freq, time.perf_counter())
+
+    def start(self, duty):
+        t0 = time.perf_counter()
+        self.duty, self.running = duty, True
+        self.gpio._record('pwm_start', self.pin, duty, t0)
+
+    def ChangeDutyCycle(self, duty):
+        t0 = time.perf_counter()
+        if not 0.0 <= duty <= 100.0:
+            raise ValueError("dutycycle must have a value from 0.0 to 100.0")
+        self.duty = duty
+        self.gpio._record('duty', self.pin, duty, t0)
+
+    def ChangeFrequency(self, freq):
+        t0 = time.perf_counter()
+        if freq <= 0.0:
+            raise ValueError("frequency must be greater than 0.0")
+        self.freq = freq
+        self.gpio._record('freq', self.pin, freq, t0)
+
+    def stop(self):
+        t0 = time.perf_counter()
+        self.running = False
+        self.gpio._record('pwm_stop', self.pin, 0, t0)
+
+
+# RPi.GPIO 와 같은 이름/상수를 가진 시뮬레이션 백엔드
+class SimGPIO:
+    BCM, BOARD = 11, 10
+    OUT, IN = 0, 1
+    LOW, HIGH = 0, 1
+    PUD_OFF, PUD_DOWN, PUD_UP = 20, 21, 22
+    RISING, FALLING, BOTH = 31, 32, 33
+    name = 'sim'
+
+    def __init__(self, log=None):
+        self.log = log or GPIOLog()
+        self.mode = None
+        self.modes = {}             # 핀 -> IN/OUT
+        self.values = {}            # 핀 -> 현재 값 (출력은 마지막 쓰기, 입력은 스크립트가 정한 레벨)
+        self._detect = {}           # 핀 -> [edge, bouncetime(초), 마지막 콜백 시각, 콜백 목록, 감지 플래그]
+        self._cond = threading.Condition()
+        self._player = None
+        self._stop = threading.Event()
+
+    def _record(self, op, pin, value, t0):
+        t1 = time.perf_counter()
+        self.log.add(op, pin, value, time.monotonic(), t1 - t0)
+
+    # --- RPi.GPIO API ---
+    def setwarnings(self, flag):
+        pass
+
+    def setmode(self, mode):
+        self.mode = mode
+
+    def getmode(self):
+        return self.mode
+
+    def setup(self, channel, direction, pull_up_down=PUD_OFF, initial=None):
+        t0 = time.perf_counter()
+        if self.mode is None:
+            raise RuntimeError("Please set pin numbering mode using GPIO.setmode(GPIO.BOARD) or GPIO.setmode(GPIO.BCM)")
+        for pin in _pins(channel):
+            self.modes[pin] = direction
+            if direction == self.IN:
+                self.values[pin] = self.HIGH if pull_up_down == self.PUD_UP else self.LOW
+            else:
+                self.values[pin] = self.LOW if initial is None else int(initial)
+            self._record('setup', pin, direction, t0)
+
+    def output(self, channel, value):
+        t0 = time.perf_counter()
+        pins = _pins(channel)
+        vals = list(value) if isinstance(value, (list, tuple)) else [value] * len(pins)
+        if len(vals) != len(pins):
+            raise RuntimeError("Number of channels != number of values")
+        for pin, v in zip(pins, vals):
+            if self.modes.get(pin) != self.OUT:
+                raise RuntimeError(f"The GPIO channel {pin} has not been set up as an OUTPUT")
+            self.values[pin] = int(bool(v))
+        now = time.monotonic()
+        dur = (time.perf_counter() - t0) / len(pins)
+        for pin, v in zip(pins, vals):
+            self.log.add('out', pin, int(bool(v)), now, dur)
+
+    def input(self, channel):
+        t0 = time.perf_counter()
+        if channel not in self.modes:
+            raise RuntimeError("You must setup() the GPIO channel first")
+        v = self.values[channel]
+        self._record('in', channel, v, t0)
+        return v
+
+    def PWM(self, channel, frequency):
+        return SimPWM(self, channel, frequency)
+
+    def cleanup(self, channel=None):
+        t0 = time.perf_counter()
+        pins = list(self.modes) if channel is None else _pins(channel)
+        for pin in pins:
+            self.modes.pop(pin, None)
+            self.values.pop(pin, None)
+            self._detect.pop(pin, None)
+        if channel is None:
+            self.mode = None
+            self.stop_script()
+        self._record('cleanup', -1 if channel is None else pins[0], len(pins), t0)
+
+    def add_event_detect(self, channel, edge, callback=None, bouncetime=None):
+        if self.modes.get(channel) != self.IN:
+            raise RuntimeError("You must setup() the GPIO channel as an input first")
+        if channel in self._detect:
+            raise RuntimeError("Conflicting edge detection already enabled for this GPIO channel")
+        self._detect[channel] = [edge, (bouncetime or 0) / 1000.0, None, [callback] if callback else [], False]
+
+    def add_event_callback(self, channel, callback):
+        if channel not in self._detect:
+            raise RuntimeError("Add event detection using add_event_detect first before adding a callback")
+        self._detect[channel][3].append(callback)
+
+    def remove_event_detect(self, channel):
+        self._detect.pop(channel, None)
+
+    def event_detected(self, channel):
+        d = self._detect.get(channel)
+        if d is None or not d[4]:
+            return False
+        d[4] = False
+        return True
+
+    # timeout 은 ms (RPi.GPIO 와 같음), 시간 초과면 None
+    def wait_for_edge(self, channel, edge, bouncetime=None, timeout=None):
+        want = (self.HIGH,) if edge == self.RISING else (self.LOW,) if edge == self.FALLING else (0, 1)
+        start = self.values.get(channel)
+        deadline = None if timeout is None else time.monotonic() + timeout / 1000.0
+        with self._cond:
+            while True:
+                v = self.values.get(channel)
+                if v != start and v in want:
+                    return channel
+                start = v
+                remain = None if deadline is None else deadline - time.monotonic()
+                if remain is not None and remain <= 0:
+                    return None
+                self._cond.wait(remain)
+
+    # --- 입력 스크립트 ---
+    # 입력 핀 레벨을 바꾸고 엣지 감지/콜백 처리 (콜백은 호출한 스레드에서 실행 = RPi.GPIO 의 이벤트 스레드 역할)
+    def set_input(self, pin, value):
+        value = int(bool(value))
+        with self._cond:
+            prev = self.values.get(pin)
+            if prev == value:
+                return
+            self.values[pin] = value
+            self._cond.notify_all()
+        now = time.monotonic()
+        self.log.add('edge', pin, value, now)
+        d = self._detect.get(pin)
+        if d is None:
+            return
+        edge, bounce, last, callbacks, _ = d
+        if (edge == self.RISING and value != self.HIGH) or (edge == self.FALLING and value != self.LOW):
+            return
+        if last is not None and now - last < bounce:
+            return
+        d[2] = now
+        d[4] = True
+        for cb in callbacks:
+            cb(pin)
+
+    # events: [(시각(초, 시작 기준), 핀, 값), ...] 를 백그라운드 스레드에서 재생
+    def script(self, events, start=True):
+        self.stop_script()
+        events = sorted(events)
+        self._stop.clear()
+
+        def play():
+            t0 = time.monotonic()
+            for t, pin, value in events:
+                delay = t0 + t - time.monotonic()
+                if delay > 0 and self._stop.wait(delay):
+                    return
+                if self._stop.is_set():
+                    return
+                self.set_input(pin, value)
+
+        self._player = threading.Thread(target=play, daemon=True)
+        if start:
+            self._player.start()
+        return self._player
+
+    def stop_script(self):
+        self._stop.set()
+        if self._player is not None and self._player.is_alive() and self._player is not threading.current_thread():
+            self._player.join(timeout=1.0)
+        self._player = None
+
+
+# 스위치 한 번 누름 -> 스크립트 이벤트 (bounce 회만큼 접점 떨림 포함)
+def press(pin, at, hold=0.1, bounce=0, bounce_gap=0.001):
+    events = []
+    t = at
+    for _ in range(bounce):
+        events += [(t, pin, 1), (t + bounce_gap / 2, pin, 0)]
+        t += bounce_gap
+    events.append((t, pin, 1))
+    t += hold
+    for _ in range(bounce):
+        events += [(t, pin, 0), (t + bounce_gap / 2, pin, 1)]
+        t += bounce_gap
+    events.append((t, pin, 0))
+    return events
+
+
+# "시각 핀 값" 형식의 스크립트 파일 읽기
+def load_script(path):
+    events = []
+    with open(path) as f:
+        for line in f:
+            line = line.split('#', 1)[0].split()
+            if len(line) == 3:
+                events.append((float(line[0]), int(line[1]), int(line[2])))
+    return events
+
+
+class TracedPWM:
+    def __init__(self, gpio, pwm, pin):
+        self.gpio, self.pwm, self.pin = gpio, pwm, pin
+
+    def _call(self, op, fn, value):
+        t0 = time.perf_counter()
+        fn(value)
+        self.gpio.log.add(op, self.pin, value, time.monotonic(), time.perf_counter() - t0)
+
+    def start(self, duty):
+        self._call('pwm_start', self.pwm.start, duty)
+
+    def ChangeDutyCycle(self, duty):
+        self._call('duty', self.pwm.ChangeDutyCycle, duty)
+
+    def ChangeFrequency(self, freq):
+        self._call('freq', self.pwm.ChangeFrequency, freq)
+
+    def stop(self):
+        t0 = time.perf_counter()
+        self.pwm.stop()
+        self.gpio.log.add('pwm_stop', self.pin, 0, time.monotonic(), time.perf_counter() - t0)
+
+
+# 실제 RPi.GPIO 를 감싸서 출력/입력/PWM 호출 시간을 기록 (나머지 속성은 그대로 전달)
+class TracedGPIO:
+    name = 'rpi'
+
+    def __init__(self, module, log=None):
+        self._gpio = module
+        self.log = log or GPIOLog()
+
+    def __getattr__(self, attr):
+        return getattr(self._gpio, attr)
+
+    def setup(self, channel, direction, *args, **kwargs):
+        t0 = time.perf_counter()
+        self._gpio.setup(channel, direction, *args, **kwargs)
+        dur = (time.perf_counter() - t0) / len(_pins(channel))
+        for pin in _pins(channel):
+            self.log.add('setup', pin, direction, time.monotonic(), dur)
+
+    def output(self, channel, value):
+        t0 = time.perf_counter()
+        self._gpio.output(channel, value)
+        dur = time.perf_counter() - t0
+        now = time.monotonic()
+        pins = _pins(channel)
+        vals = list(value) if isinstance(value, (list, tuple)) else [value] * len(pins)
+        for pin, v in zip(pins, vals):
+            self.log.add('out', pin, int(bool(v)), now, dur / len(pins))
+
+    def input(self, channel):
+        t0 = time.perf_counter()
+        v = self._gpio.input(channel)
+        self.log.add('in', channel, v, time.monotonic(), time.perf_counter() - t0)
+        return v
+
+    def PWM(self, channel, frequency):
+        pwm = self._gpio.PWM(channel, frequency)
+        self.log.add('freq', channel, frequency, time.monotonic())
+        return TracedPWM(self, pwm, channel)
+
+    def cleanup(self, *args):
+        t0 = time.perf_counter()
+        self._gpio.cleanup(*args)
+        self.log.add('cleanup', -1, 0, time.monotonic(), time.perf_counter() - t0)
+
+
+_backend = None
+
+
+# 프로세스 전체에서 하나의 백엔드를 공유 (Drive 와 스위치 코드가 같은 핀 상태를 봄)
+def get_gpio(name=None, trace=None):
+    global _backend
+    if _backend is not None and name is None:
+        return _backend
+    name = name or os.environ.get('SDCAR_GPIO', 'auto')
+    trace = os.environ.get('SDCAR_GPIO_TRACE') == '1' if trace is None else trace
+
+    if name in ('auto', 'rpi'):
+        try:
+            import RPi.GPIO as module
+            _backend = TracedGPIO(module) if trace else module
+            return _backend
+        except (ImportError, RuntimeError) as e:
+            if name == 'rpi':
+                raise
+            print(f"[gpio] RPi.GPIO 사용 불가 ({e}) -> 시뮬레이션 GPIO 사용")
+    elif name != 'sim':
+        raise ValueError(f"unknown GPIO backend: {name}")
+
+    _backend = SimGPIO()
+    path = os.environ.get('SDCAR_GPIO_SCRIPT')
+    if path:
+        _backend.script(load_script(path))
+    return _backend
+
+
+# 현재 백엔드의 기록 (기록하지 않는 백엔드면 None)
+def get_log():
+    return getattr(_backend, 'log', None)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    ap = argparse.ArgumentParser(description='시뮬레이션 GPIO 로 Drive 호출 비용 측정')
+    ap.add_argument('--number', type=int, default=20000)
+    ap.add_argument('--dump', default=None, help='기록 CSV 저장 경로')
+    args = ap.parse_args()
+
+    # SDcar 가 import 하는 gpio 모듈과 같은 백엔드를 쓰도록 모듈로 다시 불러옴 (__main__ 과 별개)
+    import gpio as backend
+    gpio = backend.get_gpio('sim')
+    from SDcar import Drive
+
+    car = Drive()
+    gpio.log.clear()
+    t0 = time.perf_counter()
+    for i in range(args.number):
+        car.drive_arcade(1.0, np.sin(i * 0.01) * 0.5, 60)
+    dt = time.perf_counter() - t0
+    print(f"drive_arcade x{args.number}: {dt / args.number * 1e6:.2f} us/call  {car.stats()}")
+    print(gpio.log.report())
+
+    # 스크립트 입력 + 콜백 지연
+    lat = []
+    gpio.setup(5, gpio.IN, pull_up_down=gpio.PUD_DOWN)
+    gpio.add_event_detect(5, gpio.RISING, callback=lambda pin: lat.append(time.monotonic()), bouncetime=20)
+    gpio.script(press(5, 0.01, hold=0.05, bounce=3) + press(5, 0.2, hold=0.05, bounce=3)).join()
+    print(f"SW1 2 presses with bounce: {len(gpio.log.records('edge', 5))} edges -> {len(lat)} callbacks")
+    car.clean_GPIO()
+    if args.dump:
+        gpio.log.dump(args.dump)
@@ -0,0 +1,239 @@
+import os
+import time
+
+# sysfs 하드웨어 PWM (/sys/class/pwm/pwmchipN/pwmM)
+# RPi.GPIO 의 GPIO.PWM 은 채널마다 소프트웨어 스레드가 핀을 직접 토글 -> CPU 사용 + 비전 부하 시 지터
+# 하드웨어 PWM 핀은 주기/듀티를 한 번 써 두면 CPU 없이 파형이 나옴
+#
+# 라즈베리파이 PWM0 = GPIO12/18, PWM1 = GPIO13/19 (config.txt 에 dtoverlay=pwm-2chan 등으로 핀 기능 지정 필요)
+# 하드웨어 핀이 아니거나 pwmchip 이 없으면 소프트웨어 PWM (gpio.PWM) 으로 대체
+# 주의: 하드웨어 PWM 핀을 GPIO.setup(pin, OUT) 하면 핀 기능이 GPIO 로 바뀌므로 open_pwm 이 setup 까지 맡음
+#
+# 환경 변수
+#   SDCAR_PWM=auto|hw|sw   (기본 auto)
+#   SDCAR_PWMCHIP=N        (기본 0, 라즈베리파이 5 는 보통 2)
+
+SYSFS_ROOT = '/sys/class/pwm'
+HW_CHANNELS = {12: 0, 18: 0, 13: 1, 19: 1}     # BCM 핀 -> PWM 채널
+
+
+class SysfsPWM:
+    def __init__(self, pin, freq, chip=0, channel=None, root=SYSFS_ROOT):
+        self.pin = pin
+        self.channel = HW_CHANNELS[pin] if channel is None else channel
+        self.chip_dir = os.path.join(root, f"pwmchip{chip}")
+        self.dir = os.path.join(self.chip_dir, f"pwm{self.channel}")
+        self._export()
+
+        # 파일은 열어 둔 채로 같은 fd 에 덮어씀 (매번 open/close 하지 않음)
+        self._fd = {name: os.open(os.path.join(self.dir, name), os.O_RDWR)
+                    for name in ('period', 'duty_cycle', 'enable')}
+        self._last = {'period': None, 'duty_cycle': None, 'enable': None}
+        self.writes = 0
+        self.skipped = 0
+
+        self.duty = 0.0
+        self.period_ns = None
+        self._write('enable', 0)
+        self._set_period(freq)
+
+    def _export(self):
+        if os.path.isdir(self.dir):
+            return
+        with open(os.path.join(self.chip_dir, 'export'), 'w') as f:
+            f.write(str(self.channel))
+        # export 후 udev 가 권한을 바꿀 때까지 잠깐 기다림
+        deadline = time.monotonic() + 1.0
+        while not os.access(os.path.join(self.dir, 'period'), os.W_OK):
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"{self.dir} did not appear after export")
+            time.sleep(0.01)
+
+    # 값이 같으면 쓰지 않음
+    def _write(self, name, value):
+        if self._last[name] == value:
+            self.skipped += 1
+            return
+        os.pwrite(self._fd[name], b'%d\n' % value, 0)
+        self._last[name] = value
+        self.writes += 1
+
+    def _duty_ns(self, duty, period_ns):
+        return int(period_ns * duty / 100.0)
+
+    # 커널은 duty_cycle <= period 만 받으므로 주기가 줄어들 때는 듀티부터 씀
+    def _set_period(self, freq):
+        if freq <= 0.0:
+            raise ValueError("frequency must be greater than 0.0")
+        period = int(round(1e9 / freq))
+        duty = self._duty_ns(self.duty, period)
+        if self.period_ns is not None and period < self.period_ns:
+            self._write('duty_cycle', duty)
+            self._write('period', period)
+        else:
+            self._write('period', period)
+            self._write('duty_cycle', duty)
+        self.period_ns = period
+
+    # --- RPi.GPIO PWM 과 같은 API ---
+    def start(self, duty):
+        self.ChangeDutyCycle(duty)
+        self._write('enable', 1)
+
+    def ChangeDutyCycle(self, duty):
+        if not 0.0 <= duty <= 100.0:
+            raise ValueError("dutycycle must have a value from 0.0 to 100.0")
+        self.duty = duty
+        self._write('duty_cycle', self._duty_ns(duty, self.period_ns))
+
+    def ChangeFrequency(self, freq):
+        self._set_period(freq)
+
+    def stop(self):
+        self._write('enable', 0)
+
+    def close(self):
+        self.stop()
+        for fd in self._fd.values():
+            os.close(fd)
+        self._fd = {}
+
+    def stats(self):
+        return {'writes': self.writes, 'skipped': self.skipped}
+
+
+# 하드웨어 PWM 을 쓸 수 있으면 SysfsPWM, 아니면 gpio 의 소프트웨어 PWM
+def open_pwm(gpio, pin, freq, mode=None, chip=None, root=SYSFS_ROOT):
+    mode = mode or os.environ.get('SDCAR_PWM', 'auto')
+    chip = int(os.environ.get('SDCAR_PWMCHIP', 0)) if chip is None else chip
+    # auto 에서 pwmchip 자체가 없으면 (라즈베리파이가 아님 / 오버레이 없음) 조용히 소프트웨어 PWM
+    if mode == 'auto' and not os.path.isdir(os.path.join(root, f"pwmchip{chip}")):
+        mode = 'sw'
+    if mode != 'sw' and pin in HW_CHANNELS:
+        try:
+            return SysfsPWM(pin, freq, chip=chip, root=root)
+        except (OSError, RuntimeError) as e:
+            if mode == 'hw':
+                raise
+            print(f"[hwpwm] GPIO{pin} 하드웨어 PWM 사용 불가 ({e}) -> 소프트웨어 PWM")
+    gpio.setup(pin, gpio.OUT)
+    return gpio.PWM(pin, freq)
+
+
+# 정리: 소프트웨어 PWM 은 stop, 하드웨어 PWM 은 enable=0 후 파일 닫기
+def close_pwm(pwm):
+    if isinstance(pwm, SysfsPWM):
+        pwm.close()
+    else:
+        pwm.stop()
+
+
+# 테스트용 가짜 sysfs 트리 (export 된 채널 디렉터리까지 미리 만듦)
+def make_fake_tree(root, chip=0, channels=2):
+    chip_dir = os.path.join(root, f"pwmchip{chip}")
+    os.makedirs(chip_dir, exist_ok=True)
+    for name, value in (('npwm', channels), ('export', ''), ('unexport', '')):
+        with open(os.path.join(chip_dir, name), 'w') as f:
+            f.write(f"{value}\n")
+    for ch in range(channels):
+        d = os.path.join(chip_dir, f"pwm{ch}")
+        os.makedirs(d, exist_ok=True)
+        for name in ('period', 'duty_cycle', 'enable'):
+            with open(os.path.join(d, name), 'w') as f:
+                f.write('0\n')
+    return root
+
+
+# 가짜 트리의 현재 값 (pwrite 로 짧게 덮어쓰면 뒤에 찌꺼기가 남으므로 첫 줄만 읽음)
+def read_fake(root, chip, channel, name):
+    with open(os.path.join(root, f"pwmchip{chip}", f"pwm{channel}", name)) as f:
+        return int(f.read().split()[0])
+
+
+def selftest():
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as root:
+        make_fake_tree(root)
+        pwm = SysfsPWM(18, 500, root=root)
+        assert read_fake(root, 0, 0, 'period') == 2000000
+        assert read_fake(root, 0, 0, 'enable') == 0
+
+        pwm.start(25)
+        assert read_fake(root, 0, 0, 'duty_cycle') == 500000
+        assert read_fake(root, 0, 0, 'enable') == 1
+
+        writes = pwm.writes
+        pwm.ChangeDutyCycle(25)
+        pwm.start(25)
+        assert pwm.writes == writes, "unchanged values must not be written"
+
+        # 주기를 줄일 때 듀티가 새 주기보다 먼저 줄어들어야 함
+        pwm.ChangeDutyCycle(100)
+        pwm.ChangeFrequency(1000)
+        assert read_fake(root, 0, 0, 'period') == 1000000
+        assert read_fake(root, 0, 0, 'duty_cycle') == 1000000
+        pwm.ChangeFrequency(250)
+        assert read_fake(root, 0, 0, 'period') == 4000000
+        assert read_fake(root, 0, 0, 'duty_cycle') == 4000000
+
+        pwm.close()
+        assert read_fake(root, 0, 0, 'enable') == 0
+
+        # 하드웨어 핀이 아니면 소프트웨어 PWM
+        from gpio import SimGPIO, SimPWM
+        sim = SimGPIO()
+        sim.setmode(sim.BCM)
+        assert isinstance(open_pwm(sim, 23, 500, root=root), SimPWM)
+        assert isinstance(open_pwm(sim, 13, 500, root=root), SysfsPWM)
+        assert isinstance(open_pwm(sim, 18, 500, mode='sw', root=root), SimPWM)
+    print("hwpwm selftest ok")
+
+
+# 두 모터 채널을 제어 주기마다 듀티를 바꾸면서 CPU 시간(프로세스 전체 스레드 포함) 측정
+def benchmark(pwms, seconds=5.0, rate_hz=100):
+    for p in pwms:
+        p.start(0)
+    cpu0, t0 = time.process_time(), time.monotonic()
+    i = 0
+    while time.monotonic() - t0 < seconds:
+        duty = 50 + 30 * ((i // 10) % 2)         # 0.1초마다 듀티 변화
+        for p in pwms:
+            p.ChangeDutyCycle(duty)
+        i += 1
+        time.sleep(1.0 / rate_hz)
+    cpu = time.process_time() - cpu0
+    wall = time.monotonic() - t0
+    for p in pwms:
+        p.stop()
+    return 100.0 * cpu / wall
+
+
+if __name__ == '__main__':
+    import argparse
+    import tempfile
+
+    ap = argparse.ArgumentParser(description='sysfs 하드웨어 PWM 자체 검사 / CPU 사용량 비교')
+    ap.add_argument('--bench', action='store_true', help='소프트웨어 PWM 과 하드웨어 PWM 의 CPU 사용량 비교')
+    ap.add_argument('--seconds', type=float, default=5.0)
+    ap.add_argument('--freq', type=float, default=500)
+    args = ap.parse_args()
+
+    selftest()
+    if args.bench:
+        from gpio import get_gpio
+        gpio = get_gpio()
+        gpio.setmode(gpio.BCM)
+        # 라즈베리파이가 아니면 가짜 트리 + 시뮬레이션 GPIO (호출 경로 비용만 비교됨)
+        root = SYSFS_ROOT
+        if getattr(gpio, 'name', None) == 'sim' or not os.path.isdir(SYSFS_ROOT):
+            root = make_fake_tree(tempfile.mkdtemp())
+            print("fake sysfs tree + simulated GPIO: compares call-path cost only")
+        # 하드웨어 먼저: 소프트웨어 PWM 의 setup(OUT) 이 핀 기능을 GPIO 로 바꾸기 때문
+        hw = [open_pwm(gpio, pin, args.freq, mode='hw', root=root) for pin in (18, 13)]
+        print(f"hardware PWM x2: {benchmark(hw, args.seconds):.1f}% CPU  {[p.stats() for p in hw]}")
+        for p in hw:
+            p.close()
+        sw = [open_pwm(gpio, pin, args.freq, mode='sw') for pin in (18, 13)]
+        print(f"software PWM x2: {benchmark(sw, args.seconds):.1f}% CPU")
+        gpio.cleanup()
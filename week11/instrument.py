@@ -0,0 +1,159 @@
+import threading
+import time
+
+import cv2 as cv
+import numpy as np
+
+# 프레임 단위 계측: 프레임마다 단계 시각(monotonic)을 미리 잡아 둔 배열의 한 행에 기록
+#   row = tracer.begin(captured.stamp)      # 캡처 시각으로 새 행
+#   tracer.mark(row, 'mask') ...            # 단계가 끝날 때마다 (호출 하나 = 배열 한 칸 쓰기)
+# 통계(p50/p95/p99)는 최근 size 프레임의 링 버퍼에서 요약할 때만 계산 -> 루프 안의 비용은 mark 뿐
+# 단계 시간 = 이전 mark 부터 이 mark 까지, 'capture' -> 마지막 단계 = 캡처-구동 지연
+#
+# 기록 내보내기 (path)
+#   .csv : 프레임당 한 줄 (캡처 시각 + 단계별 캡처 후 경과 ms)
+#   그 외: float64 원시 배열 (행 = 프레임, 열 = marks 순서, 단위 초), load_trace 로 읽음
+# 링 버퍼가 한 바퀴 돌 때마다 오래된 절반을 한꺼번에 파일에 씀 (프레임마다 파일 쓰기 없음)
+#   최근 절반은 다른 스레드가 아직 mark 중일 수 있어서 다음 번에 (파이프라인 모드는 스레드 여럿이 한 Tracer 를 씀)
+#   begin/_flush 는 잠금 안에서, mark 는 자기 행의 한 칸만 쓰므로 잠금 없음
+
+
+class Tracer:
+    def __init__(self, marks, size=1024, path=None):
+        # marks: 단계 이름 순서, 첫 번째는 'capture' (begin 의 stamp)
+        self.marks = list(marks)
+        self.col = {name: i for i, name in enumerate(self.marks)}
+        self.size = size
+        self.buf = np.full((size, len(self.marks)), np.nan)
+        self.n = 0                  # 지금까지 begin 한 프레임 수
+        self._flushed = 0           # 파일에 쓴 프레임 수
+        self._lock = threading.Lock()
+        self.path = path
+        self._out = None
+        self._overlay, self._overlay_at = [], 0.0
+        if path:
+            self._out = open(path, 'w' if path.endswith('.csv') else 'wb')
+            if path.endswith('.csv'):
+                self._out.write(','.join(['capture'] + [f"{m}_ms" for m in self.marks[1:]]) + '\n')
+
+    def begin(self, stamp=None):
+        with self._lock:
+            if self.n - self._flushed == self.size:
+                self._flush(self.size // 2)
+            row = self.n % self.size
+            r = self.buf[row]
+            r[:] = np.nan
+            r[0] = time.monotonic() if stamp is None else stamp
+            self.n += 1
+        return row
+
+    def mark(self, row, name):
+        self.buf[row, self.col[name]] = time.monotonic()
+
+    # 최근 프레임 (오래된 것부터)
+    def recent(self):
+        k = min(self.n, self.size)
+        start = self.n % self.size if self.n > self.size else 0
+        return np.roll(self.buf, -start, axis=0)[:k]
+
+    # 단계별 시간 (초): 각 mark 에서 바로 앞의 기록된 mark 까지
+    def durations(self, rows=None):
+        rows = self.recent() if rows is None else rows
+        prev = np.fmax.accumulate(rows, axis=1)     # 빠진 mark 는 앞 시각을 이어 씀
+        return {name: rows[:, i] - prev[:, i - 1] for i, name in enumerate(self.marks) if i > 0}
+
+    # {이름: (p50, p95, p99, 평균)} ms
+    #   단계별 + 'capture->end' (캡처부터 마지막 mark 까지) + 'frame period' (캡처 간격)
+    # 파이프라인에서 버려진 프레임(캡처 뒤 mark 없음)은 빠짐
+    def summary(self):
+        rows = self.recent()
+        out = {}
+        if not len(rows):
+            return out
+        series = list(self.durations(rows).items())
+        prev = np.fmax.accumulate(rows, axis=1)
+        reached = ~np.isnan(rows[:, 1:]).all(axis=1)
+        series.append(('capture->end', (prev[:, -1] - rows[:, 0])[reached]))
+        series.append(('frame period', np.diff(rows[:, 0])))
+        for name, d in series:
+            d = d[~np.isnan(d)] * 1000
+            if len(d):
+                p50, p95, p99 = np.percentile(d, (50, 95, 99))
+                out[name] = (p50, p95, p99, d.mean())
+        return out
+
+    # 터미널 요약: 단계별 p50/p95/p99 와 프레임 주기 대비 평균 비율
+    def report(self):
+        s = self.summary()
+        if not s:
+            return 'trace: no frames'
+        period = s.get('frame period', (0, 0, 0, 0))[3]
+        lines = [f"trace  {min(self.n, self.size)} frames   p50 / p95 / p99 ms   (budget %)"]
+        for name, (p50, p95, p99, mean) in s.items():
+            share = f"{100 * mean / period:5.1f}%" if period and name not in ('frame period', 'capture->end') else ''
+            lines.append(f"  {name:<14}{p50:7.2f} {p95:7.2f} {p99:7.2f}  {share}")
+        return '\n'.join(lines)
+
+    # 화면 표시용: 영상 왼쪽 아래에 단계별 p50/p95 ms (요약은 refresh 초마다 다시 계산)
+    def overlay(self, img, refresh=1.0, scale=0.4):
+        now = time.monotonic()
+        if now - self._overlay_at > refresh:
+            self._overlay_at = now
+            self._overlay = [f"{name} {p50:.1f}/{p95:.1f}" for name, (p50, p95, p99, mean) in self.summary().items()]
+        y = img.shape[0] - 6 - 12 * (len(self._overlay) - 1)
+        for text in self._overlay:
+            cv.putText(img, text, (4, y), cv.FONT_HERSHEY_SIMPLEX, scale, (255, 255, 255), 1)
+            y += 12
+        return img
+
+    # 아직 쓰지 않은 프레임 중 오래된 k 개 (None 이면 전부) 를 파일로
+    def _flush(self, k=None):
+        pending = self.n - self._flushed
+        k = pending if k is None else min(k, pending)
+        if self._out is not None and k:
+            rows = self.buf[(self._flushed + np.arange(k)) % self.size]
+            if self.path.endswith('.csv'):
+                rel = (rows[:, 1:] - rows[:, :1]) * 1000
+                np.savetxt(self._out, np.column_stack((rows[:, 0], rel)), delimiter=',', fmt='%.6f')
+            else:
+                rows.tofile(self._out)
+        self._flushed += k
+
+    # 기록하는 스레드를 모두 멈춘 뒤에 호출 (남은 행을 전부 씀)
+    def close(self):
+        with self._lock:
+            if self._out is not None:
+                self._flush()
+                self._out.close()
+                self._out = None
+
+
+# 원시 기록 읽기
+def load_trace(path, marks):
+    return np.fromfile(path, np.float64).reshape(-1, len(marks))
+
+
+if __name__ == '__main__':
+    import argparse
+
+    ap = argparse.ArgumentParser(description='계측 오버헤드 측정')
+    ap.add_argument('--frames', type=int, default=200000)
+    args = ap.parse_args()
+
+    marks = ['capture', 'mask', 'centroid', 'control', 'display']
+    tracer = Tracer(marks, path='/dev/null')
+    t0 = time.perf_counter()
+    for _ in range(args.frames):
+        row = tracer.begin(time.monotonic())
+        for name in marks[1:]:
+            tracer.mark(row, name)
+    per_frame = (time.perf_counter() - t0) / args.frames
+    tracer.close()
+    tracer.report()     # 첫 호출은 numpy 준비 시간 포함
+    t0 = time.perf_counter()
+    tracer.report()
+    per_report = time.perf_counter() - t0
+    print(f"begin + {len(marks) - 1} marks: {per_frame * 1e6:.2f} us/frame "
+          f"({per_frame / (1 / 30) * 100:.3f}% of a 30 fps frame, "
+          f"{per_frame / 0.005 * 100:.2f}% of a 5 ms loop)")
+    print(f"report over {tracer.size} frames: {per_report * 1000:.2f} ms")
@@ -1,21 +1,23 @@
 import cv2 as cv
 import numpy as np
-import threading, time
-
-# SDcar 더미처리
-
-try:
-    import SDcar
-except Exception:
-    class DummyDrive:
-        def __init__(self): print("[DummyDrive] initialized")
-        def clean_GPIO(self): print("[DummyDrive] clean_GPIO")
-        def motor_go(self, s): print(f"[DummyDrive] go {s}")
-        def motor_back(self, s): print(f"[DummyDrive] back {s}")
-        def motor_left(self, s): print(f"[DummyDrive] left {s}")
-        def motor_right(self, s): print(f"[DummyDrive] right {s}")
-        def motor_stop(self): print("[DummyDrive] stop")
-    SDcar = type("m", (), {"Drive": DummyDrive})
+import time
+import os
+import argparse
+import threading
+from capture import LatestFrameGrabber, open_source
+from pipeline import Pipeline, PipelineStop, DROP_OLDEST
+from display import Display
+from centroid import projection_centroid
+from masklut import MaskLUT
+from roi import Band, BandMasker, morph_pad
+from tracking import TrackingWindow
+from lookahead import Lookahead
+from control import ControlLoop, PID
+from gpio import get_log
+from instrument import Tracer
+from supervisor import Supervisor
+# 라즈베리파이가 아니면 SDcar 는 시뮬레이션 GPIO 로 동작 (gpio.py)
+import SDcar
 
 
 # 파라미터
@@ -23,10 +25,33 @@ v_x = 320
 v_y = 240
 speed_base = 45             #  전진 속도 
 Kp = 0.4                      # P 게인
+steer_deadband = 0.05       # 이보다 작은 조향은 직진 (떨림 최소화)
 roi_height = 60             # ROI 높이 
 min_contour_area = 100      # 의미 있는 윤곽의 최소 면적
 lost_threshold = 15         # 라인 소실시 처리 임계값
 search_turn_time = 0.8      # (초) 소실 시 회전 탐색 시간
+source_spec = 'cam'         # 'cam', 'synthetic', 또는 영상 파일 경로
+display_mode = 'every:1'    # 'none', 'every:N', 'thread'
+centroid_engine = 'contour' # 'contour' 또는 'projection' (열 투영, centroid.py)
+mask_engine = 'hsv'         # 'hsv', 'lut'(64KB 양자화 테이블), 'lut-exact'(16MB, 픽셀 단위 동일)
+yellow_hsv = ((20, 100, 100), (40, 255, 255))   # 노란선 HSV 범위
+view_y0 = 0.7               # 화면 표시용 영역: 프레임 하단 30%
+track_window = False        # 트래킹 창 모드: 라인 주변 가로 창만 처리
+use_lookahead = False       # 멀티 밴드 lookahead: 곡선을 미리 보고 feed-forward 조향
+lookahead_k = 4             # lookahead 밴드 수
+Kff = 0.5                   # feed-forward 게인: Kp 에 대한 비율 (앞쪽 라인의 x 변화량, 정규화)
+ff_limit = 0.2              # feed-forward 항의 최대 크기 (P 항에 더하기 전에 자름)
+control_rate = 0            # 고정 주기 제어 루프 (Hz), 0 이면 기존처럼 프레임마다 제어
+Ki = 0.0                    # 제어 루프 PID 의 I 게인
+Kd = 0.05                   # 제어 루프 PID 의 D 게인
+steer_rate_limit = 6.0      # 조향 출력의 초당 최대 변화량
+trace_report_s = 5.0        # 단계별 지연 요약 출력 주기 (초), 0 이면 종료 때만
+vision_deadline = 0.2       # (초) 비전 루프 한 바퀴 deadline, 넘기면 단계적으로 성능을 낮춤
+stop_deadline = 0.5         # (초) 비전 루프가 이만큼 멈추면 단계와 상관없이 정지
+degrade_speed = 0.6         # 감속 단계에서 speed_base 에 곱하는 값
+
+# ROI 밴드 (프레임 높이 대비 비율). 마스크/모폴로지는 이 밴드(+커널 여유 행)에서만 계산
+roi_bands = [Band('near', 1.0 - roi_height / v_y, 1.0)]
 
 epsilon = 1e-6
 v_x_grid = [int(v_x*i/10) for i in range(1, 10)]
@@ -37,22 +62,95 @@ enable_linetracing = True
 last_cx = v_x // 2
 lost_count = 0
 last_time_lost = None
+tracker = None              # track_window 일 때 TrackingWindow
+lookahead = None            # use_lookahead 일 때 Lookahead
+control_loop = None         # control_rate > 0 일 때 ControlLoop
+# 단계별 시각 기록 (instrument.py): capture -> mask -> centroid -> control -> display
+tracer = Tracer(['capture', 'mask', 'centroid', 'control', 'display'])
+supervisor = None           # 루프 heartbeat 감시 (supervisor.py)
+degrade_pending = 0         # 감시 스레드가 요청한 성능 낮추기 단계 수
+degrade_applied = 0         # 메인 루프가 실제로 적용한 단계 수
+degrade_lock = threading.Lock()
+
+
+# 성능 낮추기 단계 (순서대로 하나씩)
+# 감시 스레드는 단계 번호만 올리고 (request_degrade), 실제 전역 상태 변경은
+# 메인 루프 맨 위에서 (apply_degrade) -> 프레임 처리 도중에 masker/tracker 가 바뀌지 않음
+def degrade_display(display):
+    display.set_mode('none')
+
+
+# 처리 영역 줄이기: 라인 주변 트래킹 창만, lookahead 밴드는 계산하지 않음
+def degrade_shrink(display):
+    global tracker, lookahead, band_masker
+    if tracker is None:
+        tracker = TrackingWindow(v_x)
+    if lookahead is not None:
+        lookahead = None
+        band_masker = BandMasker(roi_bands[:1], make_mask, morph_pad(5, 4))
+
+
+def degrade_slow(display):
+    global speed_base
+    speed_base = speed_base * degrade_speed
+
+
+DEGRADE_STEPS = [('display off', degrade_display), ('shrink', degrade_shrink), ('slow', degrade_slow)]
+
+
+# 감시 스레드에서 호출
+def request_degrade(level):
+    global degrade_pending
+    with degrade_lock:
+        degrade_pending = max(degrade_pending, level)
+
 
-# 디버깅
+# 메인 루프에서 호출: 요청된 단계까지 차례로 적용
+def apply_degrade(display):
+    global degrade_applied
+    with degrade_lock:
+        level = degrade_pending
+    while degrade_applied < level:
+        DEGRADE_STEPS[degrade_applied][1](display)
+        degrade_applied += 1
 
-def func_thread():
-    while True:
-        time.sleep(1)
-        if not is_running:
-            break
+
+# 라인트레이싱 끄고 정지: 제어 루프의 측정도 지워서 루프가 max_age 동안 다시 구동하지 않게
+def stop_tracing():
+    global enable_linetracing
+    enable_linetracing = False
+    if control_loop is not None:
+        control_loop.set_measurement(None, None)
+    car.motor_stop()
+
+
+# 정지: 라인트레이싱을 끄고 모터 정지 ('e' 키로 다시 시작)
+def supervisor_stop():
+    stop_tracing()
+    print("supervisor stop: press 'e' to resume tracing")
+
+
+_mask_lut = None
+
+# BGR -> 마스크 룩업 테이블 (처음 한 번만 만들고 디스크에 캐시)
+def get_mask_lut():
+    global _mask_lut
+    if _mask_lut is None:
+        _mask_lut = MaskLUT({'yellow': [yellow_hsv]}, exact=(mask_engine == 'lut-exact'),
+                            cache_dir=os.path.expanduser('~/.cache/sdcar'))
+    return _mask_lut
 
 
 # 마스크 생성: 노란선에 집중
 def make_mask(frame):
-    hsv = cv.cvtColor(frame, cv.COLOR_BGR2HSV)
-    
-    # 노란색에 집중된 범위 (H: 20~40)
-    mask_yellow = cv.inRange(hsv, (20, 100, 100), (40, 255, 255))
+    if mask_engine == 'hsv':
+        hsv = cv.cvtColor(frame, cv.COLOR_BGR2HSV)
+
+        # 노란색에 집중된 범위 (H: 20~40)
+        mask_yellow = cv.inRange(hsv, *yellow_hsv)
+    else:
+        # HSV 변환 + inRange 대신 테이블 한 번
+        mask_yellow = get_mask_lut().apply(frame)
     
     # 노이즈 제거 및 구멍 메우기
     kernel = cv.getStructuringElement(cv.MORPH_RECT, (5,5))
@@ -62,6 +160,10 @@ def make_mask(frame):
     return mask
 
 
+# 밴드별 마스크 계산기 (5x5 close + open -> 위아래 8행 여유)
+band_masker = BandMasker(roi_bands, make_mask, morph_pad(5, 4))
+
+
 # 윤곽에서 중심 구하기
 def find_largest_contour_centroid(mask):
     # cv.RETR_EXTERNAL: 가장 외곽 윤곽선만 찾음
@@ -84,150 +186,409 @@ def find_largest_contour_centroid(mask):
     return (cx, int(area)), contours
 
 
+# 선택한 방식으로 중심 구하기 (반환 형식은 find_largest_contour_centroid 와 같음)
+def find_centroid(mask):
+    if centroid_engine == 'projection':
+        return projection_centroid(mask, min_contour_area), None
+    return find_largest_contour_centroid(mask)
+
+
 # 간단한 조향: P 제어 
 
-def control_by_error(err, car):
+def control_by_error(err, car, ff=0.0):
     # err: -1(left) .. 0(center) .. +1(right) (정규화된 에러)
-    steer = Kp * err
-    abs_steer = abs(steer)
-    
-    # 직진 구간: 오차가 0.20 미만일 때 직진 (떨림 최소화)
-    if abs_steer < 0.20: 
-        car.motor_go(speed_base)
-    elif steer > 0:
-        # 라인이 오른쪽으로 이탈 (err > 0) -> 오른쪽으로 회전하여 따라잡음
-        turn_speed = int(speed_base * min(1.0, 0.6 + abs_steer))
-        car.motor_right(turn_speed) 
+    # ff : lookahead 로 구한 앞쪽 곡선 방향 (feed-forward 항)
+    apply_steer(Kp * err + ff, car)
+
+
+# 조향값 -> 좌우 바퀴 차동 속도 (제어 루프도 이 함수로 구동)
+# 제자리 회전 대신 바깥 바퀴는 speed_base, 안쪽 바퀴만 줄여서 부드럽게 (한 번의 set_wheels)
+# steer > 0: 라인이 오른쪽 -> 오른쪽으로, steer >= 1 이면 안쪽 바퀴 정지
+def apply_steer(steer, car):
+    # 정지 직전에 측정을 읽은 제어 루프 주기가 정지 뒤에 모터를 다시 돌리지 않도록
+    if not enable_linetracing:
+        return
+    # 직진 구간: 오차가 작을 때 직진 (떨림 최소화)
+    if abs(steer) < steer_deadband:
+        steer = 0.0
+    car.drive_arcade(1.0, min(max(steer, -1.0), 1.0), speed_base)
+
+
+# 전처리: 상하좌우 뒤집기 (카메라가 거꾸로 달려 있음)
+def preprocess(frame):
+    return cv.flip(frame, -1)
+
+
+# 마스크 생성: ROI 밴드에서만 계산, 근접 ROI (하단 roi_height 픽셀) 도 함께 반환
+# 트래킹 창 모드면 예측 위치 주변의 열 범위 window 만 계산
+def compute_masks(frame):
+    window = tracker.window(lost_count) if tracker is not None else (0, frame.shape[1])
+    masks = band_masker.compute(frame, *window)
+    return masks, masks['near'], window
+
+
+# 근접 ROI 에서 중심 찾기 (창 안의 좌표 -> 전체 프레임 좌표)
+def find_line(roi_bot, masks, window):
+    bot_centroid, _ = find_centroid(roi_bot)
+    if bot_centroid is not None:
+        bot_centroid = (bot_centroid[0] + window[0], bot_centroid[1])
+    if tracker is not None:
+        pixels = sum(m.size for m in masks.values())
+        tracker.update(bot_centroid[0] if bot_centroid else None, pixels, window)
+    return bot_centroid
+
+
+# lookahead 밴드에서 곡선 추정 -> feed-forward 항
+def estimate_lookahead(masks):
+    if lookahead is None:
+        return 0.0, None
+    look = lookahead.estimate(masks['lookahead'])
+    if look is None:
+        return 0.0, None
+    # Kp 와 같은 단위로 맞추고 (Kff * Kp), P 항을 넘어서지 않게 ff_limit 으로 자름
+    ff = Kff * Kp * look['far_dx'] / (v_x/2)
+    return min(max(ff, -ff_limit), ff_limit), look
+
+
+# 라인트레이싱 제어 로직: 모터 명령을 내리고 시각화용 상태를 돌려줌
+# 제어 루프가 켜져 있으면 라인을 찾았을 때는 측정만 넘기고 모터는 루프가 구동
+def track_line(bot_centroid, mask_pixels, car, ff=0.0, stamp=None):
+    global last_cx, lost_count, last_time_lost
+
+    state = {'tracing': enable_linetracing, 'cx': None, 'err': None, 'lost': 0}
+    if enable_linetracing:
+
+        if bot_centroid is not None:
+            # 라인 발견 (안정적인 제어)
+            cx_rel = bot_centroid[0]
+            # 에러 계산: 중앙에서 얼마나 벗어났는지 (-1 ~ +1)
+            err = (cx_rel - (v_x/2)) / (v_x/2)
+            last_cx = cx_rel
+            lost_count = 0
+            last_time_lost = None
+
+            # control_by_error 호출
+            if control_loop is not None:
+                control_loop.set_measurement(err, stamp, ff)
+            else:
+                control_by_error(err, car, ff)
+            state['cx'], state['err'], state['ff'] = cx_rel, err, ff
+
+        else:
+            # 라인 소실 처리 (Lost Logic)
+            if control_loop is not None:
+                control_loop.set_measurement(None, stamp)
+            lost_count += 1
+            # 프레임 캡처 시각 기준 (녹화 영상 재생에서도 같은 결과)
+            now = time.monotonic() if stamp is None else stamp
+            if last_time_lost is None: last_time_lost = now
+            elapsed = now - last_time_lost
+
+            # 바퀴 명령을 정한 뒤 한 번만 적용 (왼쪽, 오른쪽)
+            slow, turn, sweep = speed_base * 0.5, speed_base * 0.4, speed_base * 0.6
+            if lost_count < lost_threshold:
+                # 짧은 소실: 이전 방향으로 호를 그리며 저속 전진
+                if last_cx < (v_x/2): wheels = (slow - turn, slow)
+                else: wheels = (slow, slow - turn)
+            else:
+                # 오랜 소실: 탐색 모드 (양방향 회전 스윕)
+                if (elapsed % (search_turn_time*2)) < search_turn_time:
+                    if last_cx < (v_x/2): wheels = (-sweep, sweep)
+                    else: wheels = (sweep, -sweep)
+                else:
+                    if last_cx < (v_x/2): wheels = (sweep, -sweep)
+                    else: wheels = (-sweep, sweep)
+
+            # 안전: 강한 이상(ROI 밴드 마스크가 거의 0)이면 속도 줄여 직진
+            if mask_pixels < 30:
+                wheels = (speed_base * 0.4, speed_base * 0.4)
+            car.set_wheels(*wheels)
+            state['lost'] = lost_count
+
     else:
-        # 라인이 왼쪽으로 이탈 (err < 0) -> 왼쪽으로 회전하여 따라잡음
-        turn_speed = int(speed_base * min(1.0, 0.6 + abs_steer))
-        car.motor_left(turn_speed)   
+        # 라인트레이싱 비활성화 상태: 정지
+        if control_loop is not None:
+            control_loop.set_measurement(None, stamp)
+        car.motor_stop()
+
+    return state
+
+
+# 시각화: 하단 30% 영역에 중심점/에러/그리드를 그린 2배 확대 영상
+def draw_vis(frame, state):
+    vis = frame[int(frame.shape[0] * view_y0):, :].copy()
+    h_crop = vis.shape[0]
+    if not state['tracing']:
+        cv.putText(vis, 'TRACING DISABLED', (5,20), cv.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
+    elif state['cx'] is not None:
+        cy_abs = h_crop - roi_height // 2
+        cv.circle(vis, (int(state['cx']), cy_abs), 5, (0,0,255), -1)
+        cv.putText(vis, f"err:{state['err']:.2f}", (5,20), cv.FONT_HERSHEY_SIMPLEX, 0.5, (0,255,0), 1)
+    elif state['lost']:
+        cv.putText(vis, f"LOST {state['lost']}", (5,40), cv.FONT_HERSHEY_SIMPLEX, 0.6, (0,0,255), 2)
+
+    # 그리드/시각화
+    for x in v_x_grid:
+        cv.line(vis, (x, 0), (x, vis.shape[0]), (0,255,0), 1)
+    window = state.get('window')
+    if window is not None and window[1] - window[0] < vis.shape[1]:
+        for x in window:
+            cv.line(vis, (x, 0), (x, vis.shape[0]), (255,0,0), 2)
+    look = state.get('look')
+    if look is not None:
+        x0 = window[0] if window is not None else 0
+        for x, y in look['points']:
+            cv.circle(vis, (int(x) + x0, h_crop - int(y)), 3, (0,255,255), -1)
+        cv.putText(vis, f"ff:{state.get('ff', 0.0):.2f}", (5,60), cv.FONT_HERSHEY_SIMPLEX, 0.5, (0,255,255), 1)
+    return cv.resize(vis, dsize=(0,0), fx=2, fy=2)
+
+
+# 키 입력 처리: 종료 요청이면 False
+def handle_key(key, car, display=None):
+    global is_running, enable_linetracing
+    if key & 0xFF == ord('q'):
+        stop_tracing()
+        is_running = False
+        return False
+    elif key & 0xFF == ord('e'):
+        print("enable tracing")
+        enable_linetracing = True
+    elif key & 0xFF == ord('w'):
+        print("disable tracing")
+        stop_tracing()
+    elif key & 0xFF == ord('d') and display is not None:
+        display.cycle()
+    return True
 
 
 # 메인: 카메라 루프
 def main():
-    # 전역 변수 선언 
-    global last_cx, lost_count, last_time_lost, is_running, enable_linetracing
-    
-    camera = cv.VideoCapture(0)
-    camera.set(cv.CAP_PROP_FRAME_WIDTH, v_x)
-    camera.set(cv.CAP_PROP_FRAME_HEIGHT, v_y)
+    # 캡처는 별도 스레드: 항상 가장 최신 프레임으로 제어
+    grabber = LatestFrameGrabber(open_source(source_spec, v_x, v_y)).start()
+    display = Display(display_mode)
+    t_report = time.monotonic()
 
     try:
-        while camera.isOpened() and is_running:
-            ret, frame = camera.read()
-            if not ret:
-                print("camera read failed")
-                break
-            frame = cv.flip(frame, -1)
-
-            # ROI 설정: 화면 하단 중앙 영역에 집중
-            crop_y0 = int(v_y * 0.7)  # 화면 상단 70%는 자르고
-            crop_img = frame[crop_y0:, :]
-
-            # 마스크 생성
-            mask_full = make_mask(crop_img)
-            h_crop = crop_img.shape[0]
-            
-            # ROI: 마스크의 중앙 roi_height 픽셀만 사용
-            roi_bot = mask_full[h_crop - roi_height : h_crop, :]
-
-            # 중심 구하기 (Lookahead는 제외하고 근접 ROI만 사용)
-            bot_centroid, _ = find_largest_contour_centroid(roi_bot)
-
-            vis = crop_img.copy()
-            # cv.imshow('mask_full', cv.resize(roi_bot, dsize=(0,0), fx=2, fy=2)) # ROI 마스크만 표시
-
-            # 라인트레이싱 제어 로직
-            if enable_linetracing:
-                
-                if bot_centroid is not None:
-                    # 라인 발견 (안정적인 제어)
-                    cx_rel = bot_centroid[0]
-                    # 에러 계산: 중앙에서 얼마나 벗어났는지 (-1 ~ +1)
-                    err = (cx_rel - (v_x/2)) / (v_x/2)
-                    last_cx = cx_rel
-                    lost_count = 0
-                    last_time_lost = None
-
-                    # control_by_error 호출
-                    control_by_error(err, car) 
-
-                    # 시각화
-                    cy_abs = h_crop - roi_height // 2
-                    cv.circle(vis, (int(cx_rel), cy_abs), 5, (0,0,255), -1)
-                    cv.putText(vis, f'err:{err:.2f}', (5,20), cv.FONT_HERSHEY_SIMPLEX, 0.5, (0,255,0), 1)
+        while is_running:
+            apply_degrade(display)
+            captured = grabber.read()
+            if captured is None:
+                if grabber.eof or not grabber.running:
+                    print("camera read failed")
+                    break
+                continue
 
-                else:
-                    # 라인 소실 처리 (Lost Logic)
-                    lost_count += 1
-                    if last_time_lost is None: last_time_lost = time.time()
-                    elapsed = time.time() - last_time_lost
-
-                    if lost_count < lost_threshold:
-                        # 짧은 소실: 이전 방향으로 저속 전진
-                        car.motor_go(int(speed_base * 0.5))
-                        if last_cx < (v_x/2): car.motor_left(int(speed_base * 0.4))
-                        else: car.motor_right(int(speed_base * 0.4))
-                    else:
-                        # 오랜 소실: 탐색 모드 (양방향 회전 스윕)
-                        if (elapsed % (search_turn_time*2)) < search_turn_time:
-                            if last_cx < (v_x/2): car.motor_left(int(speed_base * 0.6))
-                            else: car.motor_right(int(speed_base * 0.6))
-                        else:
-                            if last_cx < (v_x/2): car.motor_right(int(speed_base * 0.6))
-                            else: car.motor_left(int(speed_base * 0.6))
-                            
-                    cv.putText(vis, f'LOST {lost_count}', (5,40), cv.FONT_HERSHEY_SIMPLEX, 0.6, (0,0,255), 2)
-            
-            else:
-                # 라인트레이싱 비활성화 상태: 정지
-                car.motor_stop()
-                cv.putText(vis, 'TRACING DISABLED', (5,20), cv.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
+            row = tracer.begin(captured.stamp)
+            frame = preprocess(captured.image)
 
+            # 마스크 생성 (ROI 밴드만)
+            masks, roi_bot, window = compute_masks(frame)
+            tracer.mark(row, 'mask')
 
-            # 그리드/시각화
-            for x in v_x_grid:
-                cv.line(vis, (x, 0), (x, vis.shape[0]), (0,255,0), 1)
-            cv.imshow('crop_vis', cv.resize(vis, dsize=(0,0), fx=2, fy=2))
+            # 중심 구하기: 근접 ROI 로 에러, lookahead 밴드로 곡선 feed-forward
+            bot_centroid = find_line(roi_bot, masks, window)
+            ff, look = estimate_lookahead(masks)
+            tracer.mark(row, 'centroid')
 
-            key = cv.waitKey(20)
-            if key > 0:
-                if key & 0xFF == ord('q'):
-                    car.motor_stop()
-                    is_running = False
-                    break
-                elif key & 0xFF == ord('e'):
-                    print("enable tracing")
-                    enable_linetracing = True
-                elif key & 0xFF == ord('w'):
-                    print("disable tracing")
-                    enable_linetracing = False
-                    car.motor_stop()
-
-            # 안전: 강한 이상(마스크 전체가 거의 0)이면 속도 줄임
-            if cv.countNonZero(mask_full) < 30:
-                car.motor_go(int(speed_base * 0.4))
+            state = track_line(bot_centroid, band_masker.count_nonzero(masks), car, ff, captured.stamp)
+            state['window'], state['look'] = window, look
+            tracer.mark(row, 'control')
+            supervisor.beat('vision')
+
+            # 표시하지 않는 프레임은 그리기 자체를 건너뜀
+            if display.want():
+                display.show('crop_vis', tracer.overlay(draw_vis(frame, state)))
+                tracer.mark(row, 'display')
+
+            if trace_report_s and time.monotonic() - t_report > trace_report_s:
+                print(tracer.report())
+                print(supervisor.report())
+                t_report = time.monotonic()
+
+            key = display.poll_key()
+            if key > 0 and not handle_key(key, car, display):
+                break
             # 루프 계속
 
     except Exception as ex:
         print("Exception:", ex)
     finally:
-        camera.release()
-        cv.destroyAllWindows()
+        grabber.stop()
+        display.close()
+        print(tracer.report())
+        print(supervisor.report())
+        print(f"capture stats: {grabber.stats()}")
+        print(band_masker.report())
+        if tracker is not None:
+            print(tracker.report())
+
+
+# 파이프라인 모드: capture -> mask -> centroid -> control -> visualize 를 각각 스레드로
+# 간선은 크기 1의 drop-oldest 큐 -> 제어는 시각화를 절대 기다리지 않음
+def main_pipeline():
+    grabber = LatestFrameGrabber(open_source(source_spec, v_x, v_y)).start()
+    display = Display(display_mode)
+
+    def capture_step():
+        captured = grabber.read()
+        if captured is None and not grabber.running:
+            raise PipelineStop()
+        # 프레임마다 기록 행 번호를 같이 넘김 (중간 큐에서 버려진 프레임은 capture 만 남음)
+        return None if captured is None else (captured, tracer.begin(captured.stamp))
+
+    def mask_step(item):
+        captured, row = item
+        frame = preprocess(captured.image)
+        masks, roi_bot, window = compute_masks(frame)
+        tracer.mark(row, 'mask')
+        return captured, row, frame, masks, roi_bot, window
+
+    def centroid_step(item):
+        captured, row, frame, masks, roi_bot, window = item
+        bot_centroid = find_line(roi_bot, masks, window)
+        ff, look = estimate_lookahead(masks)
+        tracer.mark(row, 'centroid')
+        return captured, row, frame, masks, bot_centroid, window, ff, look
+
+    def control_step(item):
+        captured, row, frame, masks, bot_centroid, window, ff, look = item
+        state = track_line(bot_centroid, band_masker.count_nonzero(masks), car, ff, captured.stamp)
+        state['window'], state['look'] = window, look
+        tracer.mark(row, 'control')
+        supervisor.beat('vision')
+        return row, frame, state
+
+    def vis_step(item):
+        if not display.want():
+            return None
+        row, frame, state = item
+        return row, tracer.overlay(draw_vis(frame, state))
+
+    pipe = Pipeline()
+    q_frame = pipe.queue('frame', 1, DROP_OLDEST)
+    q_mask = pipe.queue('mask', 1, DROP_OLDEST)
+    q_cent = pipe.queue('centroid', 1, DROP_OLDEST)
+    q_vis = pipe.queue('vis', 1, DROP_OLDEST)
+    q_show = pipe.queue('show', 1, DROP_OLDEST)
+    pipe.stage('capture', capture_step, None, [q_frame])
+    pipe.stage('mask', mask_step, q_frame, [q_mask])
+    pipe.stage('centroid', centroid_step, q_mask, [q_cent])
+    pipe.stage('control', control_step, q_cent, [q_vis])
+    pipe.stage('visualize', vis_step, q_vis, [q_show])
+    pipe.start()
+
+    t_report = time.monotonic()
+    try:
+        # imshow/waitKey 는 메인 스레드에서만
+        while is_running and pipe.running:
+            apply_degrade(display)
+            item = q_show.get(timeout=0.05)
+            if item is not None:
+                row, vis = item
+                display.show('crop_vis', vis)
+                tracer.mark(row, 'display')
+            key = display.poll_key()
+            if key > 0 and not handle_key(key, car, display):
+                break
+            if trace_report_s and time.monotonic() - t_report > trace_report_s:
+                print(pipe.report())
+                print(tracer.report())
+                print(supervisor.report())
+                t_report = time.monotonic()
+    except Exception as ex:
+        print("Exception:", ex)
+    finally:
+        pipe.stop()
+        grabber.stop()
+        display.close()
+        print(pipe.report())
+        print(tracer.report())
+        print(supervisor.report())
+        print(band_masker.report())
+        if tracker is not None:
+            print(tracker.report())
+
+# 명령행 옵션 -> 전역 설정 (replay.py 도 같은 옵션 이름으로 사용)
+def configure(args):
+    global centroid_engine, mask_engine, tracker, lookahead, band_masker, tracer
+    centroid_engine = args.centroid
+    mask_engine = args.mask
+    if getattr(args, 'trace', None):
+        tracer = Tracer(tracer.marks, path=args.trace)
+    if args.track_window:
+        tracker = TrackingWindow(v_x)
+    if args.lookahead:
+        # 화면 하단 30% 전체를 lookahead 밴드로 (근접 밴드와 겹치므로 한 번에 계산됨)
+        lookahead = Lookahead(lookahead_k)
+        if not any(b.name == 'lookahead' for b in roi_bands):
+            roi_bands.append(Band('lookahead', view_y0, 1.0))
+        band_masker = BandMasker(roi_bands, make_mask, morph_pad(5, 4))
+
 
 # ------------------------------
 # 실행부
 # ------------------------------
 if __name__ == '__main__':
-    t = threading.Thread(target=func_thread)
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--source', default=source_spec,
+                    help="'cam', 'cam:N', 'synthetic', 또는 영상 파일 경로")
+    ap.add_argument('--pipeline', action='store_true', help='단계별 멀티스레드 파이프라인으로 실행')
+    ap.add_argument('--display', default=display_mode,
+                    help="'none'(헤드리스), 'every:N', 'thread' / 실행 중 'd' 키로 전환")
+    ap.add_argument('--centroid', default=centroid_engine, choices=['contour', 'projection'],
+                    help='중심 검출 방식')
+    ap.add_argument('--mask', default=mask_engine, choices=['hsv', 'lut', 'lut-exact'],
+                    help='마스크 생성 방식')
+    ap.add_argument('--track-window', action='store_true', default=track_window,
+                    help='라인을 잡고 있는 동안 예측 위치 주변의 창만 처리')
+    ap.add_argument('--lookahead', action='store_true', default=use_lookahead,
+                    help='멀티 밴드 lookahead 곡선 추정을 feed-forward 로 사용')
+    ap.add_argument('--control-rate', type=float, default=control_rate,
+                    help='고정 주기 제어 루프 (Hz, 예: 100). 0 이면 프레임마다 제어')
+    ap.add_argument('--control-log', help='제어 루프 지터/추정 나이 기록 CSV 경로')
+    ap.add_argument('--trace', help='프레임별 단계 시각 기록 경로 (.csv, 그 외는 float64 원시 배열)')
+    ap.add_argument('--trace-report', type=float, default=trace_report_s,
+                    help='단계별 지연 요약 출력 주기 (초), 0 이면 종료 때만')
+    ap.add_argument('--deadline-ms', type=float, default=vision_deadline * 1000,
+                    help='비전 루프 deadline: 넘기면 화면 끄기 -> 처리 영역 줄이기 -> 감속 -> 정지')
+    ap.add_argument('--stop-ms', type=float, default=stop_deadline * 1000,
+                    help='비전/제어 루프가 이만큼 멈추면 바로 정지')
+    args = ap.parse_args()
+    trace_report_s = args.trace_report
+    source_spec = args.source
+    display_mode = args.display
+    configure(args)
+
     is_running = True
-    t.start()
 
     car = SDcar.Drive()
+    deadlines = {'vision': args.deadline_ms / 1000}
+    if args.control_rate > 0:
+        # 제어 루프는 4 주기 넘게 밀리면 miss
+        deadlines['control'] = 4.0 / args.control_rate
+    ladder = [(name, lambda level=i + 1: request_degrade(level)) for i, (name, _) in enumerate(DEGRADE_STEPS)]
+    supervisor = Supervisor(deadlines, ladder,
+                            supervisor_stop, stop_after=args.stop_ms / 1000).start()
+    if args.control_rate > 0:
+        pid = PID(Kp, Ki, Kd, rate_limit=steer_rate_limit)
+        control_loop = ControlLoop(lambda steer: apply_steer(steer, car), pid, args.control_rate,
+                                   heartbeat=lambda: supervisor.beat('control')).start()
     try:
-        main()
+        if args.pipeline:
+            main_pipeline()
+        else:
+            main()
     finally:
         is_running = False
+        supervisor.close()
+        if control_loop is not None:
+            control_loop.stop()
+            print(control_loop.report())
+            if args.control_log:
+                control_loop.dump(args.control_log)
+        tracer.close()
+        print(f"drive writes: {car.stats()}")
+        if get_log() is not None:
+            print(get_log().report())
         car.clean_GPIO()
-        print("finished")
\ No newline at end of file
+        print("finished")
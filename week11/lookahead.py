@@ -0,0 +1,59 @@
+import numpy as np
+
+from centroid import dominant_run
+
+
+# 여러 가로 밴드의 라인 중심 -> 진행 방향(heading) / 곡률 추정
+# findContours 를 K 번 하는 대신 (K, 행, 열) reshape 후 한 번의 합으로 밴드별 열 투영을 구함
+class Lookahead:
+    def __init__(self, k=4, min_pixels=20):
+        self.k = k
+        self.min_pixels = min_pixels
+        self._fits = {}         # (마스크 높이, 유효 밴드 패턴) -> 최소제곱 의사역행렬
+
+    # 밴드별 중심 x, 밴드 중앙 y (마스크 아래에서 위로 잰 거리), 유효 여부
+    def centers(self, mask):
+        h, w = mask.shape
+        rows = h // self.k * self.k
+        band_h = rows // self.k
+        col = mask[h - rows:].reshape(self.k, band_h, w).sum(axis=1, dtype=np.int32)
+        # 밴드마다 가장 큰 연속 구간(선)의 중심 -> 노이즈/다른 선이 중심을 끌어당기지 않음
+        runs = [dominant_run(c) for c in col]
+        cx = np.array([r[0] for r in runs], np.float64)
+        mass = np.array([r[1] for r in runs])
+        # 아래쪽 밴드부터 (y = 0 이 가장 가까운 쪽)
+        cx = cx[::-1]
+        valid = mass[::-1] >= self.min_pixels * 255
+        ys = (np.arange(self.k) + 0.5) * band_h
+        return cx, ys, valid
+
+    # x(y) = a*y^2 + b*y + c 를 맞춤 (유효 밴드가 3개 미만이면 직선, 2개 미만이면 None)
+    def fit(self, cx, ys, valid):
+        n = int(valid.sum())
+        if n < 2:
+            return None
+        key = (float(ys[-1]), tuple(valid))
+        pinv = self._fits.get(key)
+        if pinv is None:
+            deg = 2 if n >= 3 else 1
+            pinv = np.linalg.pinv(np.vander(ys[valid], deg + 1))
+            self._fits[key] = pinv
+        coef = pinv @ cx[valid]
+        if coef.size == 2:
+            coef = np.concatenate(([0.0], coef))
+        return coef
+
+    # 추정 결과: heading(바닥에서의 dx/dy), curvature(d2x/dy2), far_dx(맨 위 밴드까지 x 변화량)
+    def estimate(self, mask):
+        cx, ys, valid = self.centers(mask)
+        coef = self.fit(cx, ys, valid)
+        if coef is None:
+            return None
+        a, b, c = coef
+        y_far = ys[-1]
+        return {
+            'heading': b,
+            'curvature': 2 * a,
+            'far_dx': a * y_far ** 2 + b * y_far,
+            'points': [(float(x), float(y)) for x, y, ok in zip(cx, ys, valid) if ok],
+        }
@@ -0,0 +1,153 @@
+import os
+import hashlib
+
+import cv2 as cv
+import numpy as np
+
+# BGR -> 색상 클래스 룩업 테이블
+# 임계값이 시작할 때 고정이므로 가능한 모든 색에 대해 HSV 변환 + inRange 를 한 번만 해 둠
+# 테이블 한 칸 = 1바이트, 클래스마다 1비트 (최대 8개: 노란색, 흰색 ... 을 한 테이블에)
+#
+# 인덱스 방식
+#   quantized : cv.cvtColor(BGR2BGR565) 의 16비트 값 (B5 G6 R5) -> 64KB 테이블, 캐시에 들어감
+#               각 칸은 그 칸을 대표하는 BGR 색(BGR5652BGR)으로 판정 -> 경계 근처 색에서 양자화 오차
+#   exact     : 24비트 BGR 전체 -> 16MB 테이블, 기존 HSV 경로와 픽셀 단위로 같음
+
+
+class MaskLUT:
+    def __init__(self, classes, exact=False, cache_dir=None):
+        # classes: {'yellow': [((h,s,v), (h,s,v)), ...], 'white': [...]}  (HSV 범위 목록, OR 결합)
+        if len(classes) > 8:
+            raise ValueError("MaskLUT supports at most 8 colour classes")
+        self.classes = {name: [(tuple(int(x) for x in lo), tuple(int(x) for x in hi)) for lo, hi in ranges]
+                        for name, ranges in classes.items()}
+        self.names = list(self.classes)
+        self.exact = exact
+        self.cache_dir = cache_dir
+        self._masks = {}
+        self.table = self._load_or_build()
+
+    def key(self):
+        desc = repr((sorted(self.classes.items()), self.exact, cv.__version__))
+        return hashlib.sha1(desc.encode()).hexdigest()[:16]
+
+    def _load_or_build(self):
+        path = None
+        if self.cache_dir:
+            path = os.path.join(self.cache_dir, f"masklut_{self.key()}.npy")
+            if os.path.exists(path):
+                return np.load(path)
+        table = self._build()
+        if path:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            np.save(path, table)
+        return table
+
+    # 모든 인덱스에 해당하는 BGR 색을 만들어 HSV 경로 그대로 판정
+    def _build(self):
+        if self.exact:
+            idx = np.arange(1 << 24, dtype=np.uint32)
+            bgr = np.empty((4096, 4096, 3), np.uint8)
+            bgr[..., 0] = (idx & 0xFF).reshape(4096, 4096)
+            bgr[..., 1] = ((idx >> 8) & 0xFF).reshape(4096, 4096)
+            bgr[..., 2] = (idx >> 16).reshape(4096, 4096)
+        else:
+            codes = np.arange(1 << 16, dtype=np.uint16).reshape(256, 256)
+            bgr = cv.cvtColor(codes.view(np.uint8).reshape(256, 256, 2), cv.COLOR_BGR5652BGR)
+        hsv = cv.cvtColor(bgr, cv.COLOR_BGR2HSV)
+
+        table = np.zeros(hsv.shape[:2], np.uint8)
+        for bit, name in enumerate(self.names):
+            m = np.zeros(hsv.shape[:2], np.uint8)
+            for lo, hi in self.classes[name]:
+                cv.bitwise_or(m, cv.inRange(hsv, lo, hi), dst=m)
+            table |= (m & (1 << bit))
+        return table.ravel()
+
+    def index(self, img):
+        if self.exact:
+            v = cv.cvtColor(img, cv.COLOR_BGR2BGRA).view(np.uint32)[..., 0]
+            np.bitwise_and(v, 0xFFFFFF, out=v)      # 알파 바이트 제거
+            return v
+        return cv.cvtColor(img, cv.COLOR_BGR2BGR565).view(np.uint16)[..., 0]
+
+    # 클래스 비트 그대로 (bit i = self.names[i])
+    def classify(self, img):
+        return np.take(self.table, self.index(img))
+
+    # 선택한 클래스들의 합집합 마스크 (0/255), 기본은 전체 클래스
+    def apply(self, img, classes=None):
+        names = tuple(classes) if classes else tuple(self.names)
+        lut = self._masks.get(names)
+        if lut is None:
+            bits = 0
+            for name in names:
+                bits |= 1 << self.names.index(name)
+            lut = np.where(self.table & bits, 255, 0).astype(np.uint8)
+            self._masks[names] = lut
+        return np.take(lut, self.index(img))
+
+
+# 기존 HSV 경로 (비교 기준)
+def hsv_mask(img, ranges):
+    hsv = cv.cvtColor(img, cv.COLOR_BGR2HSV)
+    mask = None
+    for lo, hi in ranges:
+        m = cv.inRange(hsv, lo, hi)
+        mask = m if mask is None else cv.bitwise_or(mask, m)
+    return mask
+
+
+# 픽셀 불일치 비율 (%)
+def validate(lut, images, classes=None):
+    names = classes or lut.names
+    ranges = [r for name in names for r in lut.classes[name]]
+    diff = total = 0
+    for img in images:
+        a = hsv_mask(img, ranges)
+        b = lut.apply(img, names)
+        diff += int(np.count_nonzero(a != b))
+        total += a.size
+    return 100.0 * diff / max(total, 1)
+
+
+if __name__ == '__main__':
+    import argparse
+    import glob
+    import time
+
+    ap = argparse.ArgumentParser(description='마스크 LUT 검증/벤치마크')
+    ap.add_argument('--imgs', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'week10', 'imgs'))
+    ap.add_argument('--number', type=int, default=200)
+    args = ap.parse_args()
+
+    # lab11 (노란색) 과 lab10-2 (노란색 + 흰색) 의 임계값
+    lab11_classes = {'yellow': [((20, 100, 100), (40, 255, 255))]}
+    lab10_classes = {'yellow': [((15, 80, 80), (40, 255, 255))],
+                     'white': [((0, 0, 200), (180, 30, 255))]}
+
+    imgs = [cv.resize(cv.imread(f), (640, 480)) for f in sorted(glob.glob(os.path.join(args.imgs, '*.jpg')))]
+    crops = [cv.resize(img, (320, 240))[168:] for img in imgs]
+
+    def bench(fn, x):
+        fn(x)
+        t0 = time.perf_counter()
+        for _ in range(args.number):
+            fn(x)
+        return (time.perf_counter() - t0) / args.number * 1e6
+
+    for exact in (False, True):
+        t0 = time.perf_counter()
+        lut11 = MaskLUT(lab11_classes, exact=exact)
+        lut10 = MaskLUT(lab10_classes, exact=exact)
+        mode = 'exact' if exact else 'quantized'
+        print(f"[{mode}] build {time.perf_counter() - t0:.2f}s, table {lut10.table.nbytes // 1024} KB")
+        print(f"  mismatch lab11 yellow : {validate(lut11, crops):.3f} %")
+        print(f"  mismatch lab10 y+w    : {validate(lut10, imgs):.3f} %")
+
+        r11 = lab11_classes['yellow']
+        r10 = lab10_classes['yellow'] + lab10_classes['white']
+        t_hsv11, t_lut11 = bench(lambda x: hsv_mask(x, r11), crops[0]), bench(lut11.apply, crops[0])
+        t_hsv10, t_lut10 = bench(lambda x: hsv_mask(x, r10), imgs[0]), bench(lut10.apply, imgs[0])
+        print(f"  lab11 320x72  : hsv {t_hsv11:7.1f} us  lut {t_lut11:7.1f} us  ({t_hsv11 / t_lut11:.1f}x)")
+        print(f"  lab10 640x480 : hsv {t_hsv10:7.1f} us  lut {t_lut10:7.1f} us  ({t_hsv10 / t_lut10:.1f}x)")
@@ -0,0 +1,177 @@
+import threading
+import time
+from collections import deque
+
+# 큐가 가득 찼을 때의 정책
+DROP_OLDEST = 'drop_oldest'     # 가장 오래된 항목을 버리고 새 항목을 넣음 (항상 최신 유지)
+DROP_NEWEST = 'drop_newest'     # 새 항목을 버림 (이미 들어온 작업 우선)
+BLOCK = 'block'                 # 자리가 날 때까지 기다림 (손실 없음)
+
+
+# 소스 단계에서 던지면 파이프라인 전체가 멈춤
+class PipelineStop(Exception):
+    pass
+
+
+# 크기 제한 큐 + 간선별 드롭 정책
+class BoundedQueue:
+    def __init__(self, name, maxsize=1, policy=DROP_OLDEST):
+        if policy not in (DROP_OLDEST, DROP_NEWEST, BLOCK):
+            raise ValueError(f"unknown queue policy: {policy}")
+        self.name = name
+        self.maxsize = maxsize
+        self.policy = policy
+        self.dropped = 0
+        self.closed = False
+        self._items = deque()
+        self._cond = threading.Condition()
+
+    def put(self, item):
+        with self._cond:
+            if len(self._items) >= self.maxsize:
+                if self.policy == DROP_OLDEST:
+                    self._items.popleft()
+                    self.dropped += 1
+                elif self.policy == DROP_NEWEST:
+                    self.dropped += 1
+                    return False
+                else:
+                    self._cond.wait_for(lambda: len(self._items) < self.maxsize or self.closed)
+                    if self.closed:
+                        return False
+            self._items.append(item)
+            self._cond.notify_all()
+            return True
+
+    # timeout 안에 항목이 없으면 None
+    def get(self, timeout=None):
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items or self.closed, timeout):
+                return None
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def depth(self):
+        return len(self._items)
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+# 한 단계 = 스레드 하나: 입력 큐에서 꺼내 fn 처리 후 출력 큐들에 넣음
+# inq 가 None 이면 소스 단계 (fn() 을 계속 호출), fn 이 None 을 돌려주면 다음으로 넘기지 않음
+class Stage:
+    def __init__(self, name, fn, inq=None, outqs=()):
+        self.name = name
+        self.fn = fn
+        self.inq = inq
+        self.outqs = list(outqs)
+        self.count = 0
+        self.busy = 0.0
+        self.error = None
+        self.running = False
+        self._t_start = None
+        self._thread = None
+
+    def start(self, on_stop):
+        self.running = True
+        self._t_start = time.monotonic()
+        self._thread = threading.Thread(target=self._run, args=(on_stop,), daemon=True)
+        self._thread.start()
+
+    def _run(self, on_stop):
+        try:
+            while self.running:
+                if self.inq is None:
+                    t0 = time.perf_counter()
+                    out = self.fn()
+                else:
+                    item = self.inq.get(timeout=0.1)
+                    if item is None:
+                        if self.inq.closed:
+                            break
+                        continue
+                    t0 = time.perf_counter()
+                    out = self.fn(item)
+                if out is None:
+                    continue
+                self.busy += time.perf_counter() - t0
+                self.count += 1
+                for q in self.outqs:
+                    q.put(out)
+        except PipelineStop:
+            pass
+        except Exception as ex:
+            self.error = ex
+            print(f"[pipeline] stage '{self.name}' failed: {ex}")
+        finally:
+            self.running = False
+            on_stop()
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self):
+        elapsed = max(time.monotonic() - self._t_start, 1e-6) if self._t_start else 1e-6
+        return {
+            'name': self.name,
+            'count': self.count,
+            'fps': self.count / elapsed,
+            'busy_ms': self.busy * 1000 / max(self.count, 1),
+            'queue': self.inq.depth() if self.inq is not None else 0,
+            'dropped': self.inq.dropped if self.inq is not None else 0,
+        }
+
+
+class Pipeline:
+    def __init__(self):
+        self.queues = []
+        self.stages = []
+        self.running = False
+
+    def queue(self, name, maxsize=1, policy=DROP_OLDEST):
+        q = BoundedQueue(name, maxsize, policy)
+        self.queues.append(q)
+        return q
+
+    def stage(self, name, fn, inq=None, outqs=()):
+        st = Stage(name, fn, inq, outqs)
+        self.stages.append(st)
+        return st
+
+    def start(self):
+        self.running = True
+        for st in self.stages:
+            st.start(self._on_stage_stop)
+        return self
+
+    # 한 단계라도 끝나면 전체 종료
+    def _on_stage_stop(self):
+        if self.running:
+            self.running = False
+            for q in self.queues:
+                q.close()
+
+    def stop(self):
+        self.running = False
+        for st in self.stages:
+            st.running = False
+        for q in self.queues:
+            q.close()
+        for st in self.stages:
+            st.join(timeout=1.0)
+
+    def stats(self):
+        return [st.stats() for st in self.stages]
+
+    def report(self):
+        lines = [f"{'stage':<10} {'fps':>6} {'ms/item':>8} {'queue':>5} {'dropped':>7}"]
+        for s in self.stats():
+            lines.append(f"{s['name']:<10} {s['fps']:6.1f} {s['busy_ms']:8.2f} {s['queue']:5d} {s['dropped']:7d}")
+        return '\n'.join(lines)
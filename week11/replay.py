@@ -0,0 +1,182 @@
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+import lab11
+import SDcar
+from capture import open_source
+
+# 녹화 영상/이미지 디렉터리를 lab11 의 프레임 처리 경로 그대로 통과시켜서
+# 처리 속도(FPS, 단계별 지연)와 조향 결정(프레임별 바퀴 명령)을 기록
+#   preprocess -> compute_masks(make_mask) -> find_line(중심) -> estimate_lookahead -> track_line(control_by_error)
+# 화면 없이, 실시간 속도 제한 없이 재생. 프레임 시각은 순번 / fps (소실 탐색 타이밍도 재현됨)
+#
+#   python replay.py ../week10/KakaoTalk_20251113_220802340.mp4 --save baseline.json
+#   python replay.py ../week10/KakaoTalk_20251113_220802340.mp4 --baseline baseline.json  (회귀 검사)
+
+STAGES = ('preprocess', 'mask', 'centroid', 'lookahead', 'control')
+
+
+# 모터 대신 바퀴 명령만 기록 (Drive 의 변환 경로는 그대로, GPIO 쓰기만 가로챔)
+class RecordingDrive(SDcar.Drive):
+    def __init__(self):
+        self.wheels = (0, 0)
+        self.calls = 0
+
+    def _apply(self, dirs, l_speed, r_speed):
+        self.calls += 1
+        self.wheels = (-l_speed if dirs[0] else l_speed, -r_speed if dirs[2] else r_speed)
+
+    def stats(self):
+        return {'calls': self.calls}
+
+    def clean_GPIO(self):
+        pass
+
+
+def percentiles(x):
+    x = np.asarray(x) * 1000
+    return {'p50': float(np.percentile(x, 50)), 'p90': float(np.percentile(x, 90)),
+            'p99': float(np.percentile(x, 99)), 'max': float(x.max())}
+
+
+def replay(source, max_frames=None, flip=True):
+    src = open_source(source, lab11.v_x, lab11.v_y, realtime=False)
+    if not src.is_opened():
+        raise RuntimeError(f"cannot open source: {source}")
+    fps = getattr(src, 'fps', 30.0)
+    car = RecordingDrive()
+    times = {name: [] for name in STAGES}
+    timeline = []
+    decode = 0.0
+    t_start = time.perf_counter()
+
+    i = 0
+    while max_frames is None or i < max_frames:
+        t0 = time.perf_counter()
+        ret, img = src.read()
+        t1 = time.perf_counter()
+        if not ret:
+            break
+        decode += t1 - t0
+        stamp = i / fps
+
+        frame = lab11.preprocess(img) if flip else img
+        t2 = time.perf_counter()
+        masks, roi_bot, window = lab11.compute_masks(frame)
+        t3 = time.perf_counter()
+        bot_centroid = lab11.find_line(roi_bot, masks, window)
+        t4 = time.perf_counter()
+        ff, _ = lab11.estimate_lookahead(masks)
+        t5 = time.perf_counter()
+        state = lab11.track_line(bot_centroid, lab11.band_masker.count_nonzero(masks), car, ff, stamp)
+        t6 = time.perf_counter()
+
+        for name, dt in zip(STAGES, (t2 - t1, t3 - t2, t4 - t3, t5 - t4, t6 - t5)):
+            times[name].append(dt)
+        timeline.append([round(stamp, 4), state['cx'],
+                         None if state['err'] is None else round(state['err'], 4),
+                         state['lost'], int(car.wheels[0]), int(car.wheels[1])])
+        i += 1
+    src.release()
+    if not i:
+        raise RuntimeError(f"no frames read from {source}")
+
+    wall = time.perf_counter() - t_start
+    process = wall - decode
+    return {
+        'source': source,
+        'frames': i,
+        'source_fps': fps,
+        'fps': i / wall,
+        'process_fps': i / process,
+        'realtime_x': (i / fps) / wall,
+        'stages': {name: percentiles(times[name]) for name in STAGES},
+        'total': percentiles(np.sum([times[name] for name in STAGES], axis=0)),
+        'timeline': timeline,
+    }
+
+
+def print_result(res):
+    print(f"{res['source']}: {res['frames']} frames  {res['fps']:.0f} fps "
+          f"(processing only {res['process_fps']:.0f} fps, {res['realtime_x']:.1f}x real time)")
+    for name, p in list(res['stages'].items()) + [('total', res['total'])]:
+        print(f"  {name:<10} ms  p50 {p['p50']:.3f}  p90 {p['p90']:.3f}  p99 {p['p99']:.3f}  max {p['max']:.3f}")
+    tl = res['timeline']
+    found = sum(1 for row in tl if row[1] is not None)
+    print(f"  line found {found}/{len(tl)} frames, distinct wheel commands {len({(r[4], r[5]) for r in tl})}")
+
+
+# 기준과 비교: 속도가 speed_tol 넘게 느려졌거나, 바퀴 명령이 wheel_tol 넘게 다른 프레임이 있으면 회귀
+def compare(res, base, speed_tol=0.15, wheel_tol=2):
+    problems = []
+    ratio = res['process_fps'] / base['process_fps']
+    print(f"speed: processing {res['process_fps']:.0f} fps vs baseline {base['process_fps']:.0f} ({ratio:.2f}x)")
+    if ratio < 1.0 - speed_tol:
+        problems.append(f"processing fps dropped to {ratio:.2f}x of baseline")
+    for name in STAGES:
+        cur, old = res['stages'][name]['p50'], base['stages'][name]['p50']
+        print(f"  {name:<10} p50 {cur:.3f} ms vs {old:.3f} ms")
+
+    if res['frames'] != base['frames']:
+        problems.append(f"frame count {res['frames']} != baseline {base['frames']}")
+    diffs = []
+    for cur, old in zip(res['timeline'], base['timeline']):
+        if (cur[1] is None) != (old[1] is None) or \
+                abs(cur[4] - old[4]) > wheel_tol or abs(cur[5] - old[5]) > wheel_tol:
+            diffs.append((cur, old))
+    print(f"behaviour: {len(diffs)} of {min(res['frames'], base['frames'])} frames differ (wheel tol {wheel_tol})")
+    if diffs:
+        cur, old = diffs[0]
+        print(f"  first at t={cur[0]}: now cx={cur[1]} wheels=({cur[4]}, {cur[5]}), "
+              f"baseline cx={old[1]} wheels=({old[4]}, {old[5]})")
+        problems.append(f"{len(diffs)} frames with different steering")
+    return problems
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description='lab11 라인 트레이서 녹화 영상 재생/벤치마크')
+    ap.add_argument('source', help="영상 파일, 이미지 디렉터리, 또는 'synthetic'")
+    ap.add_argument('--frames', type=int, default=None, help='최대 프레임 수 (synthetic 은 기본 300)')
+    ap.add_argument('--no-flip', action='store_true', help='preprocess 의 상하좌우 뒤집기 생략')
+    ap.add_argument('--centroid', default=lab11.centroid_engine, choices=['contour', 'projection'])
+    ap.add_argument('--mask', default=lab11.mask_engine, choices=['hsv', 'lut', 'lut-exact'])
+    ap.add_argument('--track-window', action='store_true')
+    ap.add_argument('--lookahead', action='store_true')
+    ap.add_argument('--repeat', type=int, default=1, help='반복 횟수 (속도는 가장 빠른 회차)')
+    ap.add_argument('--save', help='결과를 기준(JSON)으로 저장')
+    ap.add_argument('--baseline', help='기준(JSON)과 비교, 회귀면 종료 코드 1')
+    ap.add_argument('--speed-tol', type=float, default=0.15)
+    ap.add_argument('--wheel-tol', type=int, default=2)
+    args = ap.parse_args()
+
+    frames = args.frames or (300 if args.source == 'synthetic' else None)
+    runs = []
+    for _ in range(args.repeat):
+        # 반복마다 lab11 상태(소실 카운터, 트래커) 초기화
+        lab11.last_cx, lab11.lost_count, lab11.last_time_lost = lab11.v_x // 2, 0, None
+        lab11.tracker = None
+        lab11.configure(args)
+        runs.append(replay(args.source, frames, flip=not args.no_flip))
+    res = max(runs, key=lambda r: r['process_fps'])
+    res['config'] = {'centroid': args.centroid, 'mask': args.mask, 'track_window': args.track_window,
+                     'lookahead': args.lookahead, 'flip': not args.no_flip}
+    print_result(res)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(res, f, indent=1)
+        print(f"saved baseline: {args.save}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            base = json.load(f)
+        if base.get('config') != res['config']:
+            print(f"warning: baseline config {base.get('config')} != {res['config']}")
+        problems = compare(res, base, args.speed_tol, args.wheel_tol)
+        if problems:
+            print("REGRESSION: " + "; ".join(problems))
+            sys.exit(1)
+        print("OK: no regression")
@@ -0,0 +1,83 @@
+import time
+from collections import namedtuple
+
+import cv2 as cv
+
+# ROI 밴드: 프레임 높이 대비 비율 [y0, y1)  (해상도가 바뀌어도 그대로)
+Band = namedtuple('Band', ['name', 'y0', 'y1'])
+
+
+# 5x5 커널로 close + open 을 한 번씩 하면 한 행의 결과는 위아래 8행까지 영향을 받음
+def morph_pad(ksize=5, n_ops=4):
+    return (ksize // 2) * n_ops
+
+
+# 선언된 밴드에서만 마스크 + 모폴로지 계산
+# 밴드마다 위아래로 pad 행을 더 잘라서 계산한 뒤 밴드 부분만 남김 -> 전체를 계산한 결과와 같음
+# 겹치거나 붙어 있는 밴드는 한 구간(span)으로 합쳐서 한 번만 계산
+# 열 범위 [x0, x1) 를 주면 그 창(+좌우 pad 열)만 계산 (트래킹 창 모드)
+class BandMasker:
+    def __init__(self, bands, mask_fn, pad=None):
+        self.bands = list(bands)
+        self.mask_fn = mask_fn
+        self.pad = morph_pad() if pad is None else pad
+        self.times = {}         # span 이름 -> [횟수, 누적 시간, 마지막 시간]
+        self._layout = None
+        self._layout_h = None
+
+    def band_rows(self, band, h):
+        return int(round(band.y0 * h)), int(round(band.y1 * h))
+
+    # 높이 h 에서의 계산 구간: [(이름, 시작, 끝, [(밴드, 구간 안 y0, y1), ...]), ...]
+    def _spans(self, h):
+        if self._layout_h == h:
+            return self._layout
+        items = []
+        for b in self.bands:
+            y0, y1 = self.band_rows(b, h)
+            items.append((max(0, y0 - self.pad), min(h, y1 + self.pad), b, y0, y1))
+        items.sort(key=lambda it: it[0])
+
+        merged = []
+        for s0, s1, b, y0, y1 in items:
+            if merged and s0 <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], s1)
+                merged[-1][2].append((b, y0, y1))
+            else:
+                merged.append([s0, s1, [(b, y0, y1)]])
+
+        layout = []
+        for s0, s1, members in merged:
+            name = '+'.join(b.name for b, _, _ in members)
+            layout.append((name, s0, s1, [(b, y0 - s0, y1 - s0) for b, y0, y1 in members]))
+        self._layout, self._layout_h = layout, h
+        return layout
+
+    # 밴드 이름 -> 마스크 (열 범위 [x0, x1) 만)
+    def compute(self, frame, x0=0, x1=None):
+        h, w = frame.shape[:2]
+        x1 = w if x1 is None else x1
+        c0, c1 = max(0, x0 - self.pad), min(w, x1 + self.pad)
+        masks = {}
+        for name, s0, s1, members in self._spans(h):
+            t0 = time.perf_counter()
+            m = self.mask_fn(frame[s0:s1, c0:c1])
+            dt = time.perf_counter() - t0
+            rec = self.times.setdefault(name, [0, 0.0, 0.0])
+            rec[0] += 1
+            rec[1] += dt
+            rec[2] = dt
+            for b, y0, y1 in members:
+                masks[b.name] = m[y0:y1, x0 - c0:x1 - c0]
+        return masks
+
+    # 모든 밴드의 마스크 픽셀 수 (안전 검사용)
+    def count_nonzero(self, masks):
+        return sum(cv.countNonZero(m) for m in masks.values())
+
+    # 밴드 구간별 평균 계산 시간
+    def report(self):
+        parts = []
+        for name, (n, total, last) in self.times.items():
+            parts.append(f"{name}: {total * 1000 / max(n, 1):.2f} ms avg ({last * 1000:.2f} last)")
+        return 'mask bands  ' + '  '.join(parts)
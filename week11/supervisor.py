@@ -0,0 +1,176 @@
+import threading
+import time
+
+import numpy as np
+
+# 실시간 루프 감시 (func_thread 대체)
+#   각 루프는 한 바퀴마다 sup.beat('vision') 처럼 heartbeat 를 남김 (시각 기록만, 잠금 없음)
+#   감시 스레드가 주기적으로 마지막 heartbeat 나이와 간격을 deadline 과 비교
+#   deadline 을 넘기면 (miss) 정해진 순서대로 한 단계씩 성능을 낮춤:
+#       ladder = [('display off', fn), ('shrink', fn), ('slow', fn)]  -> 다 쓰고도 miss 면 stop()
+#   루프가 아예 멈추면 deadline 마다 한 단계씩 내려가고, stop_after 가 지나면 단계와 상관없이 stop()
+#   -> 멈춘 루프에서 정지까지 최악 stop_after + period
+# 내린 단계는 되돌리지 않음 (재시작 전까지 유지)
+# stop 은 한 번 건 뒤 루프가 stop_after 동안 miss 없이 돌아야 다시 걸림 (매 프레임 반복 정지 방지)
+
+
+class Supervisor:
+    def __init__(self, deadlines, ladder, stop, stop_after=None, period=None, report_s=0, log_size=1024):
+        # deadlines: {이름: 초} / ladder: [(단계 이름, 함수)] / stop(): 모터 정지
+        self.deadlines = dict(deadlines)
+        self.ladder = list(ladder)
+        self.stop = stop
+        self.stop_after = stop_after or max(self.deadlines.values()) * (len(self.ladder) + 1)
+        self.period = period or min(self.deadlines.values()) / 4
+        self.report_s = report_s
+        self.level = 0              # 적용한 ladder 단계 수
+        self.stops = 0
+        self.events = []            # (시각, 이름, 사유, 조치)
+        self.running = False
+        self._thread = None
+        self._wake = threading.Event()
+
+        # heartbeat 간격 기록 (링 버퍼, 이름별)
+        self._last = {name: None for name in self.deadlines}
+        self._iv = {name: np.zeros(log_size) for name in self.deadlines}
+        self._n = {name: 0 for name in self.deadlines}
+        self.misses = {name: 0 for name in self.deadlines}
+        self._seen = {name: 0 for name in self.deadlines}
+        self._stalled = {name: 0 for name in self.deadlines}    # 이번 정지 구간에서 내린 단계 수
+        self._stopped = False
+        self._ok_since = None
+
+    def beat(self, name):
+        now = time.monotonic()
+        last = self._last[name]
+        self._last[name] = now
+        if last is None:
+            return
+        iv = now - last
+        log = self._iv[name]
+        log[self._n[name] % len(log)] = iv
+        self._n[name] += 1
+        if iv > self.deadlines[name]:
+            self.misses[name] += 1
+
+    def start(self):
+        self.running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        self.running = False
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+
+    def _run(self):
+        t_report = time.monotonic()
+        while self.running:
+            self._wake.wait(self.period)
+            if not self.running:
+                break
+            now = time.monotonic()
+            for name, deadline in self.deadlines.items():
+                self.check(name, deadline, now)
+            if self.report_s and now - t_report > self.report_s:
+                print(self.report())
+                t_report = now
+
+    def check(self, name, deadline, now):
+        last = self._last[name]
+        if last is None:
+            return                  # 아직 시작 전인 루프는 감시하지 않음
+        age = now - last
+        if age <= deadline:
+            # 멈춤 구간이 끝남: 그 구간의 늦은 간격은 이미 처리함
+            if self._stalled[name]:
+                self._stalled[name] = 0
+                self._seen[name] = self.misses[name]
+            # 감시 주기 사이에 늦었던 간격이 있으면 miss
+            if self.misses[name] != self._seen[name]:
+                self._seen[name] = self.misses[name]
+                self._ok_since = None
+                self.escalate(name, 'late beat', now)
+            elif self._stopped:
+                if self._ok_since is None:
+                    self._ok_since = now
+                elif now - self._ok_since > self.stop_after:
+                    self._stopped, self._ok_since = False, None
+            return
+
+        # 아직 heartbeat 없음: deadline 마다 한 단계, stop_after 넘으면 정지
+        self._ok_since = None
+        if age > self.stop_after:
+            if not self._stopped:
+                self._halt(name, f"stalled {age * 1000:.0f} ms", now)
+            return
+        steps = int(age // deadline)
+        while self._stalled[name] < steps:
+            self._stalled[name] += 1
+            self.escalate(name, f"stalled {age * 1000:.0f} ms", now)
+
+    def escalate(self, name, reason, now):
+        if self.level < len(self.ladder):
+            step, action = self.ladder[self.level]
+            self.level += 1
+            self.events.append((now, name, reason, step))
+            print(f"[supervisor] {name} {reason} -> {step}")
+            action()
+        elif not self._stopped:
+            self._halt(name, reason, now)
+
+    def _halt(self, name, reason, now):
+        self._stopped = True
+        self.stops += 1
+        self.events.append((now, name, reason, 'stop'))
+        print(f"[supervisor] {name} {reason} -> stop")
+        self.stop()
+
+    def intervals(self, name):
+        return self._iv[name][:min(self._n[name], len(self._iv[name]))]
+
+    def report(self):
+        parts = []
+        for name, deadline in self.deadlines.items():
+            iv = self.intervals(name) * 1000
+            if not len(iv):
+                parts.append(f"{name}: no beats")
+                continue
+            p50, p99 = np.percentile(iv, (50, 99))
+            parts.append(f"{name} ms p50 {p50:.1f} p99 {p99:.1f} max {iv.max():.1f} "
+                         f"(jitter {p99 - p50:.1f}, deadline {deadline * 1000:.0f}, misses {self.misses[name]})")
+        done = [step for step, _ in self.ladder[:self.level]]
+        return f"supervisor  {'  '.join(parts)}  degraded {done or '-'}  stops {self.stops}"
+
+
+if __name__ == '__main__':
+    import argparse
+
+    ap = argparse.ArgumentParser(description='루프 정지 -> 정지 명령까지 반응 시간 확인')
+    ap.add_argument('--deadline-ms', type=float, default=100)
+    ap.add_argument('--stop-ms', type=float, default=300)
+    ap.add_argument('--trials', type=int, default=5)
+    args = ap.parse_args()
+
+    worst = 0.0
+    for trial in range(args.trials):
+        stopped = []
+        actions = []
+        sup = Supervisor({'vision': args.deadline_ms / 1000}, [('display off', lambda: actions.append('display')),
+                                                               ('slow', lambda: actions.append('slow'))],
+                         stop=lambda: stopped.append(time.monotonic()), stop_after=args.stop_ms / 1000).start()
+        # 30 fps 로 돌다가 한 프레임만 늦고 (-> 첫 단계) 그 뒤 멈춤 (-> 다음 단계, stop_after 에 정지)
+        for i in range(30):
+            sup.beat('vision')
+            time.sleep(1 / 30 if i != 15 else args.deadline_ms / 1000 * 1.5)
+        sup.beat('vision')
+        t_stall = time.monotonic()
+        time.sleep(args.stop_ms / 1000 + 0.2)
+        sup.close()
+        reaction = stopped[0] - t_stall
+        worst = max(worst, reaction)
+        print(f"trial {trial}: actions {actions}, stop {reaction * 1000:.0f} ms after last beat")
+    print(sup.report())
+    print(f"worst reaction {worst * 1000:.0f} ms (bound {args.stop_ms + args.deadline_ms / 4:.0f} ms)")
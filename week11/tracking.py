@@ -0,0 +1,69 @@
+import time
+
+
+# 트래킹 창: 라인을 잡고 있는 동안 예측 위치 주변의 가로 창만 처리
+# 놓치면 lost_count 에 따라 창을 단계적으로 넓히다가 전체 폭으로 돌아감
+class TrackingWindow:
+    def __init__(self, frame_w, base_w=96, grow=32, vel_alpha=0.5):
+        self.frame_w = frame_w
+        self.base_w = base_w        # 잠금 상태의 창 폭 (px)
+        self.grow = grow            # 소실 프레임마다 늘어나는 폭 (px)
+        self.vel_alpha = vel_alpha  # 속도(프레임당 이동량) 필터 계수
+        self.cx = None              # 마지막으로 찾은 중심 (전체 프레임 기준)
+        self.vel = 0.0
+        self._locked = False
+
+        # 지표
+        self.frames = 0
+        self.pixels = 0
+        self.found = 0
+        self.lock_losses = 0
+        self.windowed = 0
+        self._t_start = time.monotonic()
+
+    # 이번 프레임에서 처리할 열 범위 [x0, x1)
+    def window(self, lost_count):
+        if self.cx is None:
+            return 0, self.frame_w
+        width = self.base_w + self.grow * lost_count
+        if width >= self.frame_w:
+            return 0, self.frame_w
+        center = self.cx + self.vel * (1 + lost_count)
+        x0 = int(min(max(center - width / 2, 0), self.frame_w - width))
+        return x0, x0 + width
+
+    # 이번 프레임 결과 반영: cx 는 전체 프레임 기준 (못 찾았으면 None)
+    def update(self, cx, pixels, window):
+        self.frames += 1
+        self.pixels += pixels
+        if window[1] - window[0] < self.frame_w:
+            self.windowed += 1
+        if cx is None:
+            if self._locked:
+                self.lock_losses += 1
+            self._locked = False
+            return
+        if self.cx is not None and self._locked:
+            self.vel += self.vel_alpha * ((cx - self.cx) - self.vel)
+        else:
+            self.vel = 0.0
+        self.cx = cx
+        self._locked = True
+        self.found += 1
+
+    def metrics(self):
+        elapsed = max(time.monotonic() - self._t_start, 1e-6)
+        n = max(self.frames, 1)
+        return {
+            'fps': self.frames / elapsed,
+            'pixels_per_frame': self.pixels / n,
+            'windowed_ratio': self.windowed / n,
+            'found_ratio': self.found / n,
+            'lock_loss_per_1k': 1000.0 * self.lock_losses / n,
+        }
+
+    def report(self):
+        m = self.metrics()
+        return (f"tracking  fps {m['fps']:.1f}  px/frame {m['pixels_per_frame']:.0f}  "
+                f"windowed {m['windowed_ratio'] * 100:.0f}%  found {m['found_ratio'] * 100:.0f}%  "
+                f"lock-loss {m['lock_loss_per_1k']:.1f}/1k frames")
@@ -0,0 +1,184 @@
+import asyncio
+import time
+
+from bt_ingest import CommandInbox, CommandParser
+
+# lab8 용 asyncio 런타임: 스레드/폴링 없이 이벤트 루프 하나에서
+#   수신    : loop.add_reader(fd) -> 와 있는 바이트만 논블로킹으로 읽어 parser -> inbox
+#   처리    : 새 명령이 오면 깨어나서 적용 (조이스틱 최신 값, 버튼 순서 그대로 - bt_ingest 와 같음)
+#   워치독  : 마지막 수신 후 watchdog_ms 동안 조용하면 모터 정지 (연결 끊김 대비)
+#             조이스틱은 계속 보내는 값이라 끊기면 정지 (크기 0 이면 이미 정지 상태라 걸지 않음)
+#             버튼(go/back/left/right)은 앱이 한 번만 보내고 유지되는 명령이라 워치독이 끊지 않음
+#   텔레메트리: telemetry_s 마다 수신/지연 통계 출력
+#   읽기 오류 (포트 끊김 등): reader 를 빼고 정지한 뒤 run() 을 끝냄 (죽은 fd 로 루프가 계속 깨지 않도록)
+# 명령이 없으면 모든 태스크가 대기 상태 (CPU 사용 없음)
+
+
+# CommandInbox 의 합치기/지연 기록은 그대로, 대기만 asyncio.Event 로
+class AsyncCommandInbox(CommandInbox):
+    def __init__(self, log_size=4096):
+        super().__init__(log_size)
+        self._ready = asyncio.Event()
+
+    def put(self, cmds):
+        if cmds:
+            super().put(cmds)
+            self._ready.set()
+
+    async def next(self):
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            cmds = self.wait(0)
+            if cmds is None or cmds:
+                return cmds
+
+    def close(self):
+        super().close()
+        self._ready.set()
+
+
+class BluetoothRuntime:
+    def __init__(self, port, apply, stop, watchdog_ms=500, telemetry_s=5.0, parser=None):
+        # apply(cmd): 명령 하나를 모터에 적용 / stop(): 모터 정지
+        self.port = port
+        self.apply = apply
+        self.stop = stop
+        self.watchdog = watchdog_ms / 1000.0
+        self.telemetry_s = telemetry_s
+        self.armed = False
+        self.parser = parser or CommandParser()
+        self.inbox = None
+        self.last_rx = None
+        self.bytes = 0
+        self.trips = 0
+        self.error = None           # run() 을 끝낸 읽기 오류
+        self._rx = None
+        self._fd = None
+        self._tasks = []
+
+    # fd 읽기 콜백 (이벤트 루프 스레드)
+    def _on_readable(self):
+        try:
+            data = self.port.read(self.port.in_waiting or 1)
+        except OSError as e:
+            # serial.SerialException 도 OSError (IOError) 의 하위 클래스
+            self._fail(e)
+            return
+        if not data:
+            return
+        now = time.monotonic()
+        self.bytes += len(data)
+        self.last_rx = now
+        self._rx.set()
+        self.inbox.put(self.parser.feed(data, now))
+
+    def _fail(self, e):
+        asyncio.get_running_loop().remove_reader(self._fd)
+        self.error = e
+        print(f"[bluetooth] 읽기 오류 -> 정지 후 종료: {e}")
+        self.stop()
+        self.close()
+
+    async def _dispatch(self):
+        while True:
+            cmds = await self.inbox.next()
+            if cmds is None:
+                return
+            for cmd in cmds:
+                self.apply(cmd)
+                self.inbox.actuated(cmd)
+                self.armed = cmd.kind == 'joy' and cmd.value[1] > 0
+
+    # 마지막 수신 시각 + watchdog 까지 잠들었다가, 그 사이 수신이 없으면 정지
+    async def _watchdog(self):
+        while True:
+            await self._rx.wait()
+            while True:
+                self._rx.clear()
+                remain = self.last_rx + self.watchdog - time.monotonic()
+                if remain <= 0:
+                    break
+                await asyncio.sleep(remain)
+            if not self.armed:
+                continue
+            self.armed = False
+            self.trips += 1
+            print(f"[watchdog] {self.watchdog * 1000:.0f} ms 동안 수신 없음 -> 정지")
+            self.stop()
+
+    async def _telemetry(self):
+        while True:
+            await asyncio.sleep(self.telemetry_s)
+            print(self.report())
+
+    def report(self):
+        return f"{self.inbox.report()}  bytes {self.bytes}  watchdog trips {self.trips}"
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        self.inbox = AsyncCommandInbox()
+        self._rx = asyncio.Event()
+        fd = self._fd = self.port.fileno() if hasattr(self.port, 'fileno') else None
+        if fd is not None:
+            loop.add_reader(fd, self._on_readable)
+        self._tasks = [asyncio.create_task(self._watchdog())]
+        if self.telemetry_s:
+            self._tasks.append(asyncio.create_task(self._telemetry()))
+        try:
+            await self._dispatch()
+        finally:
+            if fd is not None:
+                loop.remove_reader(fd)
+            for t in self._tasks:
+                t.cancel()
+
+    def close(self):
+        if self.inbox is not None:
+            self.inbox.close()
+
+
+if __name__ == '__main__':
+    import argparse
+    import os
+
+    from bt_ingest import open_fake_port
+
+    ap = argparse.ArgumentParser(description='pty 가짜 시리얼 포트로 asyncio 런타임 확인')
+    ap.add_argument('--rate', type=float, default=500, help='초당 조이스틱 패킷 수')
+    ap.add_argument('--seconds', type=float, default=2.0)
+    ap.add_argument('--watchdog-ms', type=float, default=300)
+    args = ap.parse_args()
+
+    master, slave, port = open_fake_port(timeout=0)
+    stopped = []
+    runtime = BluetoothRuntime(port, apply=lambda cmd: None, stop=lambda: stopped.append(time.monotonic()),
+                               watchdog_ms=args.watchdog_ms, telemetry_s=0)
+
+    async def drive():
+        task = asyncio.create_task(runtime.run())
+        loop = asyncio.get_running_loop()
+        t0 = time.monotonic()
+        i = 0
+        while time.monotonic() - t0 < args.seconds:
+            await loop.run_in_executor(None, os.write, master, b'J0:%d,0.5\n' % (i % 360))
+            i += 1
+            await asyncio.sleep(1.0 / args.rate)
+        t_last = time.monotonic()
+
+        # 링크 끊김: 워치독이 정지시킬 때까지 + 그 뒤 유휴 CPU
+        cpu0 = time.process_time()
+        await asyncio.sleep(args.watchdog_ms / 1000.0 + 1.0)
+        idle_cpu = (time.process_time() - cpu0) / (args.watchdog_ms / 1000.0 + 1.0) * 100
+        runtime.close()
+        await task
+        print(f"sent {i} joystick packets at {args.rate:.0f}/s")
+        print(runtime.report())
+        if stopped:
+            print(f"watchdog stop {(stopped[0] - t_last) * 1000:.0f} ms after last packet "
+                  f"(limit {args.watchdog_ms:.0f} ms), idle CPU {idle_cpu:.1f}%")
+
+    asyncio.run(drive())
+    port.close()
+    os.close(master)
+    os.close(slave)
@@ -0,0 +1,242 @@
+import threading
+import time
+from collections import deque, namedtuple
+
+import numpy as np
+
+# 블루투스(시리얼) 명령 수신
+#   CommandParser : 바이트를 받는 대로 줄 단위로 잘라 명령으로 변환 (readline 타임아웃 없음)
+#   CommandInbox  : 조이스틱은 최신 값 하나만 (밀린 패킷은 덮어씀), 버튼은 순서대로 전부 전달
+#                   새 명령이 오면 Condition 으로 제어 루프를 깨움 (20 ms 폴링 없음)
+#   SerialReader  : 시리얼 포트를 읽는 스레드, 바이트가 도착한 시각을 명령에 붙임
+# 수신 -> 모터 적용 지연은 inbox.actuated(cmd) 로 기록
+
+# kind: 'joy' (value = (각도, 크기)) / 'button' (value = go/back/left/right/stop 또는 원문)
+# recv: 마지막 바이트를 읽은 시각 (monotonic)
+Command = namedtuple('Command', ['kind', 'value', 'recv'])
+
+BUTTONS = ('go', 'back', 'left', 'right', 'stop')
+
+
+class CommandParser:
+    def __init__(self, max_line=256):
+        self.buf = bytearray()
+        self.max_line = max_line
+        self.errors = 0
+        self.overflows = 0
+
+    # 바이트 조각을 넣으면 완성된 줄의 명령 목록을 돌려줌 (남은 조각은 다음 호출까지 보관)
+    def feed(self, data, stamp=None):
+        stamp = time.monotonic() if stamp is None else stamp
+        self.buf += data
+        out = []
+        while True:
+            i = self.buf.find(b'\n')
+            if i < 0:
+                break
+            line = bytes(self.buf[:i])
+            del self.buf[:i + 1]
+            cmd = self.parse_line(line, stamp)
+            if cmd is not None:
+                out.append(cmd)
+        if len(self.buf) > self.max_line:
+            # 줄바꿈 없이 계속 쌓이면 잡음으로 보고 버림
+            self.overflows += 1
+            self.buf.clear()
+        return out
+
+    def parse_line(self, line, stamp):
+        text = line.strip(b'\r \t\x00').decode('utf-8', 'replace')
+        if not text:
+            return None
+        if text.startswith('J0:'):
+            try:
+                angle, magnitude = text[3:].split(',')[:2]
+                return Command('joy', (float(angle), float(magnitude)), stamp)
+            except ValueError:
+                self.errors += 1
+                return None
+        lower = text.lower()
+        # 앱이 붙이는 접두/접미 문자가 있어도 되도록 포함 여부로 판단 (기존 lab8 과 같음)
+        for name in BUTTONS:
+            if name in lower:
+                return Command('button', name, stamp)
+        return Command('button', text, stamp)
+
+
+class CommandInbox:
+    def __init__(self, log_size=4096):
+        self._cond = threading.Condition()
+        self._buttons = deque()
+        self._joy = None
+        self.closed = False
+
+        self.received = {'joy': 0, 'button': 0}
+        self.coalesced = 0
+
+        # 수신 -> 적용 지연 (링 버퍼, 종류별)
+        self._lat = {'joy': np.zeros(log_size), 'button': np.zeros(log_size)}
+        self._n = {'joy': 0, 'button': 0}
+
+    def put(self, cmds):
+        if not cmds:
+            return
+        with self._cond:
+            for cmd in cmds:
+                self.received[cmd.kind] += 1
+                if cmd.kind == 'joy':
+                    if self._joy is not None:
+                        self.coalesced += 1
+                    self._joy = cmd
+                else:
+                    # 버튼보다 먼저 온 조이스틱 값은 버튼이 덮어쓰므로 버림
+                    if self._joy is not None:
+                        self.coalesced += 1
+                        self._joy = None
+                    self._buttons.append(cmd)
+            self._cond.notify()
+
+    # 새 명령이 올 때까지 대기 -> 적용할 순서대로 목록 (버튼들, 마지막에 최신 조이스틱)
+    # timeout 이면 빈 목록, close 후에는 None
+    def wait(self, timeout=None):
+        with self._cond:
+            if not self._buttons and self._joy is None and not self.closed:
+                self._cond.wait(timeout)
+            if self.closed and not self._buttons and self._joy is None:
+                return None
+            cmds = list(self._buttons)
+            self._buttons.clear()
+            if self._joy is not None:
+                cmds.append(self._joy)
+                self._joy = None
+            return cmds
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    # 명령을 모터에 적용한 직후 호출
+    def actuated(self, cmd):
+        lat = self._lat[cmd.kind]
+        lat[self._n[cmd.kind] % len(lat)] = time.monotonic() - cmd.recv
+        self._n[cmd.kind] += 1
+
+    def latencies(self, kind):
+        return self._lat[kind][:min(self._n[kind], len(self._lat[kind]))]
+
+    def report(self):
+        parts = [f"received joy {self.received['joy']} button {self.received['button']} "
+                 f"(coalesced {self.coalesced})"]
+        for kind in ('joy', 'button'):
+            lat = self.latencies(kind) * 1000
+            if len(lat):
+                parts.append(f"{kind} latency ms p50 {np.percentile(lat, 50):.2f} "
+                             f"p99 {np.percentile(lat, 99):.2f} max {lat.max():.2f}")
+        return 'bluetooth  ' + '  '.join(parts)
+
+
+# 포트에서 읽은 바이트 -> parser -> inbox
+class SerialReader:
+    def __init__(self, port, inbox, parser=None, chunk=256):
+        self.port = port
+        self.inbox = inbox
+        self.parser = parser or CommandParser()
+        self.chunk = chunk
+        self.running = False
+        self.bytes = 0
+        self._thread = None
+
+    def start(self):
+        self.running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+
+    def _run(self):
+        while self.running:
+            try:
+                # 와 있는 만큼 한 번에 (없으면 1바이트를 포트 timeout 동안 기다림)
+                data = self.port.read(max(1, min(self.port.in_waiting, self.chunk)))
+            except Exception:
+                time.sleep(0.1)
+                continue
+            if data:
+                self.bytes += len(data)
+                self.inbox.put(self.parser.feed(data))
+
+
+# pty 로 만든 가짜 시리얼 포트 (마스터 fd 에 쓰면 포트에서 읽힘)
+def open_fake_port(timeout=0.1):
+    import os
+    import serial
+
+    master, slave = os.openpty()
+    port = serial.Serial(os.ttyname(slave), baudrate=9600, timeout=timeout)
+    return master, slave, port
+
+
+if __name__ == '__main__':
+    import argparse
+    import os
+
+    ap = argparse.ArgumentParser(description='pty 가짜 시리얼 포트로 수신 경로 확인')
+    ap.add_argument('--rate', type=float, default=200, help='초당 조이스틱 패킷 수')
+    ap.add_argument('--seconds', type=float, default=2.0)
+    ap.add_argument('--work-ms', type=float, default=2.0, help='명령 처리(모터 적용)에 걸리는 시간')
+    args = ap.parse_args()
+
+    # 파서: 패킷이 조각나서 와도 같은 결과
+    p = CommandParser()
+    whole = p.feed(b'J0:90.0,0.5\ngo\nJ0:bad\n')
+    parts = [c for i in range(0, 22) for c in p.feed(b'J0:90.0,0.5\ngo\nJ0:bad\n'[i:i + 1])]
+    assert [(c.kind, c.value) for c in whole] == [(c.kind, c.value) for c in parts] == \
+        [('joy', (90.0, 0.5)), ('button', 'go')]
+
+    master, slave, port = open_fake_port()
+    inbox = CommandInbox()
+    reader = SerialReader(port, inbox).start()
+    applied = []
+
+    def control():
+        while True:
+            cmds = inbox.wait()
+            if cmds is None:
+                return
+            for cmd in cmds:
+                time.sleep(args.work_ms / 1000.0)
+                inbox.actuated(cmd)
+                applied.append(cmd)
+
+    worker = threading.Thread(target=control, daemon=True)
+    worker.start()
+
+    # 조이스틱을 빠르게 보내면서 중간중간 버튼
+    t0 = time.monotonic()
+    i = 0
+    sent_buttons = []
+    while time.monotonic() - t0 < args.seconds:
+        os.write(master, b'J0:%.1f,%.2f\n' % (i % 360, 0.5))
+        if i % 50 == 25:
+            name = BUTTONS[(i // 50) % len(BUTTONS)]
+            sent_buttons.append(name)
+            os.write(master, name.encode() + b'\r\n')
+        i += 1
+        time.sleep(1.0 / args.rate)
+    time.sleep(0.2)
+    reader.stop()
+    inbox.close()
+    worker.join(timeout=1.0)
+
+    got_buttons = [c.value for c in applied if c.kind == 'button']
+    print(f"sent joy {i} buttons {len(sent_buttons)} -> applied {len(applied)} commands, "
+          f"buttons in order: {got_buttons == sent_buttons}")
+    print(inbox.report())
+    port.close()
+    os.close(master)
+    os.close(slave)
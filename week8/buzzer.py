@@ -0,0 +1,218 @@
+import threading
+import time
+from collections import deque, namedtuple
+
+import numpy as np
+
+# 부저 시퀀서: 음 목록을 백그라운드 스레드에서 재생 (메인 스레드는 입력 처리를 계속)
+# 각 음의 시작 시각 = 시퀀스 시작 시각 + 앞 음들의 길이 합 (sleep 오차가 누적되지 않음)
+#
+# 재생 정책
+#   PREEMPT : 재생 중인 것과 대기열을 버리고 바로 새 시퀀스
+#   ENQUEUE : 대기열 뒤에 추가
+#   IGNORE  : 재생 중이면 무시 (기존 is_playing 동작)
+
+PREEMPT, ENQUEUE, IGNORE = 'preempt', 'enqueue', 'ignore'
+
+NOTES = {
+    '도': 262,
+    '레': 294,
+    '미': 330,
+    '파': 349,
+    '솔': 392,
+    '라': 440,
+    '시': 494,
+    '높은도': 523
+}
+
+# freq 가 0 이면 쉼표, duty 는 0..100
+Note = namedtuple('Note', ['freq', 'duration', 'duty'])
+
+
+# [(음 이름 또는 주파수, 길이), ...] -> Note 튜플 (재생 중에는 변환 없음)
+def compile_sequence(notes, duty=50):
+    seq = []
+    for note, duration in notes:
+        freq = NOTES[note] if isinstance(note, str) else note
+        seq.append(Note(float(freq), float(duration), float(duty if freq else 0)))
+    return tuple(seq)
+
+
+class Sequencer:
+    def __init__(self, pwm, log_size=1024):
+        self.pwm = pwm
+        self._cond = threading.Condition()
+        self._queue = deque()
+        self._current = None
+        self._cancel = False
+        self.running = True
+        self._sounding = False
+        self._freq = None
+
+        # 음마다 (예정 시각, 실제 적용 시각) 기록
+        self._log = np.zeros((log_size, 2))
+        self._n = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def busy(self):
+        with self._cond:
+            return self._current is not None or bool(self._queue)
+
+    # 재생 요청, 받아들였으면 True
+    def play(self, seq, policy=ENQUEUE):
+        with self._cond:
+            if policy == IGNORE and (self._current is not None or self._queue):
+                return False
+            if policy == PREEMPT:
+                self._queue.clear()
+                self._cancel = self._current is not None
+            self._queue.append(seq)
+            self._cond.notify_all()
+        return True
+
+    def cancel(self):
+        with self._cond:
+            self._queue.clear()
+            self._cancel = self._current is not None
+            self._cond.notify_all()
+
+    # 재생이 끝날 때까지 대기 (timeout 초, 끝났으면 True)
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._current is not None or self._queue:
+                remain = None if deadline is None else deadline - time.monotonic()
+                if remain is not None and remain <= 0:
+                    return False
+                self._cond.wait(remain)
+        return True
+
+    def close(self):
+        with self._cond:
+            self.running = False
+            self._queue.clear()
+            self._cancel = True
+            self._cond.notify_all()
+        self._thread.join(timeout=1.0)
+        self._silence()
+
+    def _sound(self, note):
+        if not note.freq or not note.duty:
+            self._silence()
+            return
+        if self._freq != note.freq:
+            self.pwm.ChangeFrequency(note.freq)
+            self._freq = note.freq
+        if self._sounding:
+            self.pwm.ChangeDutyCycle(note.duty)
+        else:
+            self.pwm.start(note.duty)
+            self._sounding = True
+
+    def _silence(self):
+        if self._sounding:
+            self.pwm.stop()
+            self._sounding = False
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self.running and not self._queue:
+                    self._cond.wait()
+                if not self.running:
+                    return
+                seq = self._current = self._queue.popleft()
+                self._cancel = False
+
+            t = time.monotonic()
+            for note in seq:
+                self._sound(note)
+                self._record(t, time.monotonic())
+                t += note.duration
+                # 다음 음 시각까지 대기 (취소되면 바로 깨어남)
+                with self._cond:
+                    while not self._cancel:
+                        remain = t - time.monotonic()
+                        if remain <= 0:
+                            break
+                        self._cond.wait(remain)
+                    if self._cancel:
+                        break
+
+            with self._cond:
+                self._current = None
+                if not self._queue:
+                    self._silence()
+                self._cond.notify_all()
+
+    def _record(self, scheduled, actual):
+        self._log[self._n % len(self._log)] = (scheduled, actual)
+        self._n += 1
+
+    # 음 시작 오차 (초, 실제 - 예정)
+    def errors(self):
+        log = self._log[:min(self._n, len(self._log))]
+        return log[:, 1] - log[:, 0]
+
+    def report(self):
+        err = self.errors() * 1000
+        if not len(err):
+            return 'buzzer: no notes'
+        return (f"buzzer  notes {self._n}  onset error ms p50 {np.percentile(err, 50):.2f} "
+                f"p99 {np.percentile(err, 99):.2f} max {err.max():.2f}")
+
+
+# 시험용 PWM: 주파수 변경 시각을 기록
+class FakePWM:
+    def __init__(self):
+        self.calls = []             # (monotonic, 동작, 값)
+
+    def start(self, duty):
+        self.calls.append((time.monotonic(), 'start', duty))
+
+    def ChangeDutyCycle(self, duty):
+        self.calls.append((time.monotonic(), 'duty', duty))
+
+    def ChangeFrequency(self, freq):
+        self.calls.append((time.monotonic(), 'freq', freq))
+
+    def stop(self):
+        self.calls.append((time.monotonic(), 'stop', 0))
+
+
+if __name__ == '__main__':
+    import argparse
+
+    ap = argparse.ArgumentParser(description='시험용 PWM 으로 시퀀서 타이밍 확인')
+    ap.add_argument('--notes', type=int, default=40)
+    ap.add_argument('--duration', type=float, default=0.05)
+    args = ap.parse_args()
+
+    names = list(NOTES)
+    seq = compile_sequence([(names[i % len(names)], args.duration) for i in range(args.notes)])
+
+    # 음마다 주파수 변경 시각 - 예정 시각 (누적 드리프트가 없어야 함)
+    pwm = FakePWM()
+    player = Sequencer(pwm)
+    player.play(seq)
+    player.wait()
+    # 이웃한 음의 주파수가 모두 달라서 음마다 freq 호출이 하나씩
+    freq_t = [t for t, op, _ in pwm.calls if op == 'freq']
+    drift = [(t - freq_t[0]) - i * args.duration for i, t in enumerate(freq_t)]
+    print(player.report())
+    print(f"last note drift {drift[-1] * 1000:.2f} ms after {args.notes * args.duration:.1f} s")
+
+    # 정책: IGNORE 는 재생 중 거절, PREEMPT 는 바로 끊고 새 시퀀스
+    short = compile_sequence([('도', 0.2)])
+    player.play(seq)
+    assert not player.play(short, IGNORE)
+    t = time.monotonic()
+    player.play(short, PREEMPT)
+    player.wait()
+    print(f"preempt: new sequence finished {time.monotonic() - t:.2f} s after request (expected ~0.20)")
+    player.play(seq)
+    player.cancel()
+    assert player.wait(0.1)
+    player.close()
@@ -1,7 +1,13 @@
-import RPi.GPIO as GPIO
-import time
+import os
 import sys
 
+# GPIO 백엔드 (라즈베리파이가 아니면 시뮬레이션, week11/gpio.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'week11'))
+from gpio import get_gpio
+from switches import SwitchEngine
+
+GPIO = get_gpio()
+
 SWITCHES = [
     {'pin': 5, 'name': 'SW1'},
     {'pin': 6, 'name': 'SW2'},
@@ -9,35 +15,27 @@ SWITCHES = [
     {'pin': 19, 'name': 'SW4'},
 ]
 
-click_count = [0] * len(SWITCHES) 
-
-prev_values = [0] * len(SWITCHES) 
+click_count = {sw['name']: 0 for sw in SWITCHES}
 
 GPIO.setwarnings(False) 
 GPIO.setmode(GPIO.BCM)
 
-
-for sw in SWITCHES:
-    GPIO.setup(sw['pin'], GPIO.IN, pull_up_down=GPIO.PUD_DOWN)
+# 폴링 대신 엣지 콜백 + 디바운스 (switches.py)
+engine = SwitchEngine(GPIO, SWITCHES, debounce_ms=30).start()
 
 try:
-    while True:
-        for i, sw in enumerate(SWITCHES):
-            current_value = GPIO.input(sw['pin'])
-            
-            if current_value == 1 and prev_values[i] == 0:
-                
-                click_count[i] += 1
-                
-                print(f"('{sw['name']} click', {click_count[i]})")
+    for ev in engine.events():
+        if ev.pressed:
             
-            prev_values[i] = current_value
+            click_count[ev.name] += 1
             
-        time.sleep(0.05) 
+            print(f"('{ev.name} click', {click_count[ev.name]})")
 
 except KeyboardInterrupt:
     print("\n프로그램을 종료합니다.")
     pass
 
 finally:
-    GPIO.cleanup()
\ No newline at end of file
+    engine.close()
+    print(engine.report())
+    GPIO.cleanup()
@@ -1,16 +1,14 @@
-import RPi.GPIO as GPIO
-import time
+import os
+import sys
 
-NOTES = {
-    '도': 262, 
-    '레': 294, 
-    '미': 330, 
-    '파': 349, 
-    '솔': 392, 
-    '라': 440, 
-    '시': 494, 
-    '높은도': 523
-}
+# GPIO 백엔드 (라즈베리파이가 아니면 시뮬레이션, week11/gpio.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'week11'))
+from gpio import get_gpio
+from hwpwm import open_pwm, close_pwm
+from switches import SwitchEngine
+from buzzer import Sequencer, compile_sequence, PREEMPT, IGNORE
+
+GPIO = get_gpio()
 
 BUZZER_PIN = 12
 
@@ -21,115 +19,67 @@ SWITCHES = [
     {'pin': 19, 'name': 'SW4', 'note': '높은도'},
 ]
 
-prev_values = [0] * len(SWITCHES) 
-
-is_playing = False 
-
-GPIO.setwarnings(False)
-GPIO.setmode(GPIO.BCM)
+# 멜로디는 시작할 때 (주파수, 길이, 듀티) 로 미리 변환
+SCALE = compile_sequence([(note, 1.0) for note in ['도', '레', '미', '파', '솔', '라', '시', '높은도']], duty=50)
 
-GPIO.setup(BUZZER_PIN, GPIO.OUT)
+HORN = compile_sequence([
+    ('라', 0.5),
+    ('파', 0.5),
+    ('라', 0.5),
+    ('파', 0.5),
+    ('라', 1.0),
+], duty=70)
 
-for sw in SWITCHES:
-    GPIO.setup(sw['pin'], GPIO.IN, pull_up_down=GPIO.PUD_DOWN)
+SCHOOL_BELL = compile_sequence([
+    ('솔', 0.4), ('솔', 0.4), ('라', 0.4), ('라', 0.4), 
+    ('솔', 0.4), ('솔', 0.4), ('미', 0.8),
+    ('솔', 0.4), ('솔', 0.4), ('미', 0.4), ('미', 0.4), 
+    ('레', 1.2),
+], duty=60)
 
-buzzer_pwm = GPIO.PWM(BUZZER_PIN, 1)
+SINGLE = {sw['name']: compile_sequence([(sw['note'], 0.15)]) for sw in SWITCHES}
 
-def play_scale():
-    print("1. '도레미파솔라시도'")
-    buzzer_pwm.start(50)
-    
-    scale = ['도', '레', '미', '파', '솔', '라', '시', '높은도']
-    for note in scale:
-        freq = NOTES[note]
-        buzzer_pwm.ChangeFrequency(freq)
-        time.sleep(1.0)
-    
-    buzzer_pwm.stop()
-
-def play_horn():
-    global is_playing
-    if is_playing:
-        return
-        
-    is_playing = True
-    print("2. 나만의 경적 소리 연주 시작!")
-    
-    horn_sequence = [
-        (NOTES['라'], 0.5),
-        (NOTES['파'], 0.5),
-        (NOTES['라'], 0.5),
-        (NOTES['파'], 0.5),
-        (NOTES['라'], 1.0),
-    ]
-
-    buzzer_pwm.start(70)
-    for freq, delay in horn_sequence:
-        buzzer_pwm.ChangeFrequency(freq)
-        time.sleep(delay)
-        
-    buzzer_pwm.stop()
-    print("경적 소리 연주 종료")
-    is_playing = False
+GPIO.setwarnings(False)
+GPIO.setmode(GPIO.BCM)
 
-def play_school_bell():
-    global is_playing
-    if is_playing:
-        return
-        
-    is_playing = True
-    print("4. '학교 종' 멜로디 연주 시작!")
-    
-    music_sequence = [
-        (NOTES['솔'], 0.4), (NOTES['솔'], 0.4), (NOTES['라'], 0.4), (NOTES['라'], 0.4), 
-        (NOTES['솔'], 0.4), (NOTES['솔'], 0.4), (NOTES['미'], 0.8),
-        (NOTES['솔'], 0.4), (NOTES['솔'], 0.4), (NOTES['미'], 0.4), (NOTES['미'], 0.4), 
-        (NOTES['레'], 1.2),
-    ]
+# GPIO12 는 하드웨어 PWM 핀: 가능하면 sysfs PWM (소프트웨어 PWM 스레드 없음)
+buzzer_pwm = open_pwm(GPIO, BUZZER_PIN, 1)
 
-    buzzer_pwm.start(60)
-    for freq, duration in music_sequence:
-        buzzer_pwm.ChangeFrequency(freq)
-        time.sleep(duration)
-        
-    buzzer_pwm.stop()
-    print("'학교 종' 멜로디 연주 종료")
-    is_playing = False
+# 연주는 백그라운드 시퀀서가 맡고, 메인은 스위치 이벤트만 처리 (buzzer.py, switches.py)
+player = Sequencer(buzzer_pwm)
+engine = SwitchEngine(GPIO, SWITCHES, debounce_ms=30).start()
 
 try:
-    play_scale()
+    print("1. '도레미파솔라시도'")
+    player.play(SCALE)
     
     print("SW1: 경적 소리 재생")
     print("SW2: '학교 종' ")
     print("SW3, SW4: 개별 음계 연주")
     
-    while True:
-        for i, sw in enumerate(SWITCHES):
-            current_value = GPIO.input(sw['pin'])
-            
-            if current_value == 1 and prev_values[i] == 0:
-                print(f"[{sw['name']} 눌림 감지]")
-                
-                if sw['name'] == 'SW1':
-                    play_horn()
-                elif sw['name'] == 'SW2':
-                    play_school_bell()
-                else:
-                    freq = NOTES[sw['note']]
-                    
-                    buzzer_pwm.start(50)
-                    buzzer_pwm.ChangeFrequency(freq)
-                    time.sleep(0.15)
-                    buzzer_pwm.stop()
-
-            prev_values[i] = current_value
-            
-        time.sleep(0.05)
+    for ev in engine.events():
+        if not ev.pressed:
+            continue
+        print(f"[{ev.name} 눌림 감지]")
+        
+        # 멜로디는 연주 중이면 무시, 개별 음은 바로 끊고 연주
+        if ev.name == 'SW1':
+            if player.play(HORN, IGNORE):
+                print("2. 나만의 경적 소리 연주 시작!")
+        elif ev.name == 'SW2':
+            if player.play(SCHOOL_BELL, IGNORE):
+                print("4. '학교 종' 멜로디 연주 시작!")
+        else:
+            player.play(SINGLE[ev.name], PREEMPT)
 
 except KeyboardInterrupt:
     print("\n프로그램을 종료합니다.")
     pass
 
 finally:
-    buzzer_pwm.stop()
-    GPIO.cleanup()
\ No newline at end of file
+    engine.close()
+    player.close()
+    print(engine.report())
+    print(player.report())
+    close_pwm(buzzer_pwm)
+    GPIO.cleanup()
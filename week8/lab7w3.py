@@ -1,14 +1,15 @@
 # -*- coding: utf-8 -*-
-import RPi.GPIO as GPIO
+import os
+import sys
 import time
 
-PWMA = 18
-AIN1 = 22
-AIN2 = 27
+# 모터 구동은 week11 의 SDcar.Drive 를 그대로 사용, 스위치는 같은 GPIO 백엔드로 읽음
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'week11'))
+from gpio import get_gpio
+from SDcar import Drive
+from switches import SwitchEngine
 
-PWMB = 23
-BIN1 = 25
-BIN2 = 24
+GPIO = get_gpio()
 
 SWITCHES = [
     {'pin': 5, 'name': 'SW1', 'direction': '앞'},
@@ -18,93 +19,45 @@ SWITCHES = [
 ]
 
 SPEED = 50
-prev_values = [0] * len(SWITCHES)
+DIRECTIONS = {sw['name']: sw['direction'] for sw in SWITCHES}
 
-GPIO.setwarnings(False)
-GPIO.setmode(GPIO.BCM)
+# Drive 가 GPIO 모드, 모터 핀, 스위치 입력(SW1~4) 설정까지 함
+car = Drive()
 
-GPIO.setup([PWMA, AIN1, AIN2, PWMB, BIN1, BIN2], GPIO.OUT)
-
-for sw in SWITCHES:
-    GPIO.setup(sw['pin'], GPIO.IN, pull_up_down=GPIO.PUD_DOWN)
-
-L_Motor = GPIO.PWM(PWMA, 500)
-R_Motor = GPIO.PWM(PWMB, 500)
-L_Motor.start(0)
-R_Motor.start(0)
+# 방향 -> (왼쪽, 오른쪽) 바퀴 듀티 (좌/우회전은 한쪽 바퀴 정지)
+WHEELS = {
+    '앞': (SPEED, SPEED),
+    '뒤': (-SPEED, -SPEED),
+    '왼쪽': (0, SPEED),
+    '오른쪽': (SPEED, 0),
+}
+MESSAGES = {'앞': "직진", '뒤': "후진", '왼쪽': "좌회전", '오른쪽': "우회전"}
 
 
 def stop_car():
-    GPIO.output([AIN1, AIN2, BIN1, BIN2], GPIO.LOW)
-    L_Motor.ChangeDutyCycle(0)
-    R_Motor.ChangeDutyCycle(0)
+    car.coast()
 
 def control_car(direction):
     
-    if direction == '앞':
-        GPIO.output(AIN1, GPIO.LOW)
-        GPIO.output(AIN2, GPIO.HIGH)
-        GPIO.output(BIN1, GPIO.LOW)
-        GPIO.output(BIN2, GPIO.HIGH)
-        
-        L_Motor.ChangeDutyCycle(SPEED)
-        R_Motor.ChangeDutyCycle(SPEED)
-        print("자동차: 직진")
-
-    elif direction == '뒤':
-        GPIO.output(AIN1, GPIO.HIGH)
-        GPIO.output(AIN2, GPIO.LOW)
-        GPIO.output(BIN1, GPIO.HIGH)
-        GPIO.output(BIN2, GPIO.LOW)
-        
-        L_Motor.ChangeDutyCycle(SPEED)
-        R_Motor.ChangeDutyCycle(SPEED)
-        print("자동차: 후진")
-
-    elif direction == '왼쪽':
-        GPIO.output(AIN1, GPIO.LOW)
-        GPIO.output(AIN2, GPIO.LOW)
-        GPIO.output(BIN1, GPIO.LOW)
-        GPIO.output(BIN2, GPIO.HIGH)
-        
-        L_Motor.ChangeDutyCycle(0)
-        R_Motor.ChangeDutyCycle(SPEED)
-        print("자동차: 좌회전")
-
-    elif direction == '오른쪽':
-        GPIO.output(AIN1, GPIO.LOW)
-        GPIO.output(AIN2, GPIO.HIGH)
-        GPIO.output(BIN1, GPIO.LOW)
-        GPIO.output(BIN2, GPIO.LOW)
-        
-        L_Motor.ChangeDutyCycle(SPEED)
-        R_Motor.ChangeDutyCycle(0)
-        print("자동차: 우회전")
+    if direction in WHEELS:
+        car.set_wheels(*WHEELS[direction], coast=True)
+        print(f"자동차: {MESSAGES[direction]}")
     
     else:
         stop_car()
 
 def test_right_motor():
     
-    GPIO.output(BIN1, GPIO.LOW)
-    GPIO.output(BIN2, GPIO.HIGH)
-    
-    R_Motor.ChangeDutyCycle(50)
-    print("오른쪽 모터 동작 (50%)")
-    time.sleep(1.0)
-    
-    R_Motor.ChangeDutyCycle(0)
-    print("오른쪽 모터 정지")
-    time.sleep(1.0)
-    
-    R_Motor.ChangeDutyCycle(50)
-    print("오른쪽 모터 동작 (50%)")
-    time.sleep(1.0)
-    
-    R_Motor.ChangeDutyCycle(0)
-    print("오른쪽 모터 정지")
-    time.sleep(1.0)
+    for _ in range(2):
+        car.set_wheels(0, 50, coast=True)
+        print("오른쪽 모터 동작 (50%)")
+        time.sleep(1.0)
+        
+        car.coast()
+        print("오른쪽 모터 정지")
+        time.sleep(1.0)
     
+engine = None
 
 try:
     test_right_motor() 
@@ -112,26 +65,24 @@ try:
     
     print("SW1: 앞, SW2: 오른쪽, SW3: 왼쪽, SW4: 뒤")
     
-    while True:
-        for i, sw in enumerate(SWITCHES):
-            current_value = GPIO.input(sw['pin'])
-            
-            if current_value == GPIO.HIGH and prev_values[i] == GPIO.LOW:
-                print(f"[눌림] {sw['name']}: {sw['direction']} 동작 시작")
-                control_car(sw['direction'])
-                
-            elif current_value == GPIO.LOW and prev_values[i] == GPIO.HIGH:
-                print(f"[떼어짐] {sw['name']}: 동작 정지")
-                stop_car()
-            
-            prev_values[i] = current_value
+    # 폴링 대신 엣지 콜백 + 디바운스 (switches.py), 이벤트가 올 때까지 블록
+    engine = SwitchEngine(GPIO, SWITCHES, debounce_ms=20).start()
+    for ev in engine.events():
+        if ev.pressed:
+            print(f"[눌림] {ev.name}: {DIRECTIONS[ev.name]} 동작 시작")
+            control_car(DIRECTIONS[ev.name])
             
-        time.sleep(0.02)
+        else:
+            print(f"[떼어짐] {ev.name}: 동작 정지")
+            stop_car()
 
 except KeyboardInterrupt:
     print("\n프로그램을 종료합니다.")
     pass
 
 finally:
+    if engine is not None:
+        engine.close()
+        print(engine.report())
     stop_car()
-    GPIO.cleanup()
\ No newline at end of file
+    car.clean_GPIO()
\ No newline at end of file
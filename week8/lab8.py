@@ -1,45 +1,41 @@
 # -*- coding: utf-8 -*-
-import RPi.GPIO as GPIO
+import os
+import sys
 import time
-import threading
+import asyncio
+import argparse
 import serial
 
-#  GPIO 핀 설정  
-PWMA = 18
-AIN1 = 22
-AIN2 = 27
-PWMB = 23
-BIN1 = 25
-BIN2 = 24
-
-GPIO.setwarnings(False)
-GPIO.setmode(GPIO.BCM)
-GPIO.setup([PWMA, AIN1, AIN2, PWMB, BIN1, BIN2], GPIO.OUT)
-
-# PWM 설정 
-L_Motor = GPIO.PWM(PWMA, 500)
-R_Motor = GPIO.PWM(PWMB, 500)
-L_Motor.start(0)
-R_Motor.start(0)
-
-# 블루투스 통신 설정 및 전역 변수 
-try:
-    bleSerial = serial.Serial("/dev/ttyS0", baudrate=9600, timeout=1.0) 
-    print("블루투스 시리얼 포트 초기화 성공")
-except serial.SerialException:
-    class DummySerial:
-        def readline(self): return b''
-        def close(self): pass
-    bleSerial = DummySerial()
-
-gData = "" # 블루투스로 수신된 데이터 저장
+# 모터 구동은 week11 의 SDcar.Drive 를 그대로 사용 (GPIO/PWM 설정 포함)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'week11'))
+from SDcar import Drive
+from bt_ingest import CommandInbox, SerialReader
+from bt_async import BluetoothRuntime
+
+car = Drive()
+
+class DummySerial:
+    in_waiting = 0
+    def read(self, n=1):
+        time.sleep(0.1)
+        return b''
+    def close(self): pass
+
+# 블루투스 통신: 수신 스레드가 명령을 inbox 에 넣고 제어 루프를 깨움 (bt_ingest.py)
+def open_serial(path, timeout=0.1):
+    try:
+        port = serial.Serial(path, baudrate=9600, timeout=timeout) 
+        print("블루투스 시리얼 포트 초기화 성공")
+        return port
+    except serial.SerialException:
+        return DummySerial()
+
+inbox = CommandInbox()
 
 # 자동차 제어 함수 
 
 def stop_car():
-    GPIO.output([AIN1, AIN2, BIN1, BIN2], GPIO.LOW)
-    L_Motor.ChangeDutyCycle(0)
-    R_Motor.ChangeDutyCycle(0)
+    car.coast()
 
 # control_car 함수를 방향과 속도를 인자로 받음
 def control_car(direction, speed_percent):
@@ -54,149 +50,92 @@ def control_car(direction, speed_percent):
 
     # 앞 
     if direction == 'go':
-        GPIO.output(AIN1, GPIO.LOW)
-        GPIO.output(AIN2, GPIO.HIGH)
-        GPIO.output(BIN1, GPIO.LOW)
-        GPIO.output(BIN2, GPIO.HIGH)
-        
-        L_Motor.ChangeDutyCycle(duty_cycle)
-        R_Motor.ChangeDutyCycle(duty_cycle)
-
+        car.set_wheels(duty_cycle, duty_cycle)
 
     # 뒤 
     elif direction == 'back':
-        GPIO.output(AIN1, GPIO.HIGH)
-        GPIO.output(AIN2, GPIO.LOW)
-        GPIO.output(BIN1, GPIO.HIGH)
-        GPIO.output(BIN2, GPIO.LOW)
-        
-        L_Motor.ChangeDutyCycle(duty_cycle)
-        R_Motor.ChangeDutyCycle(duty_cycle)
-
+        car.set_wheels(-duty_cycle, -duty_cycle)
 
     # 왼쪽 - 제자리 회전이 아닌 한쪽 바퀴 정지
     elif direction == 'left':
-        GPIO.output(AIN1, GPIO.LOW)
-        GPIO.output(AIN2, GPIO.LOW) # 왼쪽 바퀴 정지
-        GPIO.output(BIN1, GPIO.LOW)
-        GPIO.output(BIN2, GPIO.HIGH) # 오른쪽 바퀴 전진
-        
-        L_Motor.ChangeDutyCycle(0)
-        R_Motor.ChangeDutyCycle(duty_cycle)
+        car.set_wheels(0, duty_cycle, coast=True)
 
     # 오른쪽 - 한쪽 바퀴 정지
     elif direction == 'right':
-        GPIO.output(AIN1, GPIO.LOW)
-        GPIO.output(AIN2, GPIO.HIGH) # 왼쪽 바퀴 전진
-        GPIO.output(BIN1, GPIO.LOW)
-        GPIO.output(BIN2, GPIO.LOW) # 오른쪽 바퀴 정지
-        
-        L_Motor.ChangeDutyCycle(duty_cycle)
-        R_Motor.ChangeDutyCycle(0)
-
-
-#  통신 스레드 함수
-def serial_thread():
-    global gData
-    while True:
-        try:
-            data = bleSerial.readline() 
-            if data:
-                # 조이스틱 명령은 연속으로 들어오므로, 이전 명령과 동일해도 업데이트
-                gData = data.decode('utf-8').strip() 
-        except Exception:
-            time.sleep(1)
-
-# 메인 제어 루프 함수 
+        car.set_wheels(duty_cycle, 0, coast=True)
+
+
+# 명령 하나를 모터에 적용
+def apply_command(cmd):
+    if cmd.kind == 'joy':
+        # 1. 조이스틱: 4방향으로 나누지 않고 각도/크기를 그대로 좌우 바퀴 속도로 섞음
+        # (90도 앞, 0도 오른쪽 / 크기 1.0 -> 100%, 0.1 이하는 데드존으로 정지)
+        # 0/180 도 주변은 기존처럼 제자리 회전이 아니라 한쪽 바퀴만, 멈춘 바퀴는 방향 핀 LOW
+        angle, magnitude = cmd.value
+        car.drive_joystick(angle, magnitude, coast=True)
+
+    # 2. 버튼: 들어온 순서대로 한 번씩 (버튼 명령은 고정 속도)
+    elif cmd.value == 'stop':
+        control_car('stop', 0)
+    elif cmd.value in ('go', 'back', 'left', 'right'):
+        control_car(cmd.value, 50)
+    else:
+        print(f"수신된 버튼 명령어: {cmd.value} (처리하지 않음)")
+
+# 메인 제어 루프 함수: 새 명령이 올 때까지 잠들어 있음
 def main():
-    global gData
-    
     stop_car()
     print("메인 제어 루프 시작. 조이스틱(J0:각도,크기) 및 버튼(go, stop 등) 명령어 대기.")
-    
-    prev_button_command = "" 
 
     try:
         while True:
-            command = gData
-            
-            if command.startswith("J0:"):
-                # 1. 조이스틱 명령어 처리 로직
-                try:
-                    # J0:Angle,Magnitude 형식 파싱
-                    parts = command[3:].split(',')
-                    angle = float(parts[0])
-                    magnitude = float(parts[1])
-                    
-                    # Magnitude를 PWM Duty Cycle로 변환 (예: 1.0 -> 100%)
-                    motor_speed = magnitude * 100 
-                    
-                    direction = 'stop'
-                    
-                    # 앞/뒤/왼/오른쪽 방향결정
-                    if magnitude > 0.1: # 정지 상태 무시 (데드존 설정)
-                        
-                        # 45도 ~ 135도: 앞 
-                        if 45 <= angle < 135:
-                            direction = 'go'
-                        # 225도 ~ 315도: 뒤 
-                        elif 225 <= angle < 315:
-                            direction = 'back'
-                        # 135도 ~ 225도: 왼쪽 
-                        elif 135 <= angle < 225:
-                            direction = 'left'
-                        # 315도 ~ 45도: 오른쪽 (0도 주변 처리)
-                        else:
-                            direction = 'right'
-
-                    control_car(direction, motor_speed)
-                    
-                except ValueError as e:
-
-                    pass 
-
-            # 2. 버튼 명령어 처리 로직 
-            elif command and not command.startswith("J0:"):
-                
-                # 새로운 버튼 명령이 들어왔을 때만 실행
-                if command != prev_button_command:
-                    command_lower = command.lower()
-                    
-                    if "go" in command_lower:
-                        control_car('go', 50) # 버튼 명령은 고정 속도 
-                        prev_button_command = "go"
-                    elif "back" in command_lower:
-                        control_car('back', 50)
-                        prev_button_command = "back"
-                    elif "left" in command_lower:
-                        control_car('left', 50)
-                        prev_button_command = "left"
-                    elif "right" in command_lower:
-                        control_car('right', 50)
-                        prev_button_command = "right"
-                    elif "stop" in command_lower or not command_lower:
-                        control_car('stop', 0)
-                        prev_button_command = "stop"
-                    else:
-                        print(f"수신된 버튼 명령어: {command} (처리하지 않음)")
-                
-                
-            time.sleep(0.02) # 루프 지연
+            cmds = inbox.wait()
+            if cmds is None:
+                break
+            for cmd in cmds:
+                apply_command(cmd)
+                inbox.actuated(cmd)
 
     except KeyboardInterrupt:
         pass
 
 # 프로그램 실행 시작 
 if __name__ == '__main__':
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--port', default='/dev/ttyS0', help='블루투스 시리얼 포트')
+    ap.add_argument('--runtime', choices=['async', 'thread'], default='async',
+                    help='async: 이벤트 루프 하나 (워치독 포함, bt_async.py) / thread: 수신 스레드 + 대기 루프')
+    ap.add_argument('--watchdog-ms', type=float, default=500, help='조이스틱 수신이 끊기면 정지할 때까지 (async, 버튼 명령은 유지)')
+    ap.add_argument('--telemetry', type=float, default=0, help='통계 출력 주기 초, 0 이면 끔 (async)')
+    args = ap.parse_args()
+
+    if args.runtime == 'async':
+        # 논블로킹으로 읽으므로 timeout=0
+        bleSerial = open_serial(args.port, timeout=0)
+        runtime = BluetoothRuntime(bleSerial, apply_command, stop_car,
+                                   watchdog_ms=args.watchdog_ms, telemetry_s=args.telemetry)
+    else:
+        bleSerial = open_serial(args.port)
+        reader = SerialReader(bleSerial, inbox)
     try:
-        task1 = threading.Thread(target=serial_thread)
-        task1.daemon = True
-        task1.start()
-        main()
+        if args.runtime == 'async':
+            stop_car()
+            print("메인 제어 루프 시작 (asyncio). 조이스틱(J0:각도,크기) 및 버튼(go, stop 등) 명령어 대기.")
+            asyncio.run(runtime.run())
+        else:
+            reader.start()
+            main()
+    except KeyboardInterrupt:
+        pass
     except Exception as e:
         print(f"메인 실행 중 오류 발생: {e}")
     finally:
+        if args.runtime == 'async':
+            print(runtime.report() if runtime.inbox is not None else '')
+        else:
+            reader.stop()
+            print(inbox.report())
         stop_car()
         bleSerial.close()
-        GPIO.cleanup()
-        print("GPIO 및 통신 정리 완료.")
\ No newline at end of file
+        car.clean_GPIO()
+        print("GPIO 및 통신 정리 완료.")
@@ -0,0 +1,249 @@
+import asyncio
+import queue
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+# 스위치 입력 엔진: 폴링 루프 대신 add_event_detect(BOTH) 콜백으로 엣지를 받아 디바운스 후 이벤트 발행
+#
+# 디바운스 (leading edge + 확인)
+#   안정 상태에서 첫 엣지가 오면 바로 상태를 뒤집어 발행 (누름 지연 = 콜백 지연)
+#   그 뒤 debounce_ms 동안 들어오는 엣지(접점 떨림)는 무시
+#   창이 끝나면 실제 레벨을 읽어서 발행한 상태와 다르면 한 번 더 발행 (떨림 중 뗀 경우)
+#
+# 이벤트 소비
+#   블로킹 : get(timeout), for ev in engine.events()
+#   asyncio: await engine.aget(), async for ev in engine.aevents()
+
+# name/pin: 스위치, pressed: 누름 True / 뗌 False, edge: 엣지 콜백 시각, stamp: 발행 시각 (monotonic)
+SwitchEvent = namedtuple('SwitchEvent', ['name', 'pin', 'pressed', 'edge', 'stamp'])
+
+
+class SwitchEngine:
+    def __init__(self, gpio, switches, debounce_ms=30, active_high=True, maxsize=256, log_size=1024):
+        # switches: [{'pin': 5, 'name': 'SW1', ...}, ...]  (week8 프로그램의 SWITCHES 그대로)
+        self.gpio = gpio
+        self.switches = {sw['pin']: sw for sw in switches}
+        self.debounce = debounce_ms / 1000.0
+        self.active_high = active_high
+        self._queue = queue.Queue(maxsize)
+        self._aqueues = []              # (loop, asyncio.Queue)
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._state = {}                # 핀 -> 발행한 상태 (True = 눌림)
+        self._lockout = {}              # 핀 -> 떨림 무시가 끝나는 시각
+        self.running = False
+        self._worker = None
+
+        # 지연 기록 (엣지 -> 소비자 수신, 링 버퍼)
+        self._lat = np.zeros(log_size)
+        self._n = 0
+        self.edges = 0
+        self.ignored = 0
+        self.published = 0
+        self.dropped = 0
+
+    def _level(self, pin):
+        v = self.gpio.input(pin)
+        return bool(v) == self.active_high
+
+    def start(self):
+        pull = self.gpio.PUD_DOWN if self.active_high else self.gpio.PUD_UP
+        for pin in self.switches:
+            self.gpio.setup(pin, self.gpio.IN, pull_up_down=pull)
+            self._state[pin] = self._level(pin)
+        self.running = True
+        self._worker = threading.Thread(target=self._settle, daemon=True)
+        self._worker.start()
+        for pin in self.switches:
+            self.gpio.add_event_detect(pin, self.gpio.BOTH, callback=self._on_edge)
+        return self
+
+    def close(self):
+        for pin in self.switches:
+            self.gpio.remove_event_detect(pin)
+        with self._cond:
+            self.running = False
+            self._cond.notify_all()
+        if self._worker is not None:
+            self._worker.join(timeout=1.0)
+        self._queue.put(None)           # 블로킹 소비자 깨우기
+        for loop, q in self._aqueues:
+            loop.call_soon_threadsafe(q.put_nowait, None)
+
+    # GPIO 이벤트 스레드에서 호출: 짧게 끝내야 함
+    def _on_edge(self, pin):
+        now = time.monotonic()
+        with self._cond:
+            self.edges += 1
+            if now < self._lockout.get(pin, 0.0):
+                self.ignored += 1
+                return
+            pressed = not self._state[pin]
+            self._state[pin] = pressed
+            self._lockout[pin] = now + self.debounce
+            self._cond.notify()
+        self._publish(pin, pressed, now)
+
+    # 떨림 무시 창이 끝난 핀의 실제 레벨 확인
+    def _settle(self):
+        while True:
+            with self._cond:
+                while self.running:
+                    now = time.monotonic()
+                    due = [p for p, t in self._lockout.items() if t <= now]
+                    if due:
+                        break
+                    wait = min(self._lockout.values(), default=now + 1.0) - now
+                    self._cond.wait(wait)
+                if not self.running:
+                    return
+                fixes = []
+                for pin in due:
+                    del self._lockout[pin]
+                    level = self._level(pin)
+                    if level != self._state[pin]:
+                        self._state[pin] = level
+                        self._lockout[pin] = now + self.debounce
+                        fixes.append((pin, level))
+            for pin, level in fixes:
+                self._publish(pin, level, now)
+
+    def _publish(self, pin, pressed, edge):
+        ev = SwitchEvent(self.switches[pin]['name'], pin, pressed, edge, time.monotonic())
+        self.published += 1
+        try:
+            self._queue.put_nowait(ev)
+        except queue.Full:
+            # 가장 오래된 이벤트를 버리고 넣음
+            self.dropped += 1
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            self._queue.put_nowait(ev)
+        for loop, q in self._aqueues:
+            loop.call_soon_threadsafe(q.put_nowait, ev)
+
+    def _received(self, ev):
+        if ev is not None:
+            self._lat[self._n % len(self._lat)] = time.monotonic() - ev.edge
+            self._n += 1
+        return ev
+
+    # --- 블로킹 소비자 ---
+    def get(self, timeout=None):
+        try:
+            return self._received(self._queue.get(timeout=timeout))
+        except queue.Empty:
+            return None
+
+    def events(self):
+        while self.running or not self._queue.empty():
+            ev = self.get()
+            if ev is None:
+                return
+            yield ev
+
+    # 쌓인 이벤트 버리기 (예: 긴 동작 중 눌린 것은 무시)
+    def clear(self):
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                return
+
+    # --- asyncio 소비자 ---
+    # 이 엔진의 asyncio 큐 (실행 중인 이벤트 루프에 묶음, 처음 호출 시 생성)
+    def _aqueue(self):
+        loop = asyncio.get_running_loop()
+        for lp, q in self._aqueues:
+            if lp is loop:
+                return q
+        q = asyncio.Queue()
+        self._aqueues.append((loop, q))
+        return q
+
+    async def aget(self):
+        return self._received(await self._aqueue().get())
+
+    async def aevents(self):
+        self._aqueue()
+        while self.running:
+            ev = await self.aget()
+            if ev is None:
+                return
+            yield ev
+
+    # --- 지표 ---
+    def latencies(self):
+        return self._lat[:min(self._n, len(self._lat))]
+
+    def report(self):
+        lat = self.latencies() * 1000
+        line = (f"switches  edges {self.edges} (bounce ignored {self.ignored})  "
+                f"events {self.published} (dropped {self.dropped})")
+        if len(lat):
+            line += (f"  latency ms p50 {np.percentile(lat, 50):.2f} p99 {np.percentile(lat, 99):.2f} "
+                     f"max {lat.max():.2f}")
+        return line
+
+
+if __name__ == '__main__':
+    import argparse
+    import os
+    import sys
+
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'week11'))
+    from gpio import get_gpio, press
+
+    ap = argparse.ArgumentParser(description='시뮬레이션 GPIO 로 스위치 엔진 확인 (떨림 포함 누름 스크립트)')
+    ap.add_argument('--presses', type=int, default=20)
+    ap.add_argument('--bounce', type=int, default=4, help='누름/뗌마다 접점 떨림 횟수')
+    ap.add_argument('--debounce', type=float, default=30, help='ms')
+    args = ap.parse_args()
+
+    gpio = get_gpio('sim')
+    gpio.setmode(gpio.BCM)
+    SWITCHES = [{'pin': 5, 'name': 'SW1'}, {'pin': 6, 'name': 'SW2'},
+                {'pin': 13, 'name': 'SW3'}, {'pin': 19, 'name': 'SW4'}]
+    pins = [sw['pin'] for sw in SWITCHES]
+
+    def script():
+        events = []
+        for i in range(args.presses):
+            events += press(pins[i % 4], 0.05 + i * 0.12, hold=0.06, bounce=args.bounce)
+        return events
+
+    # 블로킹 소비자
+    engine = SwitchEngine(gpio, SWITCHES, debounce_ms=args.debounce).start()
+    player = gpio.script(script())
+    got = []
+    while len(got) < 2 * args.presses:
+        ev = engine.get(timeout=1.0)
+        if ev is None:
+            break
+        got.append(ev)
+    player.join()
+    presses = sum(ev.pressed for ev in got)
+    print(f"blocking: {presses} presses / {len(got) - presses} releases (expected {args.presses} each)")
+    print(engine.report())
+    engine.close()
+
+    # asyncio 소비자
+    async def consume():
+        engine = SwitchEngine(gpio, SWITCHES, debounce_ms=args.debounce).start()
+        gpio.script(script())
+        n = 0
+        async for ev in engine.aevents():
+            n += 1
+            if n == 2 * args.presses:
+                break
+        print(f"asyncio: {n} events")
+        print(engine.report())
+        engine.close()
+
+    asyncio.run(consume())
+    gpio.cleanup()